@@ -1,14 +1,136 @@
-from django.contrib import admin
-from .models import LostItem, FoundItem, MatchNotificationStatus
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from .forms import FoundItemImportForm
+from .models import (
+    OPEN, LostItem, FoundItem, MatchNotificationStatus, MatchCandidate, Job, ArchivedItem, ArchivedMatchStatus,
+    Category,
+)
+from .search import matching_ids
+
+
+class FullTextSearchMixin:
+    """
+    Answers changelist searches for open items from the FTS5 index instead of
+    LIKE scans; closed items are not indexed, so those use the default search.
+    """
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        indexed = queryset.filter(status=OPEN, id__in=matching_ids(search_term, self.search_kind))
+        closed, may_have_duplicates = super().get_search_results(request, queryset.exclude(status=OPEN), search_term)
+        return indexed | closed, may_have_duplicates
+
 
 @admin.register(LostItem)
-class LostItemAdmin(admin.ModelAdmin):
-    list_display = ('name', 'user', 'date_reported')
+class LostItemAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = 'lost'
+    list_display = ('name', 'user', 'category', 'status', 'date_reported')
+    list_filter = ('status', 'category')
     search_fields = ('name', 'description', 'features')
+    readonly_fields = ('duplicate_of',)
 
 @admin.register(FoundItem)
-class FoundItemAdmin(admin.ModelAdmin):
-    list_display = ('name', 'user', 'date_reported')
+class FoundItemAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_kind = 'found'
+    list_display = ('name', 'user', 'category', 'status', 'date_reported')
+    list_filter = ('status', 'category')
     search_fields = ('name', 'description', 'features')
+    readonly_fields = ('duplicate_of',)
+    change_list_template = 'admin/app/founditem/change_list.html'
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='app_founditem_import'),
+            *super().get_urls(),
+        ]
+
+    def import_view(self, request):
+        """Imports a security desk export as found items reported by the current user."""
+        from .importer import import_found_items, open_photos, read_rows
+
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = FoundItemImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            data = form.cleaned_data
+            try:
+                with open_photos(data['photos']) as photos:
+                    result = import_found_items(
+                        read_rows(data['file'], data['format']), request.user, photos, batch_size=data['batch_size']
+                    )
+            except ValueError as error:  # malformed JSON or ZIP
+                form.add_error('file', str(error))
+            else:
+                self.message_user(request, f"Imported {result.created} found item(s); skipped {result.failed} invalid row(s).")
+                for row_number, message in result.errors:
+                    self.message_user(request, f"Row {row_number}: {message}", messages.WARNING)
+                return redirect('admin:app_founditem_changelist')
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import found items',
+            'form': form,
+        }
+        return TemplateResponse(request, 'admin/app/founditem/import.html', context)
+
+admin.site.register(MatchNotificationStatus)
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    prepopulated_fields = {'slug': ('name',)}
+    filter_horizontal = ('related',)
+
+@admin.register(MatchCandidate)
+class MatchCandidateAdmin(admin.ModelAdmin):
+    list_display = ('lost_item', 'found_item', 'score', 'scorer_version', 'date_scored')
+    list_select_related = ('lost_item__user', 'found_item__user')
+
+@admin.register(ArchivedItem)
+class ArchivedItemAdmin(admin.ModelAdmin):
+    list_display = ('name', 'kind', 'user', 'status', 'closed_at', 'archived_at')
+    list_filter = ('kind', 'status')
+    search_fields = ('name',)
+
+@admin.register(ArchivedMatchStatus)
+class ArchivedMatchStatusAdmin(admin.ModelAdmin):
+    list_display = ('lost_item_id', 'found_item_id', 'notified_user', 'status', 'archived_at')
+    list_filter = ('status',)
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_after', 'locked_by', 'finished_at')
+    list_filter = ('status', 'name')
+
+
+# ---------- PROFILES (see profiling.py) ----------
+def profile_list_view(request):
+    from .profiling import list_profiles, sample_rate
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Request profiles',
+        'profiles': list_profiles(),
+        'sample_rate': sample_rate(),
+    }
+    return TemplateResponse(request, 'admin/profiles.html', context)
+
+
+def profile_download_view(request, name):
+    from .profiling import profile_path
+    path = profile_path(name)
+    if path is None:
+        raise Http404("No such profile.")
+    return FileResponse(path.open('rb'), as_attachment=True, filename=name)
+
 
-admin.site.register(MatchNotificationStatus)
\ No newline at end of file
+# Included under admin/ by project/urls.py; admin_view limits them to staff.
+profile_urls = [
+    path('', admin.site.admin_view(profile_list_view), name='profile_list'),
+    path('<str:name>', admin.site.admin_view(profile_download_view), name='profile_download'),
+]
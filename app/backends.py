@@ -0,0 +1,45 @@
+"""
+Authentication by email or username in a single case-insensitive query.
+
+The lookup compares LOWER(email) and LOWER(username), which the functional
+indexes from migration 0015 serve; `iexact` compiles to LIKE on SQLite and
+cannot use them. An email match wins over a username match.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+
+def find_user(login):
+    """The user whose email (preferred) or username matches `login` case-insensitively, or None."""
+    login = (login or '').strip().lower()
+    if not login:
+        return None
+    users = list(
+        get_user_model().objects
+        .alias(email_lower=Lower('email'), username_lower=Lower('username'))
+        .filter(Q(email_lower=login) | Q(username_lower=login))
+        .order_by('id')
+    )
+    for user in users:
+        if user.email.lower() == login:
+            return user
+    return users[0] if users else None
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(get_user_model().USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = find_user(username)
+        if user is None:
+            # Run the hasher anyway so a missing user takes as long as a wrong password.
+            get_user_model()().set_password(password)
+            return None
+        # check_password() rehashes on success when the hasher settings changed.
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,118 @@
+"""
+Candidate blocking through a token inverted index.
+
+Every LostItem/FoundItem is split into meaningful tokens (stored as ItemToken
+rows) when it is saved. Matching then only scores the items that share tokens
+with the item being matched, ranked by the summed IDF weight of the shared
+tokens, instead of scanning the whole opposite table. Given `category_ids`,
+only items in those categories or uncategorized ones compete (see
+categories.py).
+"""
+import math
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, FloatField, Sum, Value, When
+
+from .models import OPEN, LostItem, FoundItem, ItemToken
+
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from has have i in inside is it its my near
+    no not of on or our so the their there this to was were with without
+    lost found item color colour one some very
+""".split())
+
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 40
+
+
+def tokenize(item):
+    """Distinct meaningful tokens of an item's stored, normalized match text."""
+    tokens = set()
+    for token in item.match_text.split():
+        if len(token) < MIN_TOKEN_LENGTH or token in STOPWORDS:
+            continue
+        tokens.add(token[:MAX_TOKEN_LENGTH])
+    return tokens
+
+
+def blocking_limit():
+    return getattr(settings, 'MATCH_BLOCKING_LIMIT', 200)
+
+
+def idf_total_ttl():
+    return getattr(settings, 'MATCH_IDF_TOTAL_TTL', 60)
+
+
+# ---------- INDEX MAINTENANCE ----------
+def index_item(item):
+    """Replaces the ItemToken rows of a single LostItem or FoundItem."""
+    field = 'lost_item' if isinstance(item, LostItem) else 'found_item'
+    with transaction.atomic():
+        ItemToken.objects.filter(**{field: item}).delete()
+        ItemToken.objects.bulk_create(
+            ItemToken(token=token, **{field: item}) for token in tokenize(item)
+        )
+
+
+# ---------- CANDIDATE GENERATION ----------
+_totals = {}
+
+
+def _open_total(model):
+    """Open `model` items, counted at most once per MATCH_IDF_TOTAL_TTL seconds in this process."""
+    now = time.monotonic()
+    cached = _totals.get(model)
+    if cached is None or cached[0] <= now:
+        cached = (now + idf_total_ttl(), model.objects.open().count())
+        _totals[model] = cached
+    return cached[1]
+
+
+def _candidates(tokens, field, model, exclude_user_id, limit, category_ids=None):
+    if not tokens:
+        return []
+
+    postings = ItemToken.objects.filter(token__in=tokens, **{f'{field}__isnull': False})
+    # IDF only needs the rough size of the pool, so a slightly stale total will do.
+    total = _open_total(model)
+    doc_freq = dict(
+        postings.values_list('token').annotate(df=Count('id')).values_list('token', 'df')
+    )
+    if not doc_freq:
+        return []
+    total = max(total, *doc_freq.values())
+    # Smoothed IDF, so tokens shared by every item still count a little.
+    idf = {token: math.log((1 + total) / (1 + df)) + 1 for token, df in doc_freq.items()}
+
+    # Closed items should have no tokens left; never let a stray one take a slot.
+    competing = postings.filter(**{f'{field}__status': OPEN}).exclude(**{f'{field}__user_id': exclude_user_id})
+    if category_ids is not None:
+        # Imported here: categories.py builds on this module's tokenizer.
+        from .categories import in_categories
+        competing = competing.filter(in_categories(f'{field}__category', category_ids))
+    # Weighted, ranked and cut in SQL: highest shared weight first, ties to the
+    # most recently reported item.
+    weight = Sum(
+        Case(*(When(token=token, then=Value(value)) for token, value in idf.items()), output_field=FloatField())
+    )
+    ranked = (
+        competing.values(f'{field}_id').annotate(weight=weight).order_by('-weight', f'-{field}_id')
+        .values_list(f'{field}_id', flat=True)
+    )
+    return list(ranked[:limit])
+
+
+def candidate_found_ids(lost_item, limit=None, category_ids=None):
+    """IDs of FoundItems by other users sharing weighted tokens with `lost_item`."""
+    return _candidates(
+        tokenize(lost_item), 'found_item', FoundItem, lost_item.user_id, limit or blocking_limit(), category_ids
+    )
+
+
+def candidate_lost_ids(found_item, limit=None, category_ids=None):
+    """IDs of LostItems by other users sharing weighted tokens with `found_item`."""
+    return _candidates(
+        tokenize(found_item), 'lost_item', LostItem, found_item.user_id, limit or blocking_limit(), category_ids
+    )
@@ -0,0 +1,179 @@
+"""
+Item categories and a local naive-Bayes classifier that fills them in.
+
+Categories are rows of the Category table (seeded by a migration, editable in
+the admin). Reporters may pick one; otherwise the classifier picks it when
+the item is saved, from the tokens of its match text, counting the name
+twice. It learns from the seed KEYWORDS below and from the newest items whose
+reporter picked the category. Items it cannot place with MIN_MARGIN to spare
+stay uncategorized.
+
+Matching only compares an item with items of the same or a related category
+(Category.related), plus uncategorized ones, so with C categories a report is
+scored against roughly 1/C of the other side.
+
+Each process builds the taxonomy (classifier and relations) once and rebuilds
+it after CATEGORY_REFRESH_SECONDS, or at once for category changes made in
+this process. `manage.py classify_items` fills in items saved before.
+"""
+import math
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Q
+
+from .blocking import MIN_TOKEN_LENGTH, STOPWORDS
+from .models import Category, FoundItem, LostItem
+from .scoring import normalize_text
+
+# Seed vocabulary by category slug; each phrase counts KEYWORD_WEIGHT times.
+KEYWORDS = {
+    'electronics': [
+        'phone', 'mobile', 'iphone', 'smartphone', 'charger', 'charging cable', 'adapter', 'laptop', 'tablet',
+        'ipad', 'earphones', 'earbuds', 'airpods', 'headphones', 'headset', 'power bank', 'powerbank',
+        'calculator', 'pen drive', 'pendrive', 'usb', 'mouse', 'speaker', 'smartwatch', 'camera',
+    ],
+    'id-cards': [
+        'id card', 'identity card', 'college id', 'aadhaar', 'aadhar', 'pan card', 'licence', 'license',
+        'atm card', 'debit card', 'credit card', 'bus pass', 'hall ticket', 'badge', 'card',
+    ],
+    'keys': ['key', 'keys', 'keychain', 'key chain', 'keyring', 'key ring', 'bike key', 'room key'],
+    'wallets': ['wallet', 'purse', 'card holder', 'cardholder', 'money', 'cash', 'coin pouch'],
+    'bags': ['bag', 'backpack', 'handbag', 'satchel', 'sling bag', 'tote', 'laptop bag', 'pouch', 'duffel'],
+    'clothing': [
+        'jacket', 'hoodie', 'sweater', 'sweatshirt', 'shirt', 'coat', 'lab coat', 'cap', 'hat', 'scarf',
+        'shoes', 'sneakers', 'slippers', 'gloves', 'uniform',
+    ],
+    'accessories': [
+        'watch', 'spectacles', 'glasses', 'sunglasses', 'ring', 'bracelet', 'chain', 'necklace', 'earrings',
+        'umbrella', 'belt', 'hair clip',
+    ],
+    'bottles': ['bottle', 'water bottle', 'flask', 'tumbler', 'sipper', 'lunch box', 'lunchbox', 'tiffin'],
+    'books': [
+        'book', 'notebook', 'textbook', 'record', 'diary', 'file', 'folder', 'pen', 'pencil box', 'geometry box',
+        'stationery', 'notes',
+    ],
+}
+KEYWORD_WEIGHT = 3
+
+# Newest reporter-labelled items per kind the classifier learns from.
+TRAINING_LIMIT = 2000
+
+# Log-posterior lead the best category needs over the runner-up. One generic
+# word ("card", "chain", "pen") or words pointing at different categories
+# fall short and leave the item uncategorized, i.e. matched against everything.
+MIN_MARGIN = 5.0
+
+
+def refresh_seconds():
+    return getattr(settings, 'CATEGORY_REFRESH_SECONDS', 300)
+
+
+def tokens(text):
+    return [token for token in text.split() if len(token) >= MIN_TOKEN_LENGTH and token not in STOPWORDS]
+
+
+class NaiveBayes:
+    """
+    Multinomial naive Bayes over tokens, with add-`alpha` smoothing. A small
+    `alpha` makes a word never seen with a category count against it.
+    """
+
+    def __init__(self, alpha=0.1, min_margin=MIN_MARGIN):
+        self.alpha = alpha
+        self.min_margin = min_margin
+        self.counts = {}      # label -> Counter of token weights
+        self.totals = Counter()
+        self.docs = Counter()
+        self.vocabulary = set()
+
+    def learn(self, label, words, weight=1, document=True):
+        counts = self.counts.setdefault(label, Counter())
+        for word in words:
+            counts[word] += weight
+        self.totals[label] += weight * len(words)
+        self.vocabulary.update(words)
+        if document:
+            self.docs[label] += 1
+
+    def predict(self, words):
+        """The most likely label, or None when no word was seen in training or it leads by less than `min_margin`."""
+        known = [word for word in words if word in self.vocabulary]
+        if not known or not self.counts:
+            return None
+        labels, size = len(self.counts), len(self.vocabulary)
+        documents = sum(self.docs.values())
+
+        def log_posterior(label):
+            # Smoothed prior, so seed-only categories are not ruled out.
+            prior = math.log((self.docs[label] + 1) / (documents + labels))
+            denominator = self.totals[label] + self.alpha * size
+            return prior + sum(math.log((self.counts[label][word] + self.alpha) / denominator) for word in known)
+
+        (best, label), *rest = sorted(((log_posterior(label), label) for label in self.counts), reverse=True)
+        if rest and best - rest[0][0] < self.min_margin:
+            return None
+        return label
+
+
+class Taxonomy:
+    def __init__(self):
+        self.classifier = NaiveBayes()
+        self.related = {}  # category id -> frozenset of comparable category ids
+
+    @classmethod
+    def load(cls):
+        taxonomy = cls()
+        slugs = dict(Category.objects.values_list('slug', 'id'))
+        links = {category_id: {category_id} for category_id in slugs.values()}
+        for from_id, to_id in Category.related.through.objects.values_list('from_category_id', 'to_category_id'):
+            links[from_id].add(to_id)
+            links[to_id].add(from_id)
+        taxonomy.related = {category_id: frozenset(ids) for category_id, ids in links.items()}
+
+        for slug, phrases in KEYWORDS.items():
+            if slug in slugs:
+                for phrase in phrases:
+                    taxonomy.classifier.learn(slugs[slug], tokens(normalize_text(phrase)), KEYWORD_WEIGHT, document=False)
+        for model in (LostItem, FoundItem):
+            labelled = (
+                model.objects.filter(category_by_user=True, category__isnull=False)
+                .order_by('-id').values_list('category_id', 'match_text')[:TRAINING_LIMIT]
+            )
+            for category_id, match_text in labelled:
+                taxonomy.classifier.learn(category_id, tokens(match_text))
+        return taxonomy
+
+
+_taxonomy = None  # (built at, Taxonomy)
+
+
+def taxonomy():
+    global _taxonomy
+    if _taxonomy is None or time.monotonic() - _taxonomy[0] > refresh_seconds():
+        _taxonomy = (time.monotonic(), Taxonomy.load())
+    return _taxonomy[1]
+
+
+def invalidate():
+    global _taxonomy
+    _taxonomy = None
+
+
+def classify(name, match_text):
+    """Category id for an item's name and match text, or None if it cannot tell."""
+    words = tokens(normalize_text(name)) * 2 + tokens(match_text)
+    return taxonomy().classifier.predict(words)
+
+
+def comparable(category_id):
+    """Category ids an item of `category_id` is compared with, or None for all of them."""
+    if category_id is None:
+        return None
+    return taxonomy().related.get(category_id)
+
+
+def in_categories(field, category_ids):
+    """Filter on `field` (a category FK path) for `comparable()` ids; uncategorized items always pass."""
+    return Q(**{f'{field}__in': category_ids}) | Q(**{f'{field}__isnull': True})
@@ -0,0 +1,31 @@
+"""
+A bounded pool for CPU-bound work started from async views.
+
+Async views must not run scoring on the event loop, and spawning a thread per
+request would let a burst of requests oversubscribe the CPU. Work submitted
+here runs on at most CPU_POOL_WORKERS threads; RapidFuzz and NumPy release
+the GIL, so threads are enough. Only pure functions belong here: the pool's
+threads have no request context and should not touch the ORM.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+_pool = None
+
+
+def cpu_pool():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'CPU_POOL_WORKERS', 4), thread_name_prefix='cpu-bound'
+        )
+    return _pool
+
+
+async def run_cpu_bound(func, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(
+        cpu_pool(), functools.partial(func, *args, **kwargs)
+    )
@@ -0,0 +1,191 @@
+"""
+Near-duplicate reports through MinHash signatures and an LSH banding index.
+
+Every item stores a MinHash signature of the character shingles of its
+normalized match text (set with the match text when it is saved; run
+`manage.py backfill_match_text` for items saved before). The share of equal
+positions in two signatures estimates the Jaccard similarity of their
+shingle sets.
+
+The LSH index splits each signature into BANDS bands of ROWS values and
+buckets items by band: items sharing any bucket are candidates, and only those
+are compared, so a lookup does not scan every item. With 16 bands of 4 rows a
+pair at 0.7 similarity shares a bucket 99% of the time, one at 0.3 only 12%.
+
+When a report looks like an open one (the same user's own lost items, or any
+finder's found items), the report views offer to merge it. A merged item is
+closed as MERGED and points at its cluster's primary item, which alone stays
+in the matching pool: the cluster is scored once, as the primary.
+"""
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .lifecycle import close_items
+from .models import MERGED, LostItem
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 4
+
+# Largest prime below 2**32: (a * x + b) % PRIME fits in uint64 and in uint32 after.
+PRIME = 4294967291
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(1, PRIME, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, PRIME, size=NUM_PERM, dtype=np.uint64)
+
+
+def min_similarity():
+    # Estimated Jaccard similarity above which two reports count as duplicates.
+    return getattr(settings, 'DUPLICATE_MIN_SIMILARITY', 0.7)
+
+
+def shingles(text):
+    """Distinct character shingles of a match text (the whole text if it is shorter)."""
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(text):
+    """MinHash signature of a match text as NUM_PERM * 8 hex digits, or '' for no text."""
+    values = shingles(text)
+    if not values:
+        return ''
+    # crc32 rather than hash(): signatures must agree across processes.
+    hashed = np.fromiter((zlib.crc32(value.encode()) for value in values), dtype=np.uint64, count=len(values))
+    permuted = (_A[:, None] * hashed[None, :] + _B[:, None]) % PRIME
+    return permuted.min(axis=1).astype('>u4').tobytes().hex()
+
+
+def _array(signature_hex):
+    return np.frombuffer(bytes.fromhex(signature_hex), dtype='>u4')
+
+
+def similarity(a_hex, b_hex):
+    """Estimated Jaccard similarity of two signatures, or None if either is missing."""
+    if not a_hex or not b_hex:
+        return None
+    return float(np.mean(_array(a_hex) == _array(b_hex)))
+
+
+class MinHashLSH:
+    """Banded LSH over MinHash signatures."""
+
+    def __init__(self):
+        self.tables = [{} for _ in range(BANDS)]
+        # hash() of each item's latest added signature, to skip unchanged re-adds.
+        self.latest = {}
+        self.size = 0
+
+    def _bands(self, signature_hex):
+        array = _array(signature_hex)
+        return [array[i * ROWS:(i + 1) * ROWS].tobytes() for i in range(BANDS)]
+
+    def add(self, signature_hex, item_id):
+        latest = hash(signature_hex)
+        if self.latest.get(item_id) == latest:
+            return
+        self.latest[item_id] = latest
+        self.size += 1
+        for table, key in zip(self.tables, self._bands(signature_hex)):
+            table.setdefault(key, []).append(item_id)
+
+    def candidates(self, signature_hex):
+        """IDs of the items sharing at least one band bucket with the signature."""
+        seen = set()
+        for table, key in zip(self.tables, self._bands(signature_hex)):
+            seen.update(table.get(key, ()))
+        return seen
+
+
+# ---------- PER-PROCESS INDEXES ----------
+_indexes = {}
+
+
+def duplicate_index(model):
+    """
+    LSH index over the signatures of `model` items. Items reported since it
+    was built are added to it, and edited items by `reindex`. Closed and
+    deleted items stay in it, as lookups are verified against the open items
+    anyway. It is rebuilt only when old items gained signatures (a backfill)
+    or after `invalidate`.
+    """
+    signed = model.objects.exclude(match_minhash='')
+    count, last = signed.aggregate(n=Count('id'), last=Max('id')).values()
+    last = last or 0
+    cached = _indexes.get(model)
+    if cached is not None:
+        cached_count, cached_last, index = cached
+        added = list(signed.filter(id__gt=cached_last).values_list('id', 'match_minhash')) if last > cached_last else []
+        # Deletions only lower the count: more signed items than were added means a backfill.
+        if count - len(added) <= cached_count:
+            for item_id, signature_hex in added:
+                index.add(signature_hex, item_id)
+            _indexes[model] = (count, max(last, cached_last), index)
+            return index
+
+    index = MinHashLSH()
+    for item_id, signature_hex in signed.values_list('id', 'match_minhash').iterator():
+        index.add(signature_hex, item_id)
+    _indexes[model] = (count, last, index)
+    return index
+
+
+def reindex(item):
+    """
+    Adds an edited item's changed signature; its old buckets only yield
+    candidates the lookup rejects.
+    """
+    cached = _indexes.get(type(item))
+    if cached is not None and item.match_minhash:
+        cached[2].add(item.match_minhash, item.id)
+
+
+def invalidate(model):
+    _indexes.pop(model, None)
+
+
+def near_duplicate_ids(item):
+    """
+    IDs of the open items `item` looks like a repeat report of, most similar
+    first: the same user's lost items, or found items from any finder.
+    """
+    if not item.match_minhash:
+        return []
+    model = type(item)
+    candidates = duplicate_index(model).candidates(item.match_minhash) - {item.id}
+    if not candidates:
+        return []
+    # Verified against the open items' stored signatures: closed ids drop out
+    # here, and a stale index can only miss.
+    rows = model.objects.open().filter(id__in=candidates)
+    if model is LostItem:
+        rows = rows.filter(user_id=item.user_id)
+    scored = [
+        (similarity(item.match_minhash, signature_hex), item_id)
+        for item_id, signature_hex in rows.exclude(match_minhash='').values_list('id', 'match_minhash')
+    ]
+    threshold = min_similarity()
+    return [item_id for score, item_id in sorted(scored, key=lambda pair: (-pair[0], pair[1])) if score >= threshold]
+
+
+# ---------- MERGING ----------
+def merge(item, into):
+    """
+    Merges the open `item` into the open `into` of the same kind, with the
+    items already merged into `item`. Returns False if either is no longer open.
+    """
+    model = type(item)
+    with transaction.atomic():
+        if not model.objects.open().filter(id=into.id).exists():
+            return False
+        if not close_items(model, [item.id], MERGED):
+            return False
+        model.objects.filter(id=item.id).update(duplicate_of=into)
+        model.objects.filter(duplicate_of=item).update(duplicate_of=into)
+    return True
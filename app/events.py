@@ -0,0 +1,119 @@
+"""
+Server-Sent Events stream of new matches (`/notifications/stream/`).
+
+Matching logs a MatchEvent whenever a lost item gains a candidate it did not
+have before (see matching.py). The stream polls that log for the user's
+events after the last one sent, so it works across the web and worker
+processes with nothing but the database; the (user, id) index keeps each poll
+a short range scan.
+
+Event ids are MatchEvent ids. A reconnecting EventSource sends the last one
+as the Last-Event-ID header and resumes after it; a fresh connection starts
+after the newest existing event.
+
+Under ASGI (`astream`) a connection stays open: a comment line is sent as a
+heartbeat while idle, and it ends after SSE_MAX_DURATION seconds. A WSGI
+worker thread would be held all that time, so the sync view answers with
+`poll` instead: the events so far, then it closes and the browser reconnects
+after SSE_SHORT_POLL_INTERVAL seconds.
+"""
+import asyncio
+import json
+
+from django.conf import settings
+from django.urls import reverse
+
+from .models import MatchEvent
+
+# Events sent per poll; a backlog is drained over consecutive polls.
+BATCH_SIZE = 50
+
+
+def poll_interval():
+    return getattr(settings, 'SSE_POLL_INTERVAL', 2)
+
+
+def heartbeat_interval():
+    return getattr(settings, 'SSE_HEARTBEAT_INTERVAL', 15)
+
+
+def max_duration():
+    return getattr(settings, 'SSE_MAX_DURATION', 300)
+
+
+def short_poll_interval():
+    return getattr(settings, 'SSE_SHORT_POLL_INTERVAL', 10)
+
+
+def last_event_id(request):
+    """The id to resume after (Last-Event-ID header or ?last_event_id=), or None."""
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _events_after(user_id, after):
+    return (
+        MatchEvent.objects.filter(user_id=user_id, id__gt=after)
+        .select_related('lost_item', 'found_item')
+        .order_by('id')[:BATCH_SIZE]
+    )
+
+
+def _latest_query(user_id):
+    return MatchEvent.objects.filter(user_id=user_id).order_by('-id').values_list('id', flat=True)
+
+
+def format_event(event):
+    data = {
+        'lost_item_id': event.lost_item_id,
+        'lost_item_name': event.lost_item.name,
+        'found_item_id': event.found_item_id,
+        'found_item_name': event.found_item.name,
+        'score': event.score,
+        'photo_score': event.photo_score,
+        'url': reverse('view_notification', args=[event.lost_item_id, event.found_item_id]),
+    }
+    return f"id: {event.id}\nevent: match\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def _preamble(seconds):
+    # Reconnect delay for the browser, in milliseconds.
+    return f"retry: {seconds * 1000}\n\n"
+
+
+def poll(user_id, after=None):
+    """Sync SSE generator, for WSGI workers: one batch of events, then the response ends."""
+    if after is None:
+        after = _latest_query(user_id).first() or 0
+    yield _preamble(short_poll_interval())
+    for event in _events_after(user_id, after):
+        after = event.id
+        yield format_event(event)
+    # An id with no data only moves the browser's Last-Event-ID, so the next
+    # poll resumes here even when nothing was sent.
+    yield f"id: {after}\n\n"
+
+
+async def astream(user_id, after=None):
+    """Async SSE generator, for the ASGI profile; idle connections cost no thread."""
+    if after is None:
+        after = await _latest_query(user_id).afirst() or 0
+    yield _preamble(poll_interval())
+    loop = asyncio.get_running_loop()
+    started = last_sent = loop.time()
+    while loop.time() - started < max_duration():
+        events = [event async for event in _events_after(user_id, after)]
+        for event in events:
+            after = event.id
+            yield format_event(event)
+        now = loop.time()
+        if events:
+            last_sent = now
+        elif now - last_sent >= heartbeat_interval():
+            last_sent = now
+            yield ": heartbeat\n\n"
+        if len(events) < BATCH_SIZE:
+            await asyncio.sleep(poll_interval())
@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db.models.functions import Lower
 from .models import LostItem, FoundItem, UserProfile # Import the new model MatchNotificationStatus here as well
 
 # Assuming you have added the phone_number field to the User model via migration 
@@ -67,7 +68,8 @@ class CollegeUserCreationForm(UserCreationForm):
         if domain not in allowed_domains:
             raise ValidationError("❌ Only official college emails are allowed (raghuinstech.com / raghuenggcollege.in).")
 
-        if User.objects.filter(email=email).exists():
+        # Case-insensitive, like login (served by the LOWER(email) index)
+        if User.objects.alias(email_lower=Lower('email')).filter(email_lower=email.lower()).exists():
             raise ValidationError("⚠️ This email is already registered.")
         return email
 
@@ -88,15 +90,30 @@ class CollegeUserCreationForm(UserCreationForm):
         return user
 
 
-class LostItemForm(forms.ModelForm):
+class ItemCategoryMixin:
+    """An optional category; left empty, the classifier picks one when the item is saved."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['category'].empty_label = "Detect automatically"
+
+    def save(self, commit=True):
+        self.instance.category_by_user = self.cleaned_data.get('category') is not None
+        return super().save(commit)
+
+
+class LostItemForm(ItemCategoryMixin, forms.ModelForm):
     class Meta:
         model = LostItem
-        fields = ['name', 'description', 'features', 'photo']
+        fields = ['name', 'category', 'description', 'features', 'photo']
         widgets = {
             'name': forms.TextInput(attrs={
                 'class': 'w-full border border-gray-300 rounded px-3 py-2 focus:outline-none focus:ring-2 focus:ring-blue-600',
                 'placeholder': 'e.g., iPhone 13, Backpack, Keys'
             }),
+            'category': forms.Select(attrs={
+                'class': 'w-full border border-gray-300 rounded px-3 py-2 focus:outline-none focus:ring-2 focus:ring-blue-600',
+            }),
             'description': forms.Textarea(attrs={
                 'class': 'w-full border border-gray-300 rounded px-3 py-2 focus:outline-none focus:ring-2 focus:ring-blue-600',
                 'placeholder': 'Describe your lost item in detail...',
@@ -114,15 +131,18 @@ class LostItemForm(forms.ModelForm):
         }
 
 
-class FoundItemForm(forms.ModelForm):
+class FoundItemForm(ItemCategoryMixin, forms.ModelForm):
     class Meta:
         model = FoundItem
-        fields = ['name', 'description', 'features', 'photo']
+        fields = ['name', 'category', 'description', 'features', 'photo']
         widgets = {
             'name': forms.TextInput(attrs={
                 'class': 'w-full border border-gray-300 rounded px-3 py-2 focus:outline-none focus:ring-2 focus:ring-green-600',
                 'placeholder': 'e.g., iPhone 13, Backpack, Keys'
             }),
+            'category': forms.Select(attrs={
+                'class': 'w-full border border-gray-300 rounded px-3 py-2 focus:outline-none focus:ring-2 focus:ring-green-600',
+            }),
             'description': forms.Textarea(attrs={
                 'class': 'w-full border border-gray-300 rounded px-3 py-2 focus:outline-none focus:ring-2 focus:ring-green-600',
                 'placeholder': 'Describe the found item in detail...',
@@ -139,3 +159,19 @@ class FoundItemForm(forms.ModelForm):
                 'required': 'required'   # Make it mandatory
             }),
         }
+
+
+class FoundItemImportForm(forms.Form):
+    """Admin upload of a security desk export (see importer.py)."""
+    file = forms.FileField(help_text="CSV (name, description, features, photo), JSON array or JSON Lines.")
+    photos = forms.FileField(required=False, help_text="ZIP archive with the photos named in the file.")
+    batch_size = forms.IntegerField(min_value=1, max_value=1000, initial=100)
+
+    def clean_file(self):
+        from .importer import detect_format
+        upload = self.cleaned_data['file']
+        try:
+            self.cleaned_data['format'] = detect_format(upload.name)
+        except ValueError as error:
+            raise ValidationError(str(error))
+        return upload
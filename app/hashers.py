@@ -0,0 +1,18 @@
+"""
+Opt-in cheaper password hashing for login spikes.
+
+TunablePBKDF2PasswordHasher is the preferred hasher (see PASSWORD_HASHERS in
+settings). It behaves like Django's PBKDF2 hasher unless PASSWORD_HASH_ITERATIONS
+is set, in which case it hashes with that many iterations instead. Stored hashes keep their own iteration count, and Django
+rewrites any hash whose count differs from the preferred hasher's at the next
+successful login, so switching the setting on or off migrates users
+gradually in either direction.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
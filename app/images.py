@@ -0,0 +1,121 @@
+"""
+Photo processing for uploaded item photos.
+
+Runs as a background job after an item with a new photo is saved:
+- applies the EXIF orientation and drops all metadata (GPS, camera, ...);
+- downscales the stored original to PHOTO_MAX_DIMENSION;
+- writes fixed-size WebP renditions, recorded in `photo_renditions`;
+- stores the perceptual hashes used for photo matching (see phash.py).
+
+Templates pick a rendition with the `{% photo_url %}` tag (see templatetags/photos.py).
+"""
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from . import phash
+from .phash import compute_hashes
+
+# Longest side, in pixels, of each generated WebP rendition.
+DEFAULT_RENDITIONS = {'thumb': 160, 'medium': 800}
+
+# Pillow format name -> save options for re-encoding the original.
+ORIGINAL_SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 85},
+}
+
+
+def max_dimension():
+    return getattr(settings, 'PHOTO_MAX_DIMENSION', 2048)
+
+
+def rendition_sizes():
+    return getattr(settings, 'PHOTO_RENDITIONS', DEFAULT_RENDITIONS)
+
+
+def needs_processing(item):
+    return bool(item.photo) and item.photo_renditions.get('source') != item.photo.name
+
+
+def _encode(image, fmt, **options):
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def process_photo(item):
+    """
+    Normalizes `item.photo` in place and (re)generates its renditions.
+    Returns (photo_renditions, perceptual hashes); the caller persists them.
+    """
+    storage = item.photo.storage
+    name = item.photo.name
+
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        fmt = image.format if image.format in ORIGINAL_SAVE_OPTIONS else 'JPEG'
+        image = ImageOps.exif_transpose(image)  # also drops the orientation tag
+        image.load()
+
+    if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    image.thumbnail((max_dimension(), max_dimension()), Image.Resampling.LANCZOS)
+
+    # Re-encoding without passing exif/icc info strips the metadata. The
+    # caller releases the upload once the new file is recorded.
+    name = storage.save(name, ContentFile(_encode(image, fmt, **ORIGINAL_SAVE_OPTIONS[fmt])))
+
+    renditions = {'source': name}
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+    for rendition, size in rendition_sizes().items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+        renditions[rendition] = storage.save(f"{rendition}.webp", ContentFile(_encode(resized, 'WEBP', quality=80, method=4)))
+    return renditions, compute_hashes(image)
+
+
+def stored_names(item):
+    """
+    Every stored file reference `item` holds: its renditions, plus the photo
+    itself until it has been processed. A name appears once per reference.
+    """
+    names = list(item.photo_renditions.values())
+    if item.photo and item.photo.name != item.photo_renditions.get('source'):
+        names.append(item.photo.name)
+    return names
+
+
+def process_item_photo(model, item_id):
+    """
+    Job entry point: processes one item's photo if it changed since the last run.
+    A duplicate of an already processed upload reuses that output (see
+    storage.py). Returns True if the photo was processed.
+    """
+    item = model.objects.filter(id=item_id).only('id', 'photo', 'photo_renditions', 'photo_phash').first()
+    if item is None or not needs_processing(item):
+        return False
+    storage = item.photo.storage
+    upload = item.photo.name
+    previous = list(item.photo_renditions.values())
+
+    processed = storage.processed(upload)
+    if processed is None:
+        renditions, hashes = process_photo(item)
+        storage.remember_processed(upload, {'renditions': renditions, 'hashes': hashes})
+    else:
+        renditions, hashes = processed['renditions'], processed['hashes']
+        storage.retain(renditions.values())
+
+    # update() rather than save(): the text did not change, so the token and
+    # search indexes stay valid.
+    model.objects.filter(id=item_id).update(photo=renditions['source'], photo_renditions=renditions, **hashes)
+    phash.reindex(model, item_id, hashes['photo_phash'], item.photo_phash)
+    # Release the upload and the renditions of any photo it replaced.
+    for name in [upload, *previous]:
+        storage.delete(name)
+    return True
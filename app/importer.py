@@ -0,0 +1,221 @@
+"""
+Bulk import of found items handed in at the security desk.
+
+Rows are streamed from a CSV file (header: name, description, features, photo)
+or a JSON file (an array of objects, or one object per line) and validated
+one at a time with FoundItemForm; `photo` names a file in a photo directory or
+ZIP archive. Valid rows are inserted in bulk_create batches, each in its own
+transaction, and every batch is matched with a single job instead of one
+refresh per item, so memory stays flat however long the file is.
+
+bulk_create skips the item signals, so the match text, duplicate signature,
+category, token index and search index are written here (the import
+counterpart of models.py's receivers).
+"""
+import codecs
+import csv
+import json
+import os
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.core.files.base import ContentFile, File
+from django.db import transaction
+
+from . import search
+from .blocking import tokenize
+from .categories import classify
+from .dedup import signature
+from .forms import FoundItemForm
+from .jobs import enqueue
+from .models import FoundItem, ItemToken
+from .scoring import NORMALIZER_VERSION, normalize_text
+
+FORMATS = {'.csv': 'csv', '.json': 'json', '.jsonl': 'json', '.ndjson': 'json'}
+FIELDS = ('name', 'description', 'features')
+
+# Only the first errors are kept for the report; the rest are counted.
+MAX_REPORTED_ERRORS = 100
+
+
+def detect_format(filename):
+    fmt = FORMATS.get(Path(filename).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Cannot tell the format of {filename!r}; expected one of {', '.join(FORMATS)}.")
+    return fmt
+
+
+# ---------- READING ----------
+def _json_records(stream, chunk_size=64 * 1024):
+    """Values of a JSON array or of JSON Lines, decoded chunk by chunk."""
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer, pos, eof, in_array = '', 0, False, None
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < len(buffer):
+            if in_array is None:
+                in_array = buffer[pos] == '['
+                pos += in_array
+                continue
+            if in_array and buffer[pos] == ']':
+                return
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A value ending at the buffer's end may continue in the next chunk.
+                if end < len(buffer) or eof:
+                    yield value
+                    pos = end
+                    continue
+        elif eof:
+            return
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + text.decode(chunk, final=eof)
+        pos = 0
+
+
+def read_rows(stream, fmt):
+    """Yields (row_number, record) from a binary stream in the given format."""
+    if fmt == 'csv':
+        reader = csv.DictReader(codecs.iterdecode(stream, 'utf-8-sig'))
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        yield from enumerate(_json_records(stream), start=1)
+
+
+@contextmanager
+def open_photos(source):
+    """
+    Yields a function returning the photo called `name` as a File, or None if
+    it does not exist. `source` is a directory, a ZIP archive (path or file
+    object) or None.
+    """
+    if source is None:
+        yield lambda name: None
+    elif isinstance(source, (str, Path)) and Path(source).is_dir():
+        root = Path(source).resolve()
+
+        def photo(name):
+            path = (root / name).resolve()
+            if not path.is_relative_to(root) or not path.is_file():
+                return None
+            return File(path.open('rb'), name=path.name)
+
+        yield photo
+    else:
+        with zipfile.ZipFile(source) as archive:
+            members = set(archive.namelist())
+
+            def photo(name):
+                if name not in members:
+                    return None
+                return ContentFile(archive.read(name), name=os.path.basename(name))
+
+            yield photo
+
+
+# ---------- IMPORTING ----------
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors = []  # (row_number, message), at most MAX_REPORTED_ERRORS
+
+    def error(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+
+def _form_errors(form):
+    return '; '.join(
+        f"{field}: {' '.join(errors)}" if field != '__all__' else ' '.join(errors)
+        for field, errors in form.errors.items()
+    )
+
+
+def _build_item(record, user, photos, store_photo):
+    """
+    An unsaved FoundItem for one record (its photo stored if `store_photo`),
+    or raises ValueError with the reason.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("not an object")
+    data = {field: '' if record.get(field) is None else str(record[field]) for field in FIELDS}
+    photo_name = str(record.get('photo') or '')
+    photo = photos(photo_name) if photo_name else None
+    if photo_name and photo is None:
+        raise ValueError(f"photo: {photo_name!r} not found")
+    try:
+        form = FoundItemForm(data=data, files={'photo': photo} if photo else {})
+        if not form.is_valid():
+            raise ValueError(_form_errors(form))
+        item = form.save(commit=False)
+        item.user = user
+        # Set by the pre_save receiver for single saves; bulk_create skips it.
+        item.match_text = normalize_text(item.name, item.description, item.features)
+        item.match_text_version = NORMALIZER_VERSION
+        item.match_minhash = signature(item.match_text)
+        item.category_id = classify(item.name, item.match_text)
+        if store_photo:
+            item.photo.save(photo.name, photo, save=False)
+        return item
+    finally:
+        if photo is not None:
+            photo.close()
+
+
+def _insert_batch(items):
+    """Inserts one batch with its token and search rows, and queues its matching."""
+    try:
+        with transaction.atomic():
+            items = FoundItem.objects.bulk_create(items)
+            ItemToken.objects.bulk_create(
+                ItemToken(found_item=item, token=token) for item in items for token in tokenize(item)
+            )
+            search.index_items('found', items)
+            # Committed with the batch, so a worker never sees half of it.
+            enqueue('match_found_batch', item_ids=[item.id for item in items])
+    except Exception:
+        for item in items:
+            item.photo.storage.delete(item.photo.name)
+        raise
+
+
+def import_found_items(rows, user, photos, batch_size=100, dry_run=False):
+    """
+    Imports (row_number, record) pairs from `read_rows` as FoundItems reported
+    by `user`. Invalid rows are skipped and reported; with `dry_run` rows are
+    only validated. Batches already inserted stay if a later one fails.
+    """
+    result = ImportResult()
+    batch = []
+    for row_number, record in rows:
+        try:
+            item = _build_item(record, user, photos, store_photo=not dry_run)
+        except ValueError as error:
+            result.error(row_number, str(error))
+            continue
+        if dry_run:
+            result.created += 1
+            continue
+        batch.append(item)
+        if len(batch) >= batch_size:
+            _insert_batch(batch)
+            result.created += len(batch)
+            result.batches += 1
+            batch = []
+    if batch:
+        _insert_batch(batch)
+        result.created += len(batch)
+        result.batches += 1
+    return result
@@ -0,0 +1,153 @@
+"""
+A small database-backed job queue.
+
+Work is queued as Job rows with `enqueue()` and executed by
+`manage.py runworker`, which claims jobs with an atomic conditional UPDATE
+(safe across several worker processes on SQLite) and runs their handlers in a
+thread pool. Failed jobs are retried with exponential backoff; finished ones
+are deleted by the worker after JOBS_KEEP_DONE_HOURS.
+
+Set JOBS_RUN_INLINE = True to run handlers immediately instead (used by tests).
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .images import process_item_photo
+from .matching import refresh_candidates_for_found, refresh_candidates_for_found_items, refresh_candidates_for_lost
+from .models import Job, LostItem, FoundItem
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def handler(name):
+    """Registers a function as the handler for jobs called `name`."""
+    def register(func):
+        HANDLERS[name] = func
+        return func
+    return register
+
+
+def run_inline():
+    return getattr(settings, 'JOBS_RUN_INLINE', False)
+
+
+def enqueue(name, delay=0, max_attempts=None, **payload):
+    """Queues a job; the row only becomes visible to workers once committed."""
+    if name not in HANDLERS:
+        raise ValueError(f"No job handler registered for {name!r}.")
+    if run_inline():
+        HANDLERS[name](**payload)
+        return None
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or getattr(settings, 'JOBS_MAX_ATTEMPTS', 5),
+    )
+
+
+# ---------- WORKER SIDE ----------
+def claim(worker_id, batch_size=10):
+    """
+    Claims up to `batch_size` due jobs for `worker_id`. A job is only claimed if
+    the conditional UPDATE still finds the row as it was read, so two workers
+    never run the same job. RUNNING jobs whose lock expired (a crashed worker) are reclaimed.
+    """
+    now = timezone.now()
+    lock_expired = now - timedelta(seconds=getattr(settings, 'JOBS_LOCK_TIMEOUT', 600))
+    due = (
+        Job.objects.filter(status=Job.PENDING, run_after__lte=now)
+        | Job.objects.filter(status=Job.RUNNING, locked_at__lt=lock_expired)
+    )
+
+    claimed = []
+    rows = due.order_by('run_after', 'id').values_list('id', 'status', 'locked_at')[:batch_size]
+    for job_id, status, locked_at in rows:
+        # Optimistic lock: only succeeds if nobody claimed the row in between.
+        updated = Job.objects.filter(id=job_id, status=status, locked_at=locked_at).update(
+            status=Job.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(job_id)
+    return list(Job.objects.filter(id__in=claimed, locked_by=worker_id).order_by('id'))
+
+
+def keep_done():
+    return timedelta(hours=getattr(settings, 'JOBS_KEEP_DONE_HOURS', 24))
+
+
+def prune_done(now=None):
+    """Deletes jobs that finished more than JOBS_KEEP_DONE_HOURS ago. Returns how many."""
+    cutoff = (now or timezone.now()) - keep_done()
+    deleted, _ = Job.objects.filter(status=Job.DONE, finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def backoff_seconds(attempts):
+    base = getattr(settings, 'JOBS_RETRY_BASE_SECONDS', 5)
+    return min(base * 2 ** (attempts - 1), 3600)
+
+
+def execute(job):
+    """Runs one claimed job and records the outcome. Returns True on success."""
+    try:
+        func = HANDLERS.get(job.name)
+        if func is None:
+            raise LookupError(f"No job handler registered for {job.name!r}.")
+        func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Job %s (%s) failed on attempt %s", job.id, job.name, job.attempts)
+        if job.attempts >= job.max_attempts:
+            Job.objects.filter(id=job.id).update(status=Job.FAILED, last_error=error, locked_by='')
+        else:
+            Job.objects.filter(id=job.id).update(
+                status=Job.PENDING,
+                last_error=error,
+                locked_by='',
+                run_after=timezone.now() + timedelta(seconds=backoff_seconds(job.attempts)),
+            )
+        return False
+    else:
+        Job.objects.filter(id=job.id).update(status=Job.DONE, locked_by='', finished_at=timezone.now())
+        return True
+
+
+# ---------- HANDLERS ----------
+@handler('refresh_lost_candidates')
+def refresh_lost_candidates(item_id):
+    lost_item = LostItem.objects.open().filter(id=item_id).first()
+    if lost_item is not None:
+        refresh_candidates_for_lost(lost_item)
+
+
+@handler('refresh_found_candidates')
+def refresh_found_candidates(item_id):
+    found_item = FoundItem.objects.open().filter(id=item_id).first()
+    if found_item is not None:
+        refresh_candidates_for_found(found_item)
+
+
+@handler('process_photo')
+def process_photo(kind, item_id):
+    if process_item_photo(LostItem if kind == 'lost' else FoundItem, item_id):
+        # Re-match now that the photo hash is known.
+        enqueue(f'refresh_{kind}_candidates', item_id=item_id)
+
+
+@handler('match_found_batch')
+def match_found_batch(item_ids):
+    # Bulk-imported items (see importer.py): process every photo, then match once.
+    for item_id in item_ids:
+        process_item_photo(FoundItem, item_id)
+    refresh_candidates_for_found_items(FoundItem.objects.open().filter(id__in=item_ids))
@@ -0,0 +1,148 @@
+"""
+Item lifecycle: open -> resolved / expired -> archived.
+
+Only OPEN items are matched and listed. An accepted match resolves both of
+its items; open items older than ITEM_EXPIRE_AFTER_DAYS expire. A closed
+item leaves the matching pool at once: its tokens, candidates and search row
+are dropped, so blocking and scoring never see it again.
+
+`manage.py archive_items` then moves items closed more than
+ITEM_ARCHIVE_AFTER_DAYS ago, with their match statuses, into the archive
+tables in batches. The archived row takes over the item's references to its
+stored photo files (see storage.py), so the files stay until it is deleted;
+run `manage.py migrate_media` first so photos saved before that are tracked.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import notification_cache, search
+from .images import stored_names
+from .models import (
+    EXPIRED, OPEN, RESOLVED, ArchivedItem, ArchivedMatchStatus, FoundItem, ItemToken, LostItem,
+    MatchCandidate, MatchNotificationStatus,
+)
+
+
+def expire_after():
+    return timedelta(days=getattr(settings, 'ITEM_EXPIRE_AFTER_DAYS', 90))
+
+
+def archive_after():
+    return timedelta(days=getattr(settings, 'ITEM_ARCHIVE_AFTER_DAYS', 180))
+
+
+def _kind(model):
+    return 'lost' if model is LostItem else 'found'
+
+
+def leave_pool(model, ids):
+    """Drops the tokens, candidates and search rows of items that are no longer open."""
+    field = f'{_kind(model)}_item'
+    with transaction.atomic():
+        candidates = MatchCandidate.objects.filter(**{f'{field}_id__in': ids})
+        owners = set(candidates.values_list('lost_item__user_id', flat=True))
+        if model is LostItem:
+            owners.update(LostItem.objects.filter(id__in=ids).values_list('user_id', flat=True))
+        candidates.delete()
+        ItemToken.objects.filter(**{f'{field}_id__in': ids}).delete()
+        search.remove_items(_kind(model), ids)
+    notification_cache.invalidate(owners)
+
+
+def close_items(model, ids, status):
+    """Closes the open items of `model` among `ids` with `status`. Returns how many."""
+    with transaction.atomic():
+        ids = list(model.objects.open().filter(id__in=ids).values_list('id', flat=True))
+        if not ids:
+            return 0
+        # update() rather than save(): the item receivers would re-index them.
+        # Still filtered on OPEN, so an item another process closed meanwhile
+        # keeps its status and closed_at.
+        closed = model.objects.filter(id__in=ids, status=OPEN).update(status=status, closed_at=timezone.now())
+        leave_pool(model, ids)
+    return closed
+
+
+def resolve_matches(pairs):
+    """Resolves both items of each accepted (lost_id, found_id) pair."""
+    pairs = list(pairs)
+    close_items(LostItem, [lost_id for lost_id, _ in pairs], RESOLVED)
+    close_items(FoundItem, [found_id for _, found_id in pairs], RESOLVED)
+
+
+def expiring(model, now=None):
+    """Open items reported more than ITEM_EXPIRE_AFTER_DAYS ago."""
+    return model.objects.open().filter(date_reported__lt=(now or timezone.now()) - expire_after())
+
+
+def expire_items(model, batch_size=500, now=None):
+    """Expires every expiring item of `model`, one transaction per batch. Returns how many."""
+    expired = 0
+    while True:
+        ids = list(expiring(model, now).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return expired
+        expired += close_items(model, ids, EXPIRED)
+
+
+# ---------- ARCHIVE ----------
+def archivable(model, now=None):
+    """Items closed more than ITEM_ARCHIVE_AFTER_DAYS ago."""
+    cutoff = (now or timezone.now()) - archive_after()
+    return model.objects.exclude(status=OPEN).filter(closed_at__lt=cutoff)
+
+
+def archive_batch(model, ids):
+    """Moves one batch of closed items and their match statuses to the archive tables."""
+    kind = _kind(model)
+    with transaction.atomic():
+        items = list(model.objects.exclude(status=OPEN).filter(id__in=ids))
+        # Items archived by an earlier, interrupted run already hold their photo references.
+        archived = set(
+            ArchivedItem.objects.filter(kind=kind, original_id__in=ids).values_list('original_id', flat=True)
+        )
+        inserted = [item for item in items if item.id not in archived]
+        ArchivedItem.objects.bulk_create([
+            ArchivedItem(
+                kind=kind,
+                original_id=item.id,
+                user_id=item.user_id,
+                name=item.name,
+                description=item.description,
+                features=item.features,
+                photo=item.photo.name or None,
+                photo_renditions=item.photo_renditions,
+                status=item.status,
+                date_reported=item.date_reported,
+                closed_at=item.closed_at,
+            )
+            for item in inserted
+        ], ignore_conflicts=True)
+        ArchivedMatchStatus.objects.bulk_create([
+            ArchivedMatchStatus(
+                lost_item_id=status.lost_item_id,
+                found_item_id=status.found_item_id,
+                notified_user_id=status.notified_user_id,
+                status=status.status,
+                date_updated=status.date_updated,
+            )
+            for status in MatchNotificationStatus.objects.filter(**{f'{kind}_item__in': items})
+        ], ignore_conflicts=True)
+        # Deleting the items releases their photo references; the archive keeps them.
+        for item in inserted:
+            item.photo.storage.retain(stored_names(item))
+        model.objects.filter(id__in=[item.id for item in items]).delete()
+    return len(items)
+
+
+def archive_items(model, batch_size=500, now=None):
+    """Archives every archivable item of `model`, one transaction per batch. Returns how many."""
+    archived = 0
+    while True:
+        ids = list(archivable(model, now).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return archived
+        archived += archive_batch(model, ids)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from app import lifecycle
+from app.models import LostItem, FoundItem
+
+
+class Command(BaseCommand):
+    help = (
+        "Expires open items past ITEM_EXPIRE_AFTER_DAYS, then moves items closed more than "
+        "ITEM_ARCHIVE_AFTER_DAYS ago, with their match statuses, into the archive tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Items per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count what would change.")
+
+    def handle(self, *args, **options):
+        for model in (LostItem, FoundItem):
+            label = model._meta.verbose_name_plural.lower()
+            if options['dry_run']:
+                self.stdout.write(
+                    f"{label}: {lifecycle.expiring(model).count()} to expire, "
+                    f"{lifecycle.archivable(model).count()} to archive."
+                )
+                continue
+            expired = lifecycle.expire_items(model, batch_size=options['batch_size'])
+            archived = lifecycle.archive_items(model, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"{label}: expired {expired}, archived {archived}."))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from app.dedup import signature
+from app.models import LostItem, FoundItem
+from app.scoring import NORMALIZER_VERSION, normalize_text
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrites the stored normalized match text of items built by an older normalizer version, "
+        "and the near-duplicate signature of items saved without one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        updated = 0
+        for model in (LostItem, FoundItem):
+            stale = model.objects.filter(
+                ~Q(match_text_version=NORMALIZER_VERSION) | (Q(match_minhash='') & ~Q(match_text=''))
+            )
+            while True:
+                # bulk_update skips save(), so the FTS triggers and post_save
+                # re-matching are not fired for an unchanged item text.
+                items = list(stale.only('id', 'name', 'description', 'features')[:batch_size])
+                if not items:
+                    break
+                for item in items:
+                    item.match_text = normalize_text(item.name, item.description, item.features)
+                    item.match_text_version = NORMALIZER_VERSION
+                    item.match_minhash = signature(item.match_text)
+                model.objects.bulk_update(items, ['match_text', 'match_text_version', 'match_minhash'])
+                updated += len(items)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled match text for {updated} item(s) (normalizer v{NORMALIZER_VERSION})."
+        ))
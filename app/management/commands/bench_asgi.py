@@ -0,0 +1,161 @@
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from app.management.commands.run_benchmarks import git_revision, percentile
+from app.management.commands.seed_items import SEED_PASSWORD
+from app.models import LostItem
+
+# Server command and environment per profile. Each runs a single worker, so
+# the numbers compare what one worker process can serve.
+PROFILES = {
+    'wsgi': (['gunicorn', 'project.wsgi', '--workers', '1', '--bind', '127.0.0.1:{port}'], {'ASYNC_VIEWS': '0'}),
+    'asgi': (
+        ['uvicorn', 'project.asgi:application', '--workers', '1', '--port', '{port}', '--no-access-log'],
+        {'ASYNC_VIEWS': '1'},
+    ),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"Server exited with code {process.returncode}.")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server did not listen on port {port} within {timeout}s.")
+
+
+def logged_in_opener(base_url, username):
+    """A urllib opener holding a session for `username`, a seeded account."""
+    cookies = CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies))
+    opener.open(f"{base_url}/login/").read()
+    csrf = next((cookie.value for cookie in cookies if cookie.name == 'csrftoken'), '')
+    data = urllib.parse.urlencode({'email': username, 'password': SEED_PASSWORD, 'csrfmiddlewaretoken': csrf})
+    opener.open(urllib.request.Request(
+        f"{base_url}/login/", data=data.encode(), headers={'Referer': f"{base_url}/login/"}
+    )).read()
+    if not any(cookie.name == 'sessionid' for cookie in cookies):
+        raise CommandError(f"Could not log in as {username}; was it created by `manage.py seed_items`?")
+    return opener
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the WSGI (gunicorn, sync views) and ASGI (uvicorn, async views) profiles by "
+        "serving concurrent dashboard loads from one worker of each. Needs a seeded database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', choices=sorted(PROFILES), default=sorted(PROFILES, reverse=True))
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                            help="Concurrent clients per run.")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per concurrency level.")
+        parser.add_argument('--path', default='/dashboard/')
+        parser.add_argument('--output', default='benchmark-results',
+                            help="Directory (or .json file) the results are written to.")
+
+    def handle(self, *args, **options):
+        usernames = list(
+            LostItem.objects.filter(user__username__startswith='seed', matchcandidate__isnull=False)
+            .values_list('user__username', flat=True).distinct()[:max(options['concurrency'])]
+        )
+        if not usernames:
+            raise CommandError("No seeded users with matches; run `manage.py seed_items` first.")
+
+        results = {
+            'revision': git_revision(),
+            'timestamp': timezone.now().isoformat(),
+            'path': options['path'],
+            'profiles': {},
+        }
+        for profile in options['profiles']:
+            command, env = PROFILES[profile]
+            if shutil.which(command[0]) is None:
+                raise CommandError(f"`{command[0]}` is not installed; see requirements.txt.")
+            port = free_port()
+            process = subprocess.Popen(
+                [part.format(port=port) for part in command],
+                cwd=settings.BASE_DIR,
+                env={**os.environ, **env},
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_for_port(port, process)
+                results['profiles'][profile] = self.run_profile(profile, f"http://127.0.0.1:{port}", usernames, options)
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+
+        output = Path(options['output'])
+        if output.suffix != '.json':
+            output.mkdir(parents=True, exist_ok=True)
+            output = output / f"{timezone.now():%Y%m%d-%H%M%S}-{results['revision']}-asgi.json"
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+    def run_profile(self, profile, base_url, usernames, options):
+        openers = [logged_in_opener(base_url, username) for username in usernames]
+        url = base_url + options['path']
+        openers[0].open(url).read()  # warm-up
+
+        runs = {}
+        for concurrency in options['concurrency']:
+            def load(index):
+                start = time.perf_counter()
+                try:
+                    with openers[index % concurrency % len(openers)].open(url) as response:
+                        response.read()
+                        status = response.status
+                except urllib.error.HTTPError as error:
+                    status = error.code
+                return (time.perf_counter() - start) * 1000, status
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                samples = list(pool.map(load, range(options['requests'])))
+            elapsed = time.perf_counter() - start
+
+            latencies = [latency for latency, _ in samples]
+            errors = sum(1 for _, status in samples if status != 200)
+            runs[concurrency] = stats = {
+                'requests_per_second': round(len(samples) / elapsed, 1),
+                'latency_ms': {
+                    'p50': round(percentile(latencies, 50), 2),
+                    'p99': round(percentile(latencies, 99), 2),
+                    'mean': round(statistics.fmean(latencies), 2),
+                },
+                'errors': errors,
+            }
+            self.stdout.write(
+                f"{profile:<5} c={concurrency:<4} {stats['requests_per_second']:>8.1f} req/s  "
+                f"p50 {stats['latency_ms']['p50']:>8.2f} ms  p99 {stats['latency_ms']['p99']:>8.2f} ms  "
+                f"errors {errors}"
+            )
+        return runs
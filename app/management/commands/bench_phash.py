@@ -0,0 +1,77 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.phash import MultiIndexHash, hamming, max_distance
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def clustered_hashes(rng, count):
+    """
+    Synthetic 64-bit hashes: groups of near-duplicates (a few bits flipped off a
+    base hash), like several photos of similar items.
+    """
+    hashes = []
+    while len(hashes) < count:
+        base = rng.getrandbits(64)
+        for _ in range(rng.randint(1, 5)):
+            value = base
+            for bit in rng.sample(range(64), rng.randint(0, 6)):
+                value ^= 1 << bit
+            hashes.append(value)
+    return hashes[:count]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks similar-photo lookups in the pHash multi-index hash against a linear scan "
+        "for growing corpus sizes (synthetic hashes, no database needed)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="Corpus sizes to benchmark.")
+        parser.add_argument('--queries', type=int, default=200, help="Lookups per corpus size.")
+        parser.add_argument('--radius', type=int, help="Hamming radius (default: PHOTO_MATCH_MAX_DISTANCE).")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        radius = max_distance() if options['radius'] is None else options['radius']
+        self.stdout.write(
+            f"radius {radius}  {'size':>8}  {'compared':>9}  {'compared %':>9}  "
+            f"{'index ms':>8}  {'scan ms':>8}  {'matches':>7}"
+        )
+        for size in options['sizes']:
+            rng = random.Random(options['seed'])
+            hashes = clustered_hashes(rng, size)
+            index = MultiIndexHash()
+            for item_id, value in enumerate(hashes):
+                index.add(value, item_id)
+            # Half the probes are perturbed copies of stored photos, half unrelated photos.
+            probes = [
+                rng.choice(hashes) ^ (1 << rng.randrange(64)) if i % 2 else rng.getrandbits(64)
+                for i in range(options['queries'])
+            ]
+
+            compared_counts, index_ms, matches = [], [], []
+            for probe in probes:
+                start = time.perf_counter()
+                found, compared = index.search(probe, radius)
+                index_ms.append((time.perf_counter() - start) * 1000)
+                compared_counts.append(compared)
+                matches.append(len(found))
+
+            scan_ms = []
+            for probe in probes[:min(len(probes), 20)]:
+                start = time.perf_counter()
+                sum(1 for value in hashes if hamming(probe, value) <= radius)
+                scan_ms.append((time.perf_counter() - start) * 1000)
+
+            mean_compared = statistics.fmean(compared_counts)
+            self.stdout.write(
+                f"{'':9}{size:>8}  {mean_compared:>9.0f}  {100 * mean_compared / size:>8.1f}%  "
+                f"{statistics.median(index_ms):>8.3f}  {statistics.median(scan_ms):>8.3f}  "
+                f"{statistics.fmean(matches):>7.1f}"
+            )
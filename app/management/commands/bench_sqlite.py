@@ -0,0 +1,153 @@
+import json
+import multiprocessing
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.management.commands.run_benchmarks import git_revision, percentile
+from app.sqlite import pragmas
+
+# 'default' is what the project ran with before: rollback journal, FULL sync,
+# deferred transactions and a new connection per request. 'tuned' applies
+# SQLITE_PRAGMAS, BEGIN IMMEDIATE and one persistent connection per worker.
+PROFILES = ('default', 'tuned')
+
+SCHEMA = """
+CREATE TABLE item (id INTEGER PRIMARY KEY, user_id INTEGER, name TEXT, date_reported REAL);
+CREATE INDEX item_user_date ON item (user_id, date_reported DESC);
+CREATE TABLE session (session_key TEXT PRIMARY KEY, session_data TEXT, expire_date REAL);
+"""
+
+
+def create_database(path, items, users):
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    rng = random.Random(0)
+    connection.executemany(
+        "INSERT INTO item (user_id, name, date_reported) VALUES (?, ?, ?)",
+        ((rng.randrange(users), f"item {i}", time.time() - rng.random() * 1e6) for i in range(items)),
+    )
+    connection.executemany(
+        "INSERT INTO session VALUES (?, ?, ?)", ((f"s{u}", 'x' * 200, time.time()) for u in range(users))
+    )
+    connection.commit()
+    connection.close()
+
+
+def connect(path, profile, tuned_pragmas):
+    # isolation_level=None: transactions are issued explicitly below, like Django's autocommit.
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+    if profile == 'tuned':
+        for name, value in sorted(tuned_pragmas.items(), key=lambda item: item[0] != 'busy_timeout'):
+            connection.execute(f"PRAGMA {name} = {value}")
+    return connection
+
+
+def request(connection, profile, rng, users, write_ratio):
+    """One simulated request: a dashboard-style read, or a report POST plus session save."""
+    user = rng.randrange(users)
+    if rng.random() >= write_ratio:
+        connection.execute(
+            "SELECT id, name FROM item WHERE user_id = ? ORDER BY date_reported DESC LIMIT 21", (user,)
+        ).fetchall()
+        connection.execute("SELECT session_data FROM session WHERE session_key = ?", (f"s{user}",)).fetchone()
+        return
+    connection.execute('BEGIN IMMEDIATE' if profile == 'tuned' else 'BEGIN')
+    try:
+        connection.execute("SELECT session_data FROM session WHERE session_key = ?", (f"s{user}",)).fetchone()
+        connection.execute(
+            "INSERT INTO item (user_id, name, date_reported) VALUES (?, ?, ?)", (user, 'report', time.time())
+        )
+        connection.execute("UPDATE session SET expire_date = ? WHERE session_key = ?", (time.time(), f"s{user}"))
+        connection.execute('COMMIT')
+    except sqlite3.OperationalError:
+        connection.execute('ROLLBACK')
+        raise
+
+
+def worker(args):
+    path, profile, tuned_pragmas, seconds, users, write_ratio, seed = args
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    persistent = connect(path, profile, tuned_pragmas) if profile == 'tuned' else None
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        connection = persistent or connect(path, profile, tuned_pragmas)
+        try:
+            request(connection, profile, rng, users, write_ratio)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except sqlite3.OperationalError:
+            errors += 1  # "database is locked" after the busy timeout
+        finally:
+            if persistent is None:
+                connection.close()
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares request throughput of the default and tuned SQLite profiles with several "
+        "worker processes reading and writing one database file, like gunicorn workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+        parser.add_argument('--seconds', type=float, default=5, help="Duration of each run.")
+        parser.add_argument('--write-ratio', type=float, default=0.2, help="Share of requests that write.")
+        parser.add_argument('--items', type=int, default=20_000)
+        parser.add_argument('--users', type=int, default=2_000)
+        parser.add_argument('--output', default='benchmark-results',
+                            help="Directory (or .json file) the results are written to.")
+
+    def handle(self, *args, **options):
+        results = {
+            'revision': git_revision(),
+            'timestamp': timezone.now().isoformat(),
+            'write_ratio': options['write_ratio'],
+            'runs': [],
+        }
+        self.stdout.write(f"{'profile':<8} {'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'locked':>7}")
+        for workers in options['workers']:
+            for profile in PROFILES:
+                with tempfile.TemporaryDirectory() as directory:
+                    path = str(Path(directory) / 'bench.sqlite3')
+                    create_database(path, options['items'], options['users'])
+                    jobs = [
+                        (path, profile, pragmas(), options['seconds'], options['users'], options['write_ratio'], seed)
+                        for seed in range(workers)
+                    ]
+                    with multiprocessing.get_context('fork').Pool(workers) as pool:
+                        outcomes = pool.map(worker, jobs)
+
+                latencies = [latency for samples, _ in outcomes for latency in samples]
+                errors = sum(errors for _, errors in outcomes)
+                run = {
+                    'profile': profile,
+                    'workers': workers,
+                    'requests_per_second': round(len(latencies) / options['seconds'], 1),
+                    'latency_ms': {
+                        'p50': round(percentile(latencies, 50), 3) if latencies else None,
+                        'p99': round(percentile(latencies, 99), 3) if latencies else None,
+                        'mean': round(statistics.fmean(latencies), 3) if latencies else None,
+                    },
+                    'locked_errors': errors,
+                }
+                results['runs'].append(run)
+                self.stdout.write(
+                    f"{profile:<8} {workers:>7} {run['requests_per_second']:>9.1f} "
+                    f"{run['latency_ms']['p50'] or 0:>8.2f} {run['latency_ms']['p99'] or 0:>8.2f} {errors:>7}"
+                )
+
+        output = Path(options['output'])
+        if output.suffix != '.json':
+            output.mkdir(parents=True, exist_ok=True)
+            output = output / f"{timezone.now():%Y%m%d-%H%M%S}-{results['revision']}-sqlite.json"
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from app.categories import classify
+from app.models import LostItem, FoundItem
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills in the category of items saved without one, using the local classifier. "
+        "Categories picked by reporters are never changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--reclassify', action='store_true',
+                            help="Also re-run the classifier on items it categorized before.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the changes.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        changed = 0
+        for model in (LostItem, FoundItem):
+            items = model.objects.filter(category_by_user=False).order_by('id')
+            if not options['reclassify']:
+                items = items.filter(category__isnull=True)
+            last_id = 0
+            while True:
+                # Keyset batches: items the classifier cannot place stay uncategorized.
+                batch = list(items.filter(id__gt=last_id).only('id', 'name', 'match_text', 'category')[:batch_size])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                updated = []
+                for item in batch:
+                    category_id = classify(item.name, item.match_text)
+                    if category_id != item.category_id:
+                        item.category_id = category_id
+                        updated.append(item)
+                # bulk_update skips save(): nothing is re-indexed or re-matched here.
+                if updated and not options['dry_run']:
+                    model.objects.bulk_update(updated, ['category'])
+                changed += len(updated)
+
+        verb = "Would categorize" if options['dry_run'] else "Categorized"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {changed} item(s)."))
+        if changed and not options['dry_run']:
+            self.stdout.write("Run `manage.py rebuild_match_candidates` to re-match them by category.")
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.backends import find_user
+from app.importer import detect_format, import_found_items, open_photos, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports found items from a CSV or JSON file (name, description, features, photo), "
+        "inserting them in batches and matching each batch once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV, JSON array or JSON Lines file.")
+        parser.add_argument('--user', required=True, help="Username or email of the account reporting the items.")
+        parser.add_argument('--photos', help="Directory or ZIP archive holding the photos named in the file.")
+        parser.add_argument('--format', choices=['csv', 'json'], help="Default: from the file extension.")
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--dry-run', action='store_true', help="Only validate the rows.")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        user = find_user(options['user'])
+        if user is None:
+            raise CommandError(f"No user {options['user']!r}.")
+        try:
+            fmt = options['format'] or detect_format(path.name)
+        except ValueError as error:
+            raise CommandError(error)
+        if options['photos'] and not Path(options['photos']).exists():
+            raise CommandError(f"No photo directory or archive at {options['photos']}.")
+
+        with path.open('rb') as stream, open_photos(options['photos']) as photos:
+            try:
+                result = import_found_items(
+                    read_rows(stream, fmt), user, photos,
+                    batch_size=options['batch_size'], dry_run=options['dry_run'],
+                )
+            except ValueError as error:  # malformed JSON
+                raise CommandError(f"Could not read {path}: {error}")
+
+        for row_number, message in result.errors:
+            self.stderr.write(f"Row {row_number}: {message}")
+        if result.failed > len(result.errors):
+            self.stderr.write(f"... and {result.failed - len(result.errors)} more invalid row(s).")
+        if options['dry_run']:
+            self.stdout.write(f"{result.created} valid row(s), {result.failed} invalid.")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Imported {result.created} found item(s) in {result.batches} batch(es); "
+                f"skipped {result.failed} invalid row(s)."
+            ))
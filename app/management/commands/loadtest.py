@@ -0,0 +1,282 @@
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from http.cookiejar import CookieJar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from app.management.commands.bench_asgi import free_port, wait_for_port
+from app.management.commands.run_benchmarks import git_revision, percentile
+from app.models import FoundItem
+
+# Server command and environment per profile, as in Procfile and Procfile.asgi.
+SERVERS = {
+    'wsgi': (
+        ['gunicorn', 'project.wsgi', '--worker-class', 'gthread', '--threads', '16',
+         '--workers', '{workers}', '--bind', '127.0.0.1:{port}'],
+        {'ASYNC_VIEWS': '0'},
+    ),
+    'asgi': (
+        ['uvicorn', 'project.asgi:application', '--workers', '{workers}', '--port', '{port}', '--no-access-log'],
+        {'ASYNC_VIEWS': '1', 'DB_CONN_MAX_AGE': '0'},
+    ),
+}
+
+# See SQLITE_PROFILE in settings. journal_mode is stored in the database
+# file, so each run's copy is switched to the profile's mode first.
+SQLITE_PROFILES = {'default': 'DELETE', 'tuned': 'WAL'}
+
+PASSWORD = 'load-test-pass-123'
+NOTIFICATION_LINK = re.compile(r'/notification/(\d+)/(\d+)/"')
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Leaves redirects to the caller, so every request is timed on its own."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def label(method, path):
+    try:
+        name = resolve(urllib.parse.urlsplit(path).path).url_name
+    except Resolver404:
+        name = path
+    return f"{method} {name}"
+
+
+class VirtualUser:
+    """One student going through the whole flow, with its own cookies."""
+
+    def __init__(self, base_url, samples, texts, rng, options):
+        self.base_url = base_url
+        self.samples = samples
+        self.texts = texts
+        self.rng = rng
+        self.options = options
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies), NoRedirect)
+
+    def request(self, path, data=None, expect=200):
+        """Returns the response body, or None when the status is not `expect`."""
+        url = self.base_url + path
+        if data is not None:
+            csrf = next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+            data = urllib.parse.urlencode({**data, 'csrfmiddlewaretoken': csrf}).encode()
+        start = time.perf_counter()
+        try:
+            with self.opener.open(urllib.request.Request(url, data=data, headers={'Referer': url}), timeout=60) as response:
+                body, status = response.read(), response.status
+        except urllib.error.HTTPError as error:
+            body, status = error.read(), error.code
+        except OSError:
+            body, status = b'', None
+        elapsed = (time.perf_counter() - start) * 1000
+        self.samples.append((label('POST' if data is not None else 'GET', path), elapsed, status == expect))
+        time.sleep(self.options['think_time'])
+        return body.decode('utf-8', 'replace') if status == expect else None
+
+    def run_flow(self, username):
+        """signup -> login -> report lost -> dashboard -> notification -> accept. Returns the outcome."""
+        self.cookies.clear()
+        email = f"{username}@raghuinstech.com"
+        steps = [
+            ('/signup/', None, 200),
+            ('/signup/', {'username': username, 'email': email, 'phone_number': '9000000000',
+                          'password1': PASSWORD, 'password2': PASSWORD}, 302),
+            ('/login/', None, 200),
+            ('/login/', {'email': email, 'password': PASSWORD}, 302),
+            ('/report-lost/', None, 200),
+            ('/report-lost/', dict(zip(('name', 'description', 'features'), self.rng.choice(self.texts))), 302),
+        ]
+        for path, data, expect in steps:
+            if self.request(path, data, expect) is None:
+                return 'failed'
+
+        # Matching runs in the worker, so the notification can take a moment.
+        for attempt in range(self.options['match_polls']):
+            dashboard = self.request('/dashboard/')
+            if dashboard is None:
+                return 'failed'
+            link = NOTIFICATION_LINK.search(dashboard)
+            if link:
+                break
+            time.sleep(0.2)
+        else:
+            return 'unmatched'
+
+        lost_id, found_id = link.groups()
+        if self.request(f'/notification/{lost_id}/{found_id}/') is None:
+            return 'failed'
+        if self.request(f'/notification/action/{lost_id}/{found_id}/accept/', {}, expect=302) is None:
+            return 'failed'
+        return 'completed'
+
+
+def copy_database(source, target, journal_mode):
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+        dst.execute(f'PRAGMA journal_mode = {journal_mode}')
+    finally:
+        src.close()
+        dst.close()
+
+
+def summarize(samples):
+    latencies = [elapsed for _, elapsed, _ in samples]
+    errors = sum(1 for _, _, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'mean': round(statistics.fmean(latencies), 2),
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests a locally started server with virtual users going through signup, login, "
+        "report lost, dashboard, notification and accept, for each server and SQLite profile. "
+        "Each run works on a copy of the (seeded) database, with `runworker` doing the matching."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=sorted(SERVERS, reverse=True))
+        parser.add_argument('--sqlite-profiles', nargs='+', choices=sorted(SQLITE_PROFILES), default=['tuned'])
+        parser.add_argument('--users', type=int, default=20, help="Concurrent virtual users.")
+        parser.add_argument('--duration', type=float, default=30, help="Seconds each run starts new flows for.")
+        parser.add_argument('--workers', type=int, default=2, help="Server worker processes.")
+        parser.add_argument('--think-time', type=float, default=0, help="Seconds a user waits after each request.")
+        parser.add_argument('--match-polls', type=int, default=10,
+                            help="Dashboard loads waiting for the new item's notification.")
+        parser.add_argument('--output', default='benchmark-results',
+                            help="Directory (or .json file) the results are written to.")
+
+    def handle(self, *args, **options):
+        texts = list(FoundItem.objects.open().values_list('name', 'description', 'features')[:5000])
+        if not texts:
+            raise CommandError("No open found items to match against; run `manage.py seed_items` first.")
+        for server in options['servers']:
+            if shutil.which(SERVERS[server][0][0]) is None:
+                raise CommandError(f"`{SERVERS[server][0][0]}` is not installed; see requirements.txt.")
+
+        results = {
+            'revision': git_revision(),
+            'timestamp': timezone.now().isoformat(),
+            'users': options['users'],
+            'duration': options['duration'],
+            'workers': options['workers'],
+            'runs': [],
+        }
+        for sqlite_profile in options['sqlite_profiles']:
+            for server in options['servers']:
+                with tempfile.TemporaryDirectory() as directory:
+                    database = Path(directory) / 'loadtest.sqlite3'
+                    copy_database(settings.DATABASES['default']['NAME'], database, SQLITE_PROFILES[sqlite_profile])
+                    run = self.run(server, sqlite_profile, database, texts, options)
+                results['runs'].append(run)
+                self.report(run)
+
+        output = Path(options['output'])
+        if output.suffix != '.json':
+            output.mkdir(parents=True, exist_ok=True)
+            output = output / f"{timezone.now():%Y%m%d-%H%M%S}-{results['revision']}-loadtest.json"
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+    def run(self, server, sqlite_profile, database, texts, options):
+        command, server_env = SERVERS[server]
+        port = free_port()
+        env = {**os.environ, **server_env, 'DB_PATH': str(database), 'SQLITE_PROFILE': sqlite_profile}
+        processes = [
+            subprocess.Popen(
+                [part.format(port=port, workers=options['workers']) for part in command],
+                cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            ),
+            subprocess.Popen(
+                [sys.executable, 'manage.py', 'runworker', '--poll-interval', '0.1'],
+                cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            ),
+        ]
+        try:
+            wait_for_port(port, processes[0])
+            return self.drive(server, sqlite_profile, f"http://127.0.0.1:{port}", texts, options)
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait(timeout=10)
+
+    def drive(self, server, sqlite_profile, base_url, texts, options):
+        urllib.request.urlopen(f"{base_url}/login/").read()  # warm-up
+        samples, outcomes = [], []  # list.append is atomic, so the threads share them
+        prefix = f"lt{uuid.uuid4().hex[:6]}"
+        deadline = time.monotonic() + options['duration']
+
+        def user(index):
+            virtual_user = VirtualUser(base_url, samples, texts, random.Random(index), options)
+            flow = 0
+            while time.monotonic() < deadline:
+                outcomes.append(virtual_user.run_flow(f"{prefix}u{index}f{flow}"))
+                flow += 1
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=user, args=(index,)) for index in range(options['users'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if not samples:
+            raise CommandError(f"No requests completed against {server}.")
+
+        by_label = {}
+        for sample in samples:
+            by_label.setdefault(sample[0], []).append(sample)
+        return {
+            'server': server,
+            'sqlite_profile': sqlite_profile,
+            'seconds': round(elapsed, 2),
+            'requests_per_second': round(len(samples) / elapsed, 1),
+            'flows': {outcome: outcomes.count(outcome) for outcome in ('completed', 'unmatched', 'failed')},
+            'flows_per_second': round(outcomes.count('completed') / elapsed, 2),
+            'total': summarize(samples),
+            'urls': {name: summarize(group) for name, group in sorted(by_label.items())},
+        }
+
+    def report(self, run):
+        flows = run['flows']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{run['server']} / sqlite {run['sqlite_profile']}: {run['requests_per_second']:.1f} req/s, "
+            f"{run['flows_per_second']:.2f} completed flows/s "
+            f"({flows['completed']} completed, {flows['unmatched']} unmatched, {flows['failed']} failed)"
+        ))
+        self.stdout.write(f"  {'url':<32} {'requests':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for name, stats in [*run['urls'].items(), ('total', run['total'])]:
+            latency = stats['latency_ms']
+            self.stdout.write(
+                f"  {name:<32} {stats['requests']:>8} {latency['p50']:>9.2f} {latency['p95']:>9.2f} "
+                f"{latency['p99']:>9.2f} {stats['error_rate']:>7.2%}"
+            )
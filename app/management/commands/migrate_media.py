@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.images import stored_names
+from app.models import LostItem, FoundItem
+from app.storage import is_content_addressed, photo_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves item photos and renditions saved under the old upload names into the "
+        "content-addressed photo storage, merging duplicate files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be moved.")
+
+    def handle(self, *args, **options):
+        storage = photo_storage()
+        moved, missing, targets = 0, 0, set()
+        for model in (LostItem, FoundItem):
+            items = model.objects.exclude(photo='').exclude(photo__isnull=True).only('id', 'photo', 'photo_renditions')
+            for item in list(items):
+                legacy = {name for name in stored_names(item) if not is_content_addressed(name)}
+                if not legacy:
+                    continue
+                renames = {}
+                for name in sorted(legacy):
+                    if not storage.exists(name):
+                        missing += 1
+                        continue
+                    if options['dry_run']:
+                        moved += 1
+                        continue
+                    with storage.open(name, 'rb') as source:
+                        renames[name] = storage.save(name, source)
+                if not renames:
+                    continue
+
+                with transaction.atomic():
+                    model.objects.filter(id=item.id).update(
+                        photo=renames.get(item.photo.name, item.photo.name),
+                        photo_renditions={key: renames.get(name, name) for key, name in item.photo_renditions.items()},
+                    )
+                for name in renames:
+                    storage.delete(name)  # untracked, so the old file is removed
+                moved += len(renames)
+                targets.update(renames.values())
+
+        if options['dry_run']:
+            self.stdout.write(f"Would move {moved} file(s); {missing} missing.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {moved} file(s) into {len(targets)} content-addressed file(s); {missing} missing."
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from app import notification_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Shows hit/miss/invalidation counters of the dashboard notification cache, summed over "
+        "the processes writing to METRICS_DIR (without it there are none to read)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help="Drop every cached notification list.")
+
+    def handle(self, *args, **options):
+        stats = notification_cache.stats()
+        for stat in notification_cache.STATS:
+            self.stdout.write(f"{stat:<14} {stats[stat]}")
+        hit_rate = 'n/a' if stats['hit_rate'] is None else f"{stats['hit_rate']:.1%}"
+        self.stdout.write(f"{'hit rate':<14} {hit_rate}")
+
+        if options['clear']:
+            notification_cache.clear()
+            self.stdout.write(self.style.SUCCESS("Cache cleared."))
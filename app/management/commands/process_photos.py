@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from app.images import needs_processing, process_item_photo
+from app.jobs import enqueue
+from app.models import LostItem, FoundItem
+
+
+class Command(BaseCommand):
+    help = "Normalizes existing item photos and generates their WebP renditions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='store_true',
+                            help="Queue a job per photo for `runworker` instead of processing inline.")
+
+    def handle(self, *args, **options):
+        count = 0
+        for model, kind in ((LostItem, 'lost'), (FoundItem, 'found')):
+            items = model.objects.exclude(photo='').exclude(photo__isnull=True).only('id', 'photo', 'photo_renditions')
+            for item in items.iterator():
+                if not needs_processing(item):
+                    continue
+                if options['queue']:
+                    enqueue('process_photo', kind=kind, item_id=item.id)
+                else:
+                    process_item_photo(model, item.id)
+                count += 1
+
+        verb = "Queued" if options['queue'] else "Processed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {count} photo(s)."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from app.matching import SCORER_VERSION, rebuild_candidates
+from app.models import LostItem, MatchCandidate
+
+
+class Command(BaseCommand):
+    help = "Re-scores LostItems against FoundItems and rebuilds the stored MatchCandidate rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale',
+            action='store_true',
+            help="Only rebuild LostItems with candidates scored by an older scorer version, or none at all.",
+        )
+
+    def handle(self, *args, **options):
+        lost_items = LostItem.objects.open()
+        if options['stale']:
+            stale_ids = MatchCandidate.objects.exclude(
+                scorer_version=SCORER_VERSION
+            ).values('lost_item_id')
+            # No candidates: items saved before they were stored, or that matched nothing.
+            lost_items = lost_items.filter(Q(id__in=stale_ids) | Q(matchcandidate__isnull=True)).distinct()
+
+        rebuilt = rebuild_candidates(lost_items)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt match candidates for {rebuilt} lost item(s) (scorer v{SCORER_VERSION})."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the FTS5 item search index from the LostItem and FoundItem tables."
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} item(s) for search."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from app.blocking import index_item
+from app.models import LostItem, FoundItem
+
+
+class Command(BaseCommand):
+    help = "Builds the ItemToken inverted index used to block match candidates."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help="Re-index every open item instead of only open items that have no tokens yet.",
+        )
+
+    def handle(self, *args, **options):
+        indexed = 0
+        for model in (LostItem, FoundItem):
+            # Closed items left the pool with their tokens; they must not come back.
+            items = model.objects.open()
+            if not options['all']:
+                items = items.filter(itemtoken__isnull=True)
+            for item in items.iterator():
+                index_item(item)
+                indexed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} item(s)."))
@@ -0,0 +1,159 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app.matching import refresh_candidates_for_lost
+from app.models import LostItem, FoundItem
+from app.views import check_for_matches, pending_candidates
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(func, args_list):
+    """Runs `func(*args)` for every entry and returns latency, query and memory stats."""
+    latencies, queries = [], []
+    tracemalloc.start()
+    try:
+        for args in args_list:
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                func(*args)
+                latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'runs': len(latencies),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 3),
+            'p90': round(percentile(latencies, 90), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(max(latencies), 3),
+            'mean': round(statistics.fmean(latencies), 3),
+        },
+        'queries': {'min': min(queries), 'max': max(queries), 'mean': round(statistics.fmean(queries), 2)},
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks matching, dashboard rendering and notification views against the current "
+        "database (seed it with `manage.py seed_items`) and writes the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=30, help="Iterations per benchmark.")
+        parser.add_argument('--seed', type=int, default=0, help="Offset for choosing sample items.")
+        parser.add_argument('--output', default='benchmark-results',
+                            help="Directory (or .json file) the results are written to.")
+        parser.add_argument('--compare', help="Earlier results file to print a comparison against.")
+
+    def handle(self, *args, **options):
+        runs = options['runs']
+        lost_items = list(
+            LostItem.objects.filter(matchcandidate__isnull=False).distinct()
+            .order_by('id')[options['seed']:options['seed'] + runs]
+        )
+        if not lost_items:
+            raise CommandError("No lost items with match candidates; run `manage.py seed_items` first.")
+        users = [item.user for item in lost_items]
+        # Only pending pairs: actioned ones redirect away from the notification page.
+        pairs = list(
+            pending_candidates(lost_items)
+            .values_list('lost_item_id', 'found_item_id', 'lost_item__user_id')[:runs]
+        )
+
+        clients = {}
+
+        def client_for(user):
+            if user.id not in clients:
+                clients[user.id] = Client()
+                clients[user.id].force_login(user)
+            return clients[user.id]
+
+        for user in users:
+            client_for(user)  # log in outside the measured region
+
+        def get(user, url):
+            response = client_for(user).get(url)
+            if response.status_code != 200:
+                raise CommandError(f"GET {url} returned {response.status_code}.")
+
+        users_by_id = {user.id: user for user in users}
+        benchmarks = {
+            'check_for_matches': (check_for_matches, [(item,) for item in lost_items]),
+            'refresh_candidates_for_lost': (refresh_candidates_for_lost, [(item,) for item in lost_items]),
+            'dashboard_view': (get, [(user, '/dashboard/') for user in users]),
+            'view_notification': (
+                get,
+                [(users_by_id[user_id], f'/notification/{lost_id}/{found_id}/') for lost_id, found_id, user_id in pairs],
+            ),
+        }
+
+        results = {
+            'revision': git_revision(),
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'dataset': {'lost_items': LostItem.objects.count(), 'found_items': FoundItem.objects.count()},
+            'benchmarks': {},
+        }
+        for name, (func, args_list) in benchmarks.items():
+            if not args_list:
+                continue
+            func(*args_list[0])  # warm-up
+            results['benchmarks'][name] = stats = measure(func, args_list)
+            self.stdout.write(
+                f"{name:<30} p50 {stats['latency_ms']['p50']:>9.2f} ms  p99 {stats['latency_ms']['p99']:>9.2f} ms  "
+                f"queries {stats['queries']['max']:>3}  peak {stats['peak_memory_kb']:>9.1f} KB"
+            )
+
+        output = Path(options['output'])
+        if output.suffix != '.json':
+            output.mkdir(parents=True, exist_ok=True)
+            output = output / f"{timezone.now():%Y%m%d-%H%M%S}-{results['revision']}.json"
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+        if options['compare']:
+            self.compare(json.loads(Path(options['compare']).read_text()), results)
+
+    def compare(self, before, after):
+        self.stdout.write(f"\nChange vs {before.get('revision', '?')} (p50 latency, max queries):")
+        for name, stats in after['benchmarks'].items():
+            old = before.get('benchmarks', {}).get(name)
+            if old is None:
+                continue
+            old_p50, new_p50 = old['latency_ms']['p50'], stats['latency_ms']['p50']
+            change = (new_p50 - old_p50) / old_p50 * 100 if old_p50 else 0.0
+            line = (
+                f"{name:<30} {old_p50:>9.2f} -> {new_p50:>9.2f} ms ({change:+.1f}%)  "
+                f"queries {old['queries']['max']} -> {stats['queries']['max']}"
+            )
+            self.stdout.write(self.style.WARNING(line) if change > 10 else line)
@@ -0,0 +1,65 @@
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from app import jobs, metrics
+
+# Seconds between sweeps of finished jobs (see jobs.prune_done).
+PRUNE_INTERVAL = 600
+
+
+def _run_in_thread(job):
+    # Each pool thread has its own DB connection; drop it if it went stale.
+    close_old_connections()
+    try:
+        return jobs.execute(job)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs (matching, image processing, ...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help="Worker threads.")
+        parser.add_argument('--batch-size', type=int, default=10, help="Jobs claimed per poll.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when idle.")
+        parser.add_argument('--once', action='store_true', help="Drain the due jobs, then exit.")
+
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        done = failed = 0
+        pruned_at = float('-inf')
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            while not self.stopping:
+                if time.monotonic() - pruned_at >= PRUNE_INTERVAL:
+                    jobs.prune_done()
+                    pruned_at = time.monotonic()
+                claimed = jobs.claim(worker_id, batch_size=options['batch_size'])
+                if not claimed:
+                    if options['once']:
+                        break
+                    close_old_connections()
+                    time.sleep(options['poll_interval'])
+                    continue
+                for ok in pool.map(_run_in_thread, claimed):
+                    if ok:
+                        done += 1
+                    else:
+                        failed += 1
+                # No middleware flushes here: write the batch's spans for /metrics.
+                metrics.flush()
+
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_id} stopped: {done} done, {failed} failed."))
+
+    def stop(self, signum, frame):
+        self.stopping = True
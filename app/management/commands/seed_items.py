@@ -0,0 +1,146 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.blocking import tokenize
+from app.categories import classify
+from app.dedup import signature
+from app.lifecycle import resolve_matches
+from app.matching import rebuild_candidates
+from app.models import LostItem, FoundItem, ItemToken, MatchCandidate, MatchNotificationStatus, UserProfile
+from app.scoring import NORMALIZER_VERSION, normalize_text
+from app.search import rebuild_index
+
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000}
+
+# Password shared by every seeded account, so load tests can log in as them.
+SEED_PASSWORD = 'seed-pass-123'
+
+OBJECTS = [
+    'wallet', 'phone', 'earphones', 'charger', 'laptop', 'calculator', 'water bottle', 'umbrella',
+    'id card', 'keys', 'backpack', 'notebook', 'spectacles', 'watch', 'hoodie', 'jacket',
+    'power bank', 'pen drive', 'lab coat', 'lunch box', 'headphones', 'ring', 'bracelet', 'cap',
+]
+COLOURS = ['black', 'blue', 'red', 'white', 'grey', 'green', 'brown', 'pink', 'silver', 'yellow']
+BRANDS = [
+    'boAt', 'Samsung', 'Apple', 'Casio', 'Milton', 'Wildcraft', 'Titan', 'HP', 'Dell', 'OnePlus',
+    'Skybags', 'Fastrack', 'Redmi', 'Lenovo', 'Classmate', 'Puma', 'Nike', 'Sony',
+]
+PLACES = [
+    'library', 'canteen', 'block A', 'block B', 'seminar hall', 'parking lot', 'hostel', 'bus stop',
+    'computer lab', 'auditorium', 'sports ground', 'main gate', 'chemistry lab', 'reading room',
+]
+FEATURES = [
+    'scratch on the back', 'sticker of a cat', 'name written inside', 'cracked screen', 'keychain attached',
+    'torn strap', 'initials engraved', 'blue cover', 'missing cap', 'college logo', 'dent near the bottom',
+    'bus pass inside', 'two keys on a ring', 'charging cable tied to it', 'faded print',
+]
+
+
+def fake_item(rng):
+    thing = rng.choice(OBJECTS)
+    colour = rng.choice(COLOURS)
+    name = f"{colour.title()} {rng.choice(BRANDS)} {thing}"
+    description = f"{colour} {thing} near the {rng.choice(PLACES)}, around {rng.randint(8, 18)}:00"
+    features = ', '.join(rng.sample(FEATURES, rng.randint(1, 3)))
+    return name, description, features
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-creates synthetic users, profiles, lost/found items and match statuses for benchmarking. "
+        "Seeded items have no photos: photo storage, renditions and hashes are not exercised."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='1k',
+                            help="Number of found items (and as many lost items) to create.")
+        parser.add_argument('--items', type=int, help="Explicit item count; overrides --scale.")
+        parser.add_argument('--users', type=int, help="Number of users (default: items / 10).")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed for reproducible data.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--skip-candidates', action='store_true',
+                            help="Do not build match candidates and statuses.")
+
+    def handle(self, *args, **options):
+        count = options['items'] or SCALES[options['scale']]
+        user_count = options['users'] or max(count // 10, 2)
+        if count < 1:
+            raise CommandError("--items must be positive.")
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        prefix = f"seed{options['seed']}_"
+
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f"Seed {options['seed']} was already loaded; use another --seed.")
+
+        with transaction.atomic():
+            password = make_password(SEED_PASSWORD)
+            users = User.objects.bulk_create(
+                [
+                    User(username=f"{prefix}{i}", email=f"{prefix}{i}@raghuinstech.com", password=password)
+                    for i in range(user_count)
+                ],
+                batch_size=batch_size,
+            )
+            # bulk_create skips the post_save signal that creates profiles.
+            UserProfile.objects.bulk_create(
+                [UserProfile(user=user, phone_number=f"9{rng.randint(0, 10**9 - 1):09d}") for user in users],
+                batch_size=batch_size,
+            )
+            self.stdout.write(f"Created {len(users)} users.")
+
+            for model, label in ((LostItem, 'lost'), (FoundItem, 'found')):
+                items = []
+                for _ in range(count):
+                    name, description, features = fake_item(rng)
+                    # Set by the pre_save receiver for single saves; bulk_create skips it.
+                    match_text = normalize_text(name, description, features)
+                    items.append(model(
+                        user=rng.choice(users),
+                        name=name,
+                        description=description,
+                        features=features,
+                        match_text=match_text,
+                        match_text_version=NORMALIZER_VERSION,
+                        match_minhash=signature(match_text),
+                        category_id=classify(name, match_text),
+                    ))
+                items = model.objects.bulk_create(items, batch_size=batch_size)
+                field = 'lost_item' if model is LostItem else 'found_item'
+                ItemToken.objects.bulk_create(
+                    (ItemToken(token=token, **{field: item}) for item in items for token in tokenize(item)),
+                    batch_size=batch_size,
+                )
+                self.stdout.write(f"Created {len(items)} {label} items.")
+
+        rebuild_index()
+        if options['skip_candidates']:
+            return
+
+        seeded_lost = LostItem.objects.filter(user__username__startswith=prefix)
+        rebuild_candidates(seeded_lost, record_events=False)
+        self.stdout.write("Built match candidates.")
+
+        # Action roughly one candidate in ten, like users working through their dashboards.
+        statuses = [
+            MatchNotificationStatus(
+                lost_item_id=lost_id,
+                found_item_id=found_id,
+                notified_user_id=user_id,
+                status=rng.choice(['ACCEPTED', 'IGNORED', 'IGNORED']),
+            )
+            for lost_id, found_id, user_id in MatchCandidate.objects.filter(
+                lost_item__in=seeded_lost
+            ).values_list('lost_item_id', 'found_item_id', 'lost_item__user_id').iterator()
+            if rng.random() < 0.1
+        ]
+        MatchNotificationStatus.objects.bulk_create(statuses, batch_size=batch_size)
+        # bulk_create skips the accept view, which resolves both items.
+        accepted = [(status.lost_item_id, status.found_item_id) for status in statuses if status.status == 'ACCEPTED']
+        for start in range(0, len(accepted), batch_size):
+            resolve_matches(accepted[start:start + batch_size])
+        self.stdout.write(self.style.SUCCESS(f"Seeded {count} lost and {count} found items, {len(statuses)} statuses."))
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from app.sqlite import effective_pragmas, pragmas
+
+
+class Command(BaseCommand):
+    help = "Reports the SQLite pragmas and connection settings in effect for a database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"Database '{options['database']}' is not SQLite.")
+
+        configured = pragmas()
+        self.stdout.write(f"{'pragma':<14} {'effective':>12} {'configured':>12}")
+        for name, value in effective_pragmas(connection).items():
+            line = f"{name:<14} {value!s:>12} {configured.get(name)!s:>12}"
+            matches = str(value).lower() == str(configured.get(name)).lower()
+            self.stdout.write(line if matches else self.style.WARNING(line))
+
+        database = settings.DATABASES[options['database']]
+        self.stdout.write(f"{'CONN_MAX_AGE':<14} {database.get('CONN_MAX_AGE', 0)!s:>12}")
+        self.stdout.write(f"{'health checks':<14} {database.get('CONN_HEALTH_CHECKS', False)!s:>12}")
+        self.stdout.write(f"{'transactions':<14} {database.get('OPTIONS', {}).get('transaction_mode', 'DEFERRED'):>12}")
@@ -0,0 +1,299 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from . import blocking, categories, metrics, notification_cache, phash, scoring
+from .concurrency import run_cpu_bound
+from .models import LostItem, FoundItem, MatchCandidate, MatchEvent
+
+# Bump whenever the scoring function (or which pairs get scored) changes so
+# stored candidates can be rebuilt with `manage.py rebuild_match_candidates --stale`.
+SCORER_VERSION = 4
+
+
+def score_pair(lost_item, found_item):
+    return scoring.score_pair(lost_item.match_text, found_item.match_text, prepared=True)
+
+
+def min_score():
+    # Notification filtering is disabled by default, so every pair is stored.
+    return getattr(settings, 'MATCH_MIN_SCORE', 0)
+
+
+def max_candidates():
+    # Top-K cap per scored item; None keeps every pair above the cutoff.
+    return getattr(settings, 'MATCH_MAX_CANDIDATES', None)
+
+
+def _texts(model, ids, exclude_user_id=None):
+    """
+    (ids, match_texts, photo_phashes, user_ids) columns for the given open
+    items, read without loading model instances.
+    """
+    rows = model.objects.open().filter(id__in=ids)
+    if exclude_user_id is not None:
+        rows = rows.exclude(user_id=exclude_user_id)
+    rows = list(rows.values_list('id', 'match_text', 'photo_phash', 'user_id'))
+    return tuple(map(list, zip(*rows))) if rows else ([], [], [], [])
+
+
+def _similar_photo_ids(model, phash_hex, category_ids):
+    ids = phash.similar_photo_ids(model, phash_hex)
+    if ids and category_ids is not None:
+        ids = model.objects.filter(categories.in_categories('category', category_ids), id__in=ids).values_list('id', flat=True)
+    return ids
+
+
+def candidate_found_ids(lost_item):
+    """
+    FoundItems in a comparable category (see categories.py) sharing indexed
+    tokens with `lost_item`, plus those with a similar photo.
+    """
+    category_ids = categories.comparable(lost_item.category_id)
+    ids = set(blocking.candidate_found_ids(lost_item, category_ids=category_ids))
+    ids.update(_similar_photo_ids(FoundItem, lost_item.photo_phash, category_ids))
+    return ids
+
+
+def candidate_lost_ids(found_item):
+    """
+    LostItems in a comparable category (see categories.py) sharing indexed
+    tokens with `found_item`, plus those with a similar photo.
+    """
+    category_ids = categories.comparable(found_item.category_id)
+    ids = set(blocking.candidate_lost_ids(found_item, category_ids=category_ids))
+    ids.update(_similar_photo_ids(LostItem, found_item.photo_phash, category_ids))
+    return ids
+
+
+def _record_new_matches(candidates, existing, owners):
+    """
+    Logs a MatchEvent for each candidate whose (lost, found) pair is not in
+    `existing`; `owners` maps lost item id -> owner id.
+    """
+    MatchEvent.objects.bulk_create(
+        MatchEvent(
+            user_id=owners[candidate.lost_item_id],
+            lost_item_id=candidate.lost_item_id,
+            found_item_id=candidate.found_item_id,
+            score=candidate.score,
+            photo_score=candidate.photo_score,
+        )
+        for candidate in candidates
+        if (candidate.lost_item_id, candidate.found_item_id) not in existing
+    )
+
+
+def _record_scoring(span, candidates, pairs):
+    metrics.observe('app_match_candidates_scanned', candidates, span=span)
+    metrics.inc('app_match_pairs_scored_total', pairs, span=span)
+
+
+# ---------- INCREMENTAL MAINTENANCE ----------
+def refresh_candidates_for_lost(lost_item):
+    """
+    Re-scores a single LostItem against the FoundItems by other users that
+    share indexed tokens or a similar photo with it.
+    """
+    found_ids, found_texts, found_hashes, _ = _texts(FoundItem, candidate_found_ids(lost_item), lost_item.user_id)
+    with metrics.span('scoring'):
+        ranked = scoring.score_one_to_many(
+            lost_item.match_text,
+            found_texts,
+            score_cutoff=min_score(),
+            limit=max_candidates(),
+            prepared=True,
+        )
+    _record_scoring('refresh_lost', len(found_texts), len(found_texts))
+    candidates = [
+        MatchCandidate(
+            lost_item_id=lost_item.id,
+            found_item_id=found_ids[index],
+            score=score,
+            photo_score=phash.similarity(lost_item.photo_phash, found_hashes[index]),
+            scorer_version=SCORER_VERSION,
+        )
+        for index, score in ranked
+    ]
+
+    with transaction.atomic():
+        stored = MatchCandidate.objects.filter(lost_item_id=lost_item.id)
+        existing = set(stored.values_list('lost_item_id', 'found_item_id'))
+        stored.delete()
+        MatchCandidate.objects.bulk_create(candidates)
+        _record_new_matches(candidates, existing, {lost_item.id: lost_item.user_id})
+    notification_cache.invalidate([lost_item.user_id])
+    return candidates
+
+
+def refresh_candidates_for_found(found_item):
+    """
+    Re-scores a single FoundItem against the LostItems by other users that
+    share indexed tokens or a similar photo with it.
+    """
+    lost_ids, lost_texts, lost_hashes, lost_users = _texts(LostItem, candidate_lost_ids(found_item), found_item.user_id)
+    with metrics.span('scoring'):
+        ranked = scoring.score_one_to_many(
+            found_item.match_text,
+            lost_texts,
+            score_cutoff=min_score(),
+            limit=max_candidates(),
+            prepared=True,
+        )
+    _record_scoring('refresh_found', len(lost_texts), len(lost_texts))
+    candidates = [
+        MatchCandidate(
+            lost_item_id=lost_ids[index],
+            found_item_id=found_item.id,
+            score=score,
+            photo_score=phash.similarity(lost_hashes[index], found_item.photo_phash),
+            scorer_version=SCORER_VERSION,
+        )
+        for index, score in ranked
+    ]
+
+    # Owners of the lost items it matched before and after this refresh.
+    notification_cache.invalidate_for_found(found_item.id)
+    with transaction.atomic():
+        stored = MatchCandidate.objects.filter(found_item_id=found_item.id)
+        existing = set(stored.values_list('lost_item_id', 'found_item_id'))
+        stored.delete()
+        MatchCandidate.objects.bulk_create(candidates)
+        _record_new_matches(candidates, existing, dict(zip(lost_ids, lost_users)))
+    notification_cache.invalidate(lost_users[index] for index, _ in ranked)
+    return candidates
+
+
+def rebuild_candidates(lost_items, chunk_size=500, record_events=True):
+    """
+    Rebuilds candidates for many LostItems at once. Each chunk of lost items is
+    scored as one M x N matrix against the union of their candidates.
+    `record_events=False` skips the MatchEvent log (e.g. for seeded data).
+    """
+    threshold, limit = min_score(), max_candidates()
+
+    rebuilt = 0
+    lost_items = list(lost_items.only('id', 'user_id', 'match_text', 'photo_phash', 'category'))
+    for start in range(0, len(lost_items), chunk_size):
+        chunk = lost_items[start:start + chunk_size]
+        blocked = {lost_item.id: candidate_found_ids(lost_item) for lost_item in chunk}
+        # Own items are masked out per lost item below, so no user is excluded here.
+        found_ids, found_texts, found_hashes, found_users = _texts(FoundItem, set().union(*blocked.values()))
+        column = {found_id: index for index, found_id in enumerate(found_ids)}
+        with metrics.span('scoring'):
+            matrix = scoring.score_matrix(
+                [lost_item.match_text for lost_item in chunk],
+                found_texts,
+                score_cutoff=threshold,
+                prepared=True,
+            )
+        _record_scoring('rebuild', len(found_texts), matrix.size)
+
+        candidates = []
+        for lost_item, row in zip(chunk, matrix):
+            # Only this lost item's own candidates by other users are eligible.
+            allowed = [
+                column[found_id] for found_id in blocked[lost_item.id]
+                if found_id in column and found_users[column[found_id]] != lost_item.user_id
+            ]
+            masked = np.full_like(row, -1)
+            masked[allowed] = row[allowed]
+            candidates.extend(
+                MatchCandidate(
+                    lost_item_id=lost_item.id,
+                    found_item_id=found_ids[index],
+                    score=score,
+                    photo_score=phash.similarity(lost_item.photo_phash, found_hashes[index]),
+                    scorer_version=SCORER_VERSION,
+                )
+                for index, score in scoring.top_k(masked, limit, threshold)
+            )
+        with transaction.atomic():
+            stored = MatchCandidate.objects.filter(lost_item__in=chunk)
+            existing = set(stored.values_list('lost_item_id', 'found_item_id')) if record_events else set()
+            stored.delete()
+            MatchCandidate.objects.bulk_create(candidates)
+            if record_events:
+                _record_new_matches(candidates, existing, {item.id: item.user_id for item in chunk})
+        notification_cache.invalidate(lost_item.user_id for lost_item in chunk)
+        rebuilt += len(chunk)
+    return rebuilt
+
+
+def refresh_candidates_for_found_items(found_items):
+    """
+    Re-scores many FoundItems at once (e.g. an imported batch) as one M x N
+    matrix against the union of their candidate LostItems, instead of one
+    refresh per item. Returns the number of candidates stored.
+    """
+    threshold, limit = min_score(), max_candidates()
+
+    found_items = list(found_items.only('id', 'user_id', 'match_text', 'photo_phash', 'category'))
+    if not found_items:
+        return 0
+    blocked = {found_item.id: candidate_lost_ids(found_item) for found_item in found_items}
+    lost_ids, lost_texts, lost_hashes, lost_users = _texts(LostItem, set().union(*blocked.values()))
+    column = {lost_id: index for index, lost_id in enumerate(lost_ids)}
+    with metrics.span('scoring'):
+        matrix = scoring.score_matrix(
+            [found_item.match_text for found_item in found_items],
+            lost_texts,
+            score_cutoff=threshold,
+            prepared=True,
+        )
+    _record_scoring('refresh_found_batch', len(lost_texts), matrix.size)
+
+    candidates = []
+    for found_item, row in zip(found_items, matrix):
+        allowed = [
+            column[lost_id] for lost_id in blocked[found_item.id]
+            if lost_id in column and lost_users[column[lost_id]] != found_item.user_id
+        ]
+        masked = np.full_like(row, -1)
+        masked[allowed] = row[allowed]
+        candidates.extend(
+            MatchCandidate(
+                lost_item_id=lost_ids[index],
+                found_item_id=found_item.id,
+                score=score,
+                photo_score=phash.similarity(lost_hashes[index], found_item.photo_phash),
+                scorer_version=SCORER_VERSION,
+            )
+            for index, score in scoring.top_k(masked, limit, threshold)
+        )
+
+    owners = dict(zip(lost_ids, lost_users))
+    with transaction.atomic():
+        stored = MatchCandidate.objects.filter(found_item__in=found_items)
+        existing = set(stored.values_list('lost_item_id', 'found_item_id'))
+        # Owners of lost items these found items matched before this refresh.
+        previous = set(stored.values_list('lost_item__user_id', flat=True))
+        stored.delete()
+        MatchCandidate.objects.bulk_create(candidates)
+        _record_new_matches(candidates, existing, owners)
+    notification_cache.invalidate(previous | {owners[candidate.lost_item_id] for candidate in candidates})
+    return len(candidates)
+
+
+def stored_scores(lost_item, found_item):
+    """
+    (text score, photo score) stored for a pair, scored live if the pair was
+    never stored. The photo score is None unless both photos are hashed.
+    """
+    candidate = MatchCandidate.objects.filter(
+        lost_item=lost_item, found_item=found_item
+    ).only('score', 'photo_score').first()
+    if candidate is not None:
+        return candidate.score, candidate.photo_score
+    return score_pair(lost_item, found_item), phash.similarity(lost_item.photo_phash, found_item.photo_phash)
+
+
+async def astored_scores(lost_item, found_item):
+    """Async stored_scores(); a live score is computed on the bounded CPU pool."""
+    candidate = await MatchCandidate.objects.filter(
+        lost_item=lost_item, found_item=found_item
+    ).only('score', 'photo_score').afirst()
+    if candidate is not None:
+        return candidate.score, candidate.photo_score
+    score = await run_cpu_bound(score_pair, lost_item, found_item)
+    return score, phash.similarity(lost_item.photo_phash, found_item.photo_phash)
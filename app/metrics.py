@@ -0,0 +1,328 @@
+"""
+In-process request and matching metrics, exported in Prometheus text format.
+
+MetricsMiddleware records per view: request counts, latency, database
+queries and query time, template render time and response size. Queries are
+counted by an execute wrapper installed on every database connection (see the
+connection_created receiver in models.py); templates are timed by the
+InstrumentedDjangoTemplates backend. Code paths worth watching use `span()`,
+which also feeds the request's Server-Timing header.
+
+Metrics aggregate in the process that records them. With several worker
+processes (gunicorn, uvicorn --workers, runworker) set METRICS_DIR: each
+process then writes its totals to its own file there after a request (or a
+runworker batch), at most every METRICS_FLUSH_INTERVAL seconds, and at exit;
+`/metrics` adds up every file. Empty the directory when the deployment restarts, as with Prometheus'
+own multiprocess mode.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+BYTES_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+COUNT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1_000, 10_000, 100_000)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'app_http_requests_total': ('counter', "Requests by view, method and status.", None),
+    'app_http_request_duration_seconds': ('histogram', "Time to build the response, by view.", SECONDS_BUCKETS),
+    'app_http_response_bytes': ('histogram', "Size of non-streaming responses, by view.", BYTES_BUCKETS),
+    'app_db_queries_per_request': ('histogram', "Database queries per request, by view.", QUERY_BUCKETS),
+    'app_db_query_seconds_total': ('counter', "Time spent in database queries, by view.", None),
+    'app_template_render_seconds': ('histogram', "Template render time, by template.", SECONDS_BUCKETS),
+    'app_span_seconds': ('histogram', "Duration of instrumented code paths, by span.", SECONDS_BUCKETS),
+    'app_match_candidates_scanned': ('histogram', "Candidates read or scored per matching span.", COUNT_BUCKETS),
+    'app_match_pairs_scored_total': ('counter', "Lost/found pairs scored by the matcher, by span.", None),
+    'app_notification_cache_events_total': ('counter', "Notification cache hits, misses and invalidations.", None),
+}
+
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None)
+
+
+def flush_interval():
+    return getattr(settings, 'METRICS_FLUSH_INTERVAL', 1)
+
+
+# ---------- REGISTRY ----------
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self.flushed_at = 0.0
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            series = self.histograms.get(key)
+            if series is None:
+                series = self.histograms[key] = [0] * (len(buckets) + 2)
+            series[bisect_left(buckets, value)] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(labels), list(series)] for (name, labels), series in self.histograms.items()],
+            }
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+registry = Registry()
+
+
+def inc(name, value=1, **labels):
+    registry.inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    registry.observe(name, value, **labels)
+
+
+def merge(snapshots):
+    """Adds up registry snapshots (one per process) into one."""
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, series in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(series))
+            for index, value in enumerate(series):
+                total[index] += value
+    return {
+        'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+        'histograms': [[name, list(labels), series] for (name, labels), series in histograms.items()],
+    }
+
+
+# ---------- MULTI-PROCESS FILES ----------
+def _process_file(directory):
+    return Path(directory) / f"metrics-{os.getpid()}.json"
+
+
+def flush(force=False):
+    """Writes this process's totals to METRICS_DIR (throttled unless `force`)."""
+    directory = metrics_dir()
+    now = time.monotonic()
+    if not directory or (not force and now - registry.flushed_at < flush_interval()):
+        return
+    registry.flushed_at = now
+    path = _process_file(directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(f'.{threading.get_ident()}.tmp')
+    temporary.write_text(json.dumps(registry.snapshot()))
+    os.replace(temporary, path)  # readers never see a partial file
+
+
+atexit.register(flush, force=True)
+
+
+def collect():
+    """Totals across every process writing to METRICS_DIR, or of this process alone."""
+    directory = metrics_dir()
+    if not directory:
+        return registry.snapshot()
+    flush(force=True)
+    snapshots = []
+    for path in Path(directory).glob('metrics-*.json'):
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue  # removed or replaced while reading
+    return merge(snapshots)
+
+
+# ---------- PROMETHEUS TEXT FORMAT ----------
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snapshot):
+    series = {}
+    for name, labels, value in snapshot['counters']:
+        series.setdefault(name, []).append((labels, value))
+    for name, labels, values in snapshot['histograms']:
+        series.setdefault(name, []).append((labels, values))
+
+    lines = []
+    for name in sorted(series):
+        kind, help_text, buckets = METRICS.get(name, ('untyped', '', None))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(series[name], key=lambda entry: entry[0]):
+            if kind != 'histogram':
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip([*buckets, '+Inf'], value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(value[-1])}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+
+# ---------- PER-REQUEST STATE ----------
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.timings = {}  # Server-Timing name -> seconds
+
+    def add_timing(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Connection execute wrapper counting the queries of the current request."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def install_query_wrapper(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def span(name):
+    """Times a code path into `app_span_seconds` and the current request's Server-Timing header."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe('app_span_seconds', elapsed, span=name)
+        stats = _current.get()
+        if stats is not None:
+            stats.add_timing(name, elapsed)
+
+
+# ---------- TEMPLATES ----------
+class InstrumentedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            elapsed = time.perf_counter() - start
+            observe('app_template_render_seconds', elapsed, template=self.template.origin.template_name or '<string>')
+            stats = _current.get()
+            if stats is not None:
+                stats.add_timing('tpl', elapsed)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing each top-level template render."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name))
+
+
+# ---------- MIDDLEWARE ----------
+def _server_timing(stats, total):
+    entries = [f'total;dur={total * 1000:.1f}', f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"']
+    entries.extend(f'{name};dur={seconds * 1000:.1f}' for name, seconds in stats.timings.items())
+    return ', '.join(entries)
+
+
+class MetricsMiddleware:
+    """Records request metrics and adds a Server-Timing header (sync and async)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, start = RequestStats(), time.perf_counter()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats, start = RequestStats(), time.perf_counter()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, stats, elapsed):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        inc('app_http_requests_total', view=view, method=request.method, status=response.status_code)
+        observe('app_http_request_duration_seconds', elapsed, view=view)
+        observe('app_db_queries_per_request', stats.queries, view=view)
+        inc('app_db_query_seconds_total', stats.db_time, view=view)
+        if not response.streaming:
+            observe('app_http_response_bytes', len(response.content), view=view)
+        response['Server-Timing'] = _server_timing(stats, elapsed)
+        flush()
@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-17 00:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_userprofile'),
+    ]
+
+    # Candidates of existing items are built by `manage.py rebuild_match_candidates`
+    # (run by build.sh), not here: scoring every pair would block the deploy.
+    operations = [
+        migrations.CreateModel(
+            name='MatchCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField()),
+                ('scorer_version', models.PositiveSmallIntegerField()),
+                ('date_scored', models.DateTimeField(auto_now=True)),
+                ('found_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.founditem')),
+                ('lost_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.lostitem')),
+            ],
+            options={
+                'verbose_name_plural': 'Match Candidates',
+                'indexes': [models.Index(fields=['lost_item', '-score'], name='matchcand_lost_score_idx')],
+                'unique_together': {('lost_item', 'found_item')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-17 00:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_matchcandidate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=40)),
+                ('found_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='app.founditem')),
+                ('lost_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='app.lostitem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'found_item'], name='itemtoken_found_idx'), models.Index(fields=['token', 'lost_item'], name='itemtoken_lost_idx')],
+            },
+        ),
+    ]
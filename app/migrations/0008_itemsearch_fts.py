@@ -0,0 +1,82 @@
+# Generated by Django 6.0 on 2026-10-17 00:00
+
+from django.db import migrations
+
+# FTS5 index over LostItem and FoundItem text, kept in sync by triggers so
+# that bulk_create/update/delete are covered as well as model saves.
+# rowid = id * 2 for lost items and id * 2 + 1 for found items.
+FORWARD_SQL = [
+    """
+    CREATE VIRTUAL TABLE app_itemsearch USING fts5(
+        kind UNINDEXED,
+        item_id UNINDEXED,
+        name,
+        description,
+        features,
+        tokenize = 'porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER app_lostitem_search_ai AFTER INSERT ON app_lostitem BEGIN
+        INSERT INTO app_itemsearch (rowid, kind, item_id, name, description, features)
+        VALUES (new.id * 2, 'lost', new.id, new.name, new.description, new.features);
+    END
+    """,
+    """
+    CREATE TRIGGER app_lostitem_search_au AFTER UPDATE OF name, description, features ON app_lostitem BEGIN
+        UPDATE app_itemsearch
+        SET name = new.name, description = new.description, features = new.features
+        WHERE rowid = new.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER app_lostitem_search_ad AFTER DELETE ON app_lostitem BEGIN
+        DELETE FROM app_itemsearch WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER app_founditem_search_ai AFTER INSERT ON app_founditem BEGIN
+        INSERT INTO app_itemsearch (rowid, kind, item_id, name, description, features)
+        VALUES (new.id * 2 + 1, 'found', new.id, new.name, new.description, new.features);
+    END
+    """,
+    """
+    CREATE TRIGGER app_founditem_search_au AFTER UPDATE OF name, description, features ON app_founditem BEGIN
+        UPDATE app_itemsearch
+        SET name = new.name, description = new.description, features = new.features
+        WHERE rowid = new.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER app_founditem_search_ad AFTER DELETE ON app_founditem BEGIN
+        DELETE FROM app_itemsearch WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+    """
+    INSERT INTO app_itemsearch (rowid, kind, item_id, name, description, features)
+    SELECT id * 2, 'lost', id, name, description, features FROM app_lostitem
+    UNION ALL
+    SELECT id * 2 + 1, 'found', id, name, description, features FROM app_founditem
+    """,
+]
+
+REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS app_lostitem_search_ai",
+    "DROP TRIGGER IF EXISTS app_lostitem_search_au",
+    "DROP TRIGGER IF EXISTS app_lostitem_search_ad",
+    "DROP TRIGGER IF EXISTS app_founditem_search_ai",
+    "DROP TRIGGER IF EXISTS app_founditem_search_au",
+    "DROP TRIGGER IF EXISTS app_founditem_search_ad",
+    "DROP TABLE IF EXISTS app_itemsearch",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_itemtoken'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD_SQL, REVERSE_SQL),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 6.0 on 2026-10-17 00:07
+
+from django.db import migrations, models
+from rapidfuzz import utils
+
+
+def backfill_match_text(apps, schema_editor):
+    # Frozen copy of scoring.normalize_text at NORMALIZER_VERSION 1.
+    for model_name in ('LostItem', 'FoundItem'):
+        model = apps.get_model('app', model_name)
+        items = list(model.objects.only('name', 'description', 'features'))
+        for item in items:
+            text = utils.default_process(f"{item.name} {item.description} {item.features}")
+            item.match_text = ' '.join(sorted(text.split()))
+            item.match_text_version = 1
+        model.objects.bulk_update(items, ['match_text', 'match_text_version'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='founditem',
+            name='match_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='founditem',
+            name='match_text_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='match_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='match_text_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_match_text, migrations.RunPython.noop),
+        # SQLite rebuilds the item tables for AddField, which silently drops the
+        # search triggers from 0008; the index is kept in sync by signals instead.
+        migrations.RunSQL(
+            [
+                "DROP TRIGGER IF EXISTS app_lostitem_search_ai",
+                "DROP TRIGGER IF EXISTS app_lostitem_search_au",
+                "DROP TRIGGER IF EXISTS app_lostitem_search_ad",
+                "DROP TRIGGER IF EXISTS app_founditem_search_ai",
+                "DROP TRIGGER IF EXISTS app_founditem_search_au",
+                "DROP TRIGGER IF EXISTS app_founditem_search_ad",
+            ],
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-17 00:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_photo_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='founditem',
+            name='photo_ahash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='founditem',
+            name='photo_dhash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='founditem',
+            name='photo_phash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='photo_ahash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='photo_dhash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='photo_phash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='matchcandidate',
+            name='photo_score',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-17 00:25
+
+import app.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_photo_hashes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('refs', models.PositiveIntegerField(default=0)),
+                ('processed', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='founditem',
+            name='photo',
+            field=models.ImageField(storage=app.storage.photo_storage, upload_to='found_photos/'),
+        ),
+        migrations.AlterField(
+            model_name='lostitem',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=app.storage.photo_storage, upload_to='lost_photos/'),
+        ),
+    ]
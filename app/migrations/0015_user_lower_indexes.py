@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-17 00:00
+
+from django.db import migrations
+
+# Functional indexes for the case-insensitive login lookup in backends.py.
+# auth.User belongs to django.contrib.auth, so they are created with SQL
+# rather than Meta.indexes.
+FORWARD_SQL = [
+    'CREATE INDEX IF NOT EXISTS auth_user_email_lower_idx ON auth_user (LOWER(email))',
+    'CREATE INDEX IF NOT EXISTS auth_user_username_lower_idx ON auth_user (LOWER(username))',
+]
+
+REVERSE_SQL = [
+    'DROP INDEX IF EXISTS auth_user_email_lower_idx',
+    'DROP INDEX IF EXISTS auth_user_username_lower_idx',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_content_addressed_photos'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD_SQL, REVERSE_SQL),
+    ]
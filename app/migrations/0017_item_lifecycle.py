@@ -0,0 +1,151 @@
+# Generated by Django 6.0 on 2026-10-17 01:04
+
+import app.storage
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def resolve_accepted_matches(apps, schema_editor):
+    """Items of already accepted matches start out resolved, outside the matching pool."""
+    MatchNotificationStatus = apps.get_model('app', 'MatchNotificationStatus')
+    accepted = MatchNotificationStatus.objects.filter(status='ACCEPTED')
+    lost_ids = list(accepted.values_list('lost_item_id', flat=True))
+    found_ids = list(accepted.values_list('found_item_id', flat=True))
+    now = timezone.now()
+    apps.get_model('app', 'LostItem').objects.filter(id__in=lost_ids).update(status='RESOLVED', closed_at=now)
+    apps.get_model('app', 'FoundItem').objects.filter(id__in=found_ids).update(status='RESOLVED', closed_at=now)
+    pool = Q(lost_item_id__in=lost_ids) | Q(found_item_id__in=found_ids)
+    apps.get_model('app', 'ItemToken').objects.filter(pool).delete()
+    apps.get_model('app', 'MatchCandidate').objects.filter(pool).delete()
+    schema_editor.execute(
+        "DELETE FROM app_itemsearch WHERE rowid IN ("
+        "SELECT id * 2 FROM app_lostitem WHERE status != 'OPEN' "
+        "UNION ALL SELECT id * 2 + 1 FROM app_founditem WHERE status != 'OPEN')"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0016_matchevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('lost', 'Lost'), ('found', 'Found')], max_length=5)),
+                ('original_id', models.BigIntegerField()),
+                ('name', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('features', models.TextField()),
+                ('photo', models.ImageField(blank=True, null=True, storage=app.storage.photo_storage, upload_to='')),
+                ('photo_renditions', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('OPEN', 'Open'), ('RESOLVED', 'Resolved'), ('EXPIRED', 'Expired')], max_length=10)),
+                ('date_reported', models.DateTimeField()),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Archived Items',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedMatchStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lost_item_id', models.BigIntegerField()),
+                ('found_item_id', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending Review'), ('ACCEPTED', 'Match Accepted'), ('IGNORED', 'Match Ignored')], max_length=10)),
+                ('date_updated', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Archived Match Statuses',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='founditem',
+            name='founditem_user_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='founditem',
+            name='founditem_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='lostitem',
+            name='lostitem_user_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='lostitem',
+            name='lostitem_date_idx',
+        ),
+        migrations.AddField(
+            model_name='founditem',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='founditem',
+            name='status',
+            field=models.CharField(choices=[('OPEN', 'Open'), ('RESOLVED', 'Resolved'), ('EXPIRED', 'Expired')], default='OPEN', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='status',
+            field=models.CharField(choices=[('OPEN', 'Open'), ('RESOLVED', 'Resolved'), ('EXPIRED', 'Expired')], default='OPEN', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='founditem',
+            index=models.Index(condition=models.Q(('status', 'OPEN')), fields=['user', '-date_reported'], name='founditem_open_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='founditem',
+            index=models.Index(condition=models.Q(('status', 'OPEN')), fields=['-date_reported'], name='founditem_open_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='founditem',
+            index=models.Index(fields=['status', 'closed_at'], name='founditem_status_closed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lostitem',
+            index=models.Index(condition=models.Q(('status', 'OPEN')), fields=['user', '-date_reported'], name='lostitem_open_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lostitem',
+            index=models.Index(condition=models.Q(('status', 'OPEN')), fields=['-date_reported'], name='lostitem_open_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lostitem',
+            index=models.Index(fields=['status', 'closed_at'], name='lostitem_status_closed_idx'),
+        ),
+        migrations.AddField(
+            model_name='archiveditem',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedmatchstatus',
+            name='notified_user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='archiveditem',
+            unique_together={('kind', 'original_id')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedmatchstatus',
+            unique_together={('lost_item_id', 'found_item_id', 'notified_user')},
+        ),
+        migrations.RunPython(resolve_accepted_matches, migrations.RunPython.noop),
+    ]
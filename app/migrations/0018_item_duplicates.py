@@ -0,0 +1,49 @@
+# Generated by Django 6.0 on 2026-10-17 01:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0017_item_lifecycle'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='founditem',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='app.founditem'),
+        ),
+        migrations.AddField(
+            model_name='founditem',
+            name='match_minhash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='app.lostitem'),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='match_minhash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512),
+        ),
+        migrations.AlterField(
+            model_name='archiveditem',
+            name='status',
+            field=models.CharField(choices=[('OPEN', 'Open'), ('RESOLVED', 'Resolved'), ('EXPIRED', 'Expired'), ('MERGED', 'Merged duplicate')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='founditem',
+            name='status',
+            field=models.CharField(choices=[('OPEN', 'Open'), ('RESOLVED', 'Resolved'), ('EXPIRED', 'Expired'), ('MERGED', 'Merged duplicate')], default='OPEN', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='lostitem',
+            name='status',
+            field=models.CharField(choices=[('OPEN', 'Open'), ('RESOLVED', 'Resolved'), ('EXPIRED', 'Expired'), ('MERGED', 'Merged duplicate')], default='OPEN', max_length=10),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 6.0 on 2026-10-17 01:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+CATEGORIES = [
+    ('electronics', 'Electronics'),
+    ('id-cards', 'ID & cards'),
+    ('keys', 'Keys'),
+    ('wallets', 'Wallets & purses'),
+    ('bags', 'Bags'),
+    ('clothing', 'Clothing'),
+    ('accessories', 'Accessories'),
+    ('bottles', 'Bottles & lunch boxes'),
+    ('books', 'Books & stationery'),
+]
+# Wallets hold cards and are carried in bags; smartwatches look like watches.
+RELATED = [('wallets', 'id-cards'), ('wallets', 'bags'), ('electronics', 'accessories')]
+
+
+def create_categories(apps, schema_editor):
+    Category = apps.get_model('app', 'Category')
+    categories = {slug: Category.objects.get_or_create(slug=slug, defaults={'name': name})[0] for slug, name in CATEGORIES}
+    for a, b in RELATED:
+        # The historical model's self-relation is not symmetrical: add both ways.
+        categories[a].related.add(categories[b])
+        categories[b].related.add(categories[a])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_item_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='founditem',
+            name='category_by_user',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='category_by_user',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('related', models.ManyToManyField(blank=True, to='app.category')),
+            ],
+            options={
+                'verbose_name_plural': 'Categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='founditem',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='app.category'),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='app.category'),
+        ),
+        migrations.RunPython(create_categories, migrations.RunPython.noop),
+    ]
@@ -1,18 +1,82 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
 
+from .storage import photo_storage
+
+# Item lifecycle (see lifecycle.py): only OPEN items are matched and listed.
+# MERGED items are repeat reports folded into another item (see dedup.py).
+OPEN = 'OPEN'
+RESOLVED = 'RESOLVED'
+EXPIRED = 'EXPIRED'
+MERGED = 'MERGED'
+ITEM_STATUS_CHOICES = [
+    (OPEN, 'Open'),
+    (RESOLVED, 'Resolved'),
+    (EXPIRED, 'Expired'),
+    (MERGED, 'Merged duplicate'),
+]
+
+
+class ItemQuerySet(models.QuerySet):
+    def open(self):
+        return self.filter(status=OPEN)
+
+
+# Item categories (see categories.py): matching only compares items in the
+# same or related categories.
+class Category(models.Model):
+    slug = models.SlugField(unique=True)
+    name = models.CharField(max_length=100)
+    # Categories whose items are compared with this one's too (both ways)
+    related = models.ManyToManyField('self', blank=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = "Categories"
+
+    def __str__(self):
+        return self.name
+
+
 class LostItem(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=200)
     description = models.TextField()
     features = models.TextField()
-    photo = models.ImageField(upload_to='lost_photos/', blank=True, null=True)
+    photo = models.ImageField(upload_to='lost_photos/', storage=photo_storage, blank=True, null=True)
+    # WebP renditions of the photo by size name, written by images.py
+    photo_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    # Perceptual hashes of the photo as 16-digit hex, written by images.py
+    photo_ahash = models.CharField(max_length=16, blank=True, default='', editable=False)
+    photo_dhash = models.CharField(max_length=16, blank=True, default='', editable=False)
+    photo_phash = models.CharField(max_length=16, blank=True, default='', editable=False)
     date_reported = models.DateTimeField(auto_now_add=True)
+    # Normalized, sorted-token text used by the matcher (set by a pre_save signal)
+    match_text = models.TextField(blank=True, default='', editable=False)
+    match_text_version = models.PositiveSmallIntegerField(default=0, editable=False)
+    # MinHash signature of match_text as hex, for near-duplicate lookups (see dedup.py)
+    match_minhash = models.CharField(max_length=512, blank=True, default='', editable=False)
+    status = models.CharField(max_length=10, choices=ITEM_STATUS_CHOICES, default=OPEN)
+    closed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # The primary item of the cluster a MERGED item was folded into
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='duplicates')
+    # Filled in by the classifier on save unless the reporter picked it
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    category_by_user = models.BooleanField(default=False)
+
+    objects = ItemQuerySet.as_manager()
 
     class Meta:
         verbose_name_plural = "Lost Items"
+        # Partial: listings and matching only read open items.
+        indexes = [
+            models.Index(fields=['user', '-date_reported'], name='lostitem_open_user_date_idx', condition=models.Q(status=OPEN)),
+            models.Index(fields=['-date_reported'], name='lostitem_open_date_idx', condition=models.Q(status=OPEN)),
+            models.Index(fields=['status', 'closed_at'], name='lostitem_status_closed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} (by {self.user.username})"
@@ -23,11 +87,37 @@ class FoundItem(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField()
     features = models.TextField()
-    photo = models.ImageField(upload_to='found_photos/')
+    photo = models.ImageField(upload_to='found_photos/', storage=photo_storage)
+    # WebP renditions of the photo by size name, written by images.py
+    photo_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    # Perceptual hashes of the photo as 16-digit hex, written by images.py
+    photo_ahash = models.CharField(max_length=16, blank=True, default='', editable=False)
+    photo_dhash = models.CharField(max_length=16, blank=True, default='', editable=False)
+    photo_phash = models.CharField(max_length=16, blank=True, default='', editable=False)
     date_reported = models.DateTimeField(auto_now_add=True)
+    # Normalized, sorted-token text used by the matcher (set by a pre_save signal)
+    match_text = models.TextField(blank=True, default='', editable=False)
+    match_text_version = models.PositiveSmallIntegerField(default=0, editable=False)
+    # MinHash signature of match_text as hex, for near-duplicate lookups (see dedup.py)
+    match_minhash = models.CharField(max_length=512, blank=True, default='', editable=False)
+    status = models.CharField(max_length=10, choices=ITEM_STATUS_CHOICES, default=OPEN)
+    closed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # The primary item of the cluster a MERGED item was folded into
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='duplicates')
+    # Filled in by the classifier on save unless the reporter picked it
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    category_by_user = models.BooleanField(default=False)
+
+    objects = ItemQuerySet.as_manager()
 
     class Meta:
         verbose_name_plural = "Found Items"
+        # Partial: listings and matching only read open items.
+        indexes = [
+            models.Index(fields=['user', '-date_reported'], name='founditem_open_user_date_idx', condition=models.Q(status=OPEN)),
+            models.Index(fields=['-date_reported'], name='founditem_open_date_idx', condition=models.Q(status=OPEN)),
+            models.Index(fields=['status', 'closed_at'], name='founditem_status_closed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} (by {self.user.username})"
@@ -73,4 +163,281 @@ class MatchNotificationStatus(models.Model):
         verbose_name_plural = "Match Notification Statuses"
 
     def __str__(self):
-        return f"{self.notified_user.username}: {self.lost_item.name} vs {self.found_item.name} ({self.status})"
\ No newline at end of file
+        return f"{self.notified_user.username}: {self.lost_item.name} vs {self.found_item.name} ({self.status})"
+
+
+# 3. MatchCandidate Model (materialized lost -> found scores)
+class MatchCandidate(models.Model):
+    lost_item = models.ForeignKey(LostItem, on_delete=models.CASCADE)
+    found_item = models.ForeignKey(FoundItem, on_delete=models.CASCADE)
+    score = models.PositiveSmallIntegerField()
+    # Photo similarity in percent; null unless both items have a hashed photo
+    photo_score = models.PositiveSmallIntegerField(null=True, blank=True)
+    scorer_version = models.PositiveSmallIntegerField()
+    date_scored = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('lost_item', 'found_item')
+        indexes = [
+            models.Index(fields=['lost_item', '-score'], name='matchcand_lost_score_idx'),
+        ]
+        verbose_name_plural = "Match Candidates"
+
+    def __str__(self):
+        return f"{self.lost_item.name} vs {self.found_item.name} ({self.score}%)"
+
+# 4. ItemToken Model (inverted index used to block match candidates)
+class ItemToken(models.Model):
+    token = models.CharField(max_length=40)
+    lost_item = models.ForeignKey(LostItem, on_delete=models.CASCADE, null=True, blank=True)
+    found_item = models.ForeignKey(FoundItem, on_delete=models.CASCADE, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['token', 'found_item'], name='itemtoken_found_idx'),
+            models.Index(fields=['token', 'lost_item'], name='itemtoken_lost_idx'),
+        ]
+
+    def __str__(self):
+        return self.token
+
+# 5. Job Model (database-backed background work queue, see jobs.py)
+class Job(models.Model):
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
+
+# 6. StoredFile Model (reference counts of content-addressed photo files, see storage.py)
+class StoredFile(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refs = models.PositiveIntegerField(default=0)
+    # For an original upload: the renditions and hashes its processing produced
+    processed = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refs} refs)"
+
+# 7. MatchEvent Model (log of newly created matches, streamed to owners, see events.py)
+class MatchEvent(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    lost_item = models.ForeignKey(LostItem, on_delete=models.CASCADE)
+    found_item = models.ForeignKey(FoundItem, on_delete=models.CASCADE)
+    score = models.PositiveSmallIntegerField()
+    photo_score = models.PositiveSmallIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='matchevent_user_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.lost_item.name} vs {self.found_item.name} ({self.score}%)"
+
+# 8. Archive tables (items closed long ago and their statuses, see lifecycle.py)
+class ArchivedItem(models.Model):
+    KIND_CHOICES = [('lost', 'Lost'), ('found', 'Found')]
+
+    kind = models.CharField(max_length=5, choices=KIND_CHOICES)
+    original_id = models.BigIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    name = models.CharField(max_length=200)
+    description = models.TextField()
+    features = models.TextField()
+    # The archived row holds the item's references to its stored photo files
+    photo = models.ImageField(storage=photo_storage, blank=True, null=True)
+    photo_renditions = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=ITEM_STATUS_CHOICES)
+    date_reported = models.DateTimeField()
+    closed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('kind', 'original_id')
+        verbose_name_plural = "Archived Items"
+
+    def __str__(self):
+        return f"{self.name} ({self.kind}, {self.status})"
+
+class ArchivedMatchStatus(models.Model):
+    # Original item ids; see ArchivedItem.original_id
+    lost_item_id = models.BigIntegerField()
+    found_item_id = models.BigIntegerField()
+    notified_user = models.ForeignKey(User, on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=MatchNotificationStatus.STATUS_CHOICES)
+    date_updated = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('lost_item_id', 'found_item_id', 'notified_user')
+        verbose_name_plural = "Archived Match Statuses"
+
+    def __str__(self):
+        return f"{self.notified_user_id}: {self.lost_item_id} vs {self.found_item_id} ({self.status})"
+
+# Signals to keep ItemToken and MatchCandidate rows in sync. The token index is
+# updated inline; scoring and photo processing are queued for the background worker. Deleting an item cascades to its
+# candidates, so only saves need re-scoring.
+@receiver(pre_save, sender=LostItem)
+@receiver(pre_save, sender=FoundItem)
+def normalize_match_text(sender, instance, **kwargs):
+    from .dedup import signature
+    from .scoring import NORMALIZER_VERSION, normalize_text
+    instance.match_text = normalize_text(instance.name, instance.description, instance.features)
+    instance.match_text_version = NORMALIZER_VERSION
+    instance.match_minhash = signature(instance.match_text)
+
+@receiver(pre_save, sender=LostItem)
+@receiver(pre_save, sender=FoundItem)
+def classify_item(sender, instance, **kwargs):
+    from .categories import classify
+    if not instance.category_by_user:
+        instance.category_id = classify(instance.name, instance.match_text)
+
+@receiver(pre_save, sender=LostItem)
+@receiver(pre_save, sender=FoundItem)
+def stamp_closed_at(sender, instance, **kwargs):
+    # close_items sets it itself; this covers a plain save (e.g. in the admin),
+    # so the item still ages into the archive.
+    if instance.status == OPEN:
+        instance.closed_at = None
+    elif instance.closed_at is None:
+        from django.utils import timezone
+        instance.closed_at = timezone.now()
+
+@receiver(post_save, sender=LostItem)
+def score_lost_item(sender, instance, **kwargs):
+    from .blocking import index_item
+    from .jobs import enqueue
+    from .images import needs_processing
+    if instance.status != OPEN:
+        # Closed by a plain save (e.g. in the admin): take it out of matching.
+        from .lifecycle import leave_pool
+        leave_pool(LostItem, [instance.id])
+        return
+    index_item(instance)
+    enqueue('refresh_lost_candidates', item_id=instance.id)
+    if needs_processing(instance):
+        enqueue('process_photo', kind='lost', item_id=instance.id)
+
+@receiver(post_save, sender=FoundItem)
+def score_found_item(sender, instance, **kwargs):
+    from .blocking import index_item
+    from .jobs import enqueue
+    from .images import needs_processing
+    if instance.status != OPEN:
+        # Closed by a plain save (e.g. in the admin): take it out of matching.
+        from .lifecycle import leave_pool
+        leave_pool(FoundItem, [instance.id])
+        return
+    index_item(instance)
+    enqueue('refresh_found_candidates', item_id=instance.id)
+    if needs_processing(instance):
+        enqueue('process_photo', kind='found', item_id=instance.id)
+
+# Signals to keep the FTS5 search index (see search.py) in sync.
+@receiver(post_save, sender=LostItem)
+@receiver(post_save, sender=FoundItem)
+def index_item_for_search(sender, instance, **kwargs):
+    from .search import index_item
+    if instance.status == OPEN:
+        index_item('lost' if sender is LostItem else 'found', instance)
+
+@receiver(post_delete, sender=LostItem)
+@receiver(post_delete, sender=FoundItem)
+def remove_item_from_search(sender, instance, **kwargs):
+    from .search import remove_item
+    remove_item('lost' if sender is LostItem else 'found', instance.id)
+
+# The near-duplicate index (see dedup.py) picks up new items itself, not edits.
+@receiver(post_save, sender=LostItem)
+@receiver(post_save, sender=FoundItem)
+def reindex_duplicate_signature(sender, instance, created, **kwargs):
+    from .dedup import reindex
+    if not created:
+        reindex(instance)
+
+# Deleting an item drops its references to the stored photo files.
+@receiver(post_delete, sender=LostItem)
+@receiver(post_delete, sender=FoundItem)
+@receiver(post_delete, sender=ArchivedItem)
+def release_item_photo(sender, instance, **kwargs):
+    from .images import stored_names
+    for name in stored_names(instance):
+        instance.photo.storage.delete(name)
+
+# Signals to drop the cached dashboard notifications (see notification_cache.py)
+# of the users whose list an item or status change affects.
+@receiver(post_save, sender=LostItem)
+@receiver(post_delete, sender=LostItem)
+def invalidate_lost_owner_notifications(sender, instance, **kwargs):
+    from .notification_cache import invalidate
+    invalidate([instance.user_id])
+
+@receiver(post_save, sender=FoundItem)
+@receiver(pre_delete, sender=FoundItem)  # before its candidates are cascaded away
+def invalidate_matched_notifications(sender, instance, **kwargs):
+    from .notification_cache import invalidate_for_found
+    invalidate_for_found(instance.id)
+
+@receiver(post_save, sender=MatchNotificationStatus)
+@receiver(post_delete, sender=MatchNotificationStatus)
+def invalidate_status_notifications(sender, instance, **kwargs):
+    from .notification_cache import invalidate
+    invalidate([instance.notified_user_id])
+
+# An accepted match resolves both items (see lifecycle.py).
+@receiver(post_save, sender=MatchNotificationStatus)
+def resolve_accepted_match(sender, instance, **kwargs):
+    from .lifecycle import resolve_matches
+    if instance.status == 'ACCEPTED':
+        resolve_matches([(instance.lost_item_id, instance.found_item_id)])
+
+# Category changes reach this process's classifier at once (see categories.py).
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(m2m_changed, sender=Category.related.through)
+def invalidate_taxonomy(sender, **kwargs):
+    from .categories import invalidate
+    invalidate()
+
+# Tune every new SQLite connection (see sqlite.py).
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    from .sqlite import apply_pragmas
+    apply_pragmas(connection)
+
+# Count every connection's queries for the request metrics (see metrics.py).
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    from .metrics import install_query_wrapper
+    install_query_wrapper(connection)
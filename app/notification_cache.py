@@ -0,0 +1,95 @@
+"""
+Per-user cache of the first page of dashboard notifications.
+
+The page only changes when one of the user's lost items, a found item matched
+against them, a match status or the stored candidates change, so it is cached
+per user (and per SCORER_VERSION) on the NOTIFICATION_CACHE_ALIAS backend and
+dropped by the signals in models.py and the candidate writers in matching.py.
+Entries also expire after NOTIFICATION_CACHE_TIMEOUT seconds, and the backend
+evicts by its own MAX_ENTRIES policy.
+
+Hits, misses and invalidations are counted in each process's request
+metrics (metrics.py), where concurrent processes cannot lose updates; read
+them at /metrics or with `manage.py notification_cache_stats`, both summed
+over the processes writing to METRICS_DIR.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+
+STATS = ('hits', 'misses', 'invalidations')
+METRIC = 'app_notification_cache_events_total'
+
+
+def _cache():
+    return caches[getattr(settings, 'NOTIFICATION_CACHE_ALIAS', 'notifications')]
+
+
+def cache_timeout():
+    return getattr(settings, 'NOTIFICATION_CACHE_TIMEOUT', 300)
+
+
+def _key(user_id):
+    from .matching import SCORER_VERSION
+    return f"notifications:v{SCORER_VERSION}:page:user:{user_id}"
+
+
+def _count(stat, amount=1):
+    metrics.inc(METRIC, amount, event=stat)
+
+
+def get_notifications(user, compute):
+    """The cached notification page for `user`, built with `compute(user)` on a miss."""
+    cache = _cache()
+    notifications = cache.get(_key(user.id))
+    if notifications is not None:
+        _count('hits')
+        return notifications
+    _count('misses')
+    notifications = compute(user)
+    cache.set(_key(user.id), notifications, cache_timeout())
+    return notifications
+
+
+async def aget_notifications(user, acompute):
+    """Async get_notifications(), building the list with `await acompute(user)` on a miss."""
+    cache = _cache()
+    notifications = await cache.aget(_key(user.id))
+    if notifications is not None:
+        _count('hits')
+        return notifications
+    _count('misses')
+    notifications = await acompute(user)
+    await cache.aset(_key(user.id), notifications, cache_timeout())
+    return notifications
+
+
+def invalidate(user_ids):
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        _cache().delete_many([_key(user_id) for user_id in user_ids])
+        _count('invalidations', len(user_ids))
+
+
+def invalidate_for_found(found_item_id):
+    """Drops the lists of every user with a lost item matched against this found item."""
+    from .models import MatchCandidate
+    invalidate(
+        MatchCandidate.objects.filter(found_item_id=found_item_id)
+        .values_list('lost_item__user_id', flat=True).distinct()
+    )
+
+
+def stats():
+    counts = dict.fromkeys(STATS, 0)
+    for name, labels, value in metrics.collect()['counters']:
+        if name == METRIC:
+            counts[dict(labels)['event']] += value
+    lookups = counts['hits'] + counts['misses']
+    counts['hit_rate'] = round(counts['hits'] / lookups, 3) if lookups else None
+    return counts
+
+
+def clear():
+    _cache().clear()
@@ -0,0 +1,129 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are fetched with a WHERE on the last row's sort key instead of OFFSET, so
+page N costs the same as page 1 when the ordering is backed by an index. The
+cursor handed to clients is an opaque URL-safe token.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+
+def encode_cursor(*values):
+    raw = json.dumps(values, default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns the list of values in `cursor`, or None if missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def page_size():
+    return getattr(settings, 'ITEMS_PAGE_SIZE', 20)
+
+
+class KeysetPage:
+    """
+    One page of `queryset` ordered newest first by (date_reported, id).
+    Evaluated lazily, on first iteration or `next_cursor` access, or up front
+    with `await page.aload()`.
+    """
+
+    def __init__(self, queryset, cursor=None, size=None):
+        self.queryset = queryset
+        self.cursor = cursor
+        self.size = size or page_size()
+        self._items = None
+        self._next_cursor = None
+
+    def _after(self):
+        values = decode_cursor(self.cursor)
+        if values is None or len(values) != 2:
+            return None
+        try:
+            return datetime.fromisoformat(values[0]), int(values[1])
+        except (TypeError, ValueError):
+            return None
+
+    def _ordered(self, queryset, after):
+        queryset = queryset.order_by('-date_reported', '-id')
+        if after is not None:
+            date, item_id = after
+            queryset = queryset.filter(Q(date_reported__lt=date) | Q(date_reported=date, id__lt=item_id))
+        return queryset
+
+    def _cursor(self, row):
+        return encode_cursor(row.date_reported.isoformat(), row.id)
+
+    def _page_query(self):
+        return self._ordered(self.queryset, self._after())[:self.size + 1]
+
+    def _set_rows(self, rows):
+        self._items = rows[:self.size]
+        if len(rows) > self.size:
+            self._next_cursor = self._cursor(self._items[-1])
+        return self._items
+
+    def _fetch(self):
+        if self._items is not None:
+            return self._items
+        return self._set_rows(list(self._page_query()))
+
+    async def aload(self):
+        """Fetches the page with the async ORM, so async views can render it without queries."""
+        if self._items is None:
+            self._set_rows([row async for row in self._page_query()])
+        return self
+
+    @property
+    def next_cursor(self):
+        self._fetch()
+        return self._next_cursor
+
+    def __iter__(self):
+        return iter(self._fetch())
+
+    def __len__(self):
+        return len(self._fetch())
+
+    def __bool__(self):
+        return bool(self._fetch())
+
+
+class CandidatePage(KeysetPage):
+    """One page of MatchCandidates ordered best first by (score, found_item_id, lost_item_id)."""
+
+    def _after(self):
+        values = decode_cursor(self.cursor)
+        if values is None or len(values) != 3:
+            return None
+        try:
+            return tuple(int(value) for value in values)
+        except (TypeError, ValueError):
+            return None
+
+    def _ordered(self, queryset, after):
+        queryset = queryset.order_by('-score', '-found_item_id', '-lost_item_id')
+        if after is not None:
+            score, found_id, lost_id = after
+            queryset = queryset.filter(
+                Q(score__lt=score)
+                | Q(score=score, found_item_id__lt=found_id)
+                | Q(score=score, found_item_id=found_id, lost_item_id__lt=lost_id)
+            )
+        return queryset
+
+    def _cursor(self, row):
+        return encode_cursor(row.score, row.found_item_id, row.lost_item_id)
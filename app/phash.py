@@ -0,0 +1,206 @@
+"""
+Perceptual photo hashes and a multi-index hash for similar-photo lookups.
+
+Three 64-bit hashes are computed once per photo (by the photo processing job)
+and stored as 16-character hex strings: aHash (mean threshold), dHash
+(horizontal gradient) and pHash (low-frequency DCT). pHash is the one used for
+matching; the others are kept for near-duplicate checks.
+
+A MultiIndexHash over stored pHashes answers "all photos within Hamming
+distance d" by probing a few buckets per 16-bit substring and verifying only
+those candidates, instead of comparing against every photo.
+"""
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+from PIL import Image
+
+HASH_BITS = 64
+
+
+def _to_hex(bits):
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return f"{value:016x}"
+
+
+def _grey(image, width, height):
+    return np.asarray(
+        image.convert('L').resize((width, height), Image.Resampling.LANCZOS), dtype=np.float64
+    )
+
+
+def average_hash(image):
+    pixels = _grey(image, 8, 8)
+    return _to_hex((pixels > pixels.mean()).flatten())
+
+
+def difference_hash(image):
+    pixels = _grey(image, 9, 8)
+    return _to_hex((pixels[:, 1:] > pixels[:, :-1]).flatten())
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / n)
+
+
+_DCT_32 = _dct_matrix(32)
+
+
+def perceptual_hash(image):
+    pixels = _grey(image, 32, 32)
+    low = (_DCT_32 @ pixels @ _DCT_32.T)[:8, :8]
+    # Median of the low frequencies, ignoring the DC term.
+    return _to_hex((low > np.median(low.flatten()[1:])).flatten())
+
+
+def compute_hashes(image):
+    return {
+        'photo_ahash': average_hash(image),
+        'photo_dhash': difference_hash(image),
+        'photo_phash': perceptual_hash(image),
+    }
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def similarity(a_hex, b_hex):
+    """Photo similarity in percent (100 = identical hash), or None if either is missing."""
+    if not a_hex or not b_hex:
+        return None
+    return round(100 * (1 - hamming(int(a_hex, 16), int(b_hex, 16)) / HASH_BITS))
+
+
+def max_distance():
+    # Hamming distance (out of 64) below which two photos count as similar.
+    return getattr(settings, 'PHOTO_MATCH_MAX_DISTANCE', 10)
+
+
+def _flip_masks(bits, radius):
+    """All `bits`-wide XOR masks with at most `radius` bits set, fewest first."""
+    masks = [0]
+    frontier = [0]
+    for _ in range(radius):
+        frontier = sorted({mask | (1 << bit) for mask in frontier for bit in range(bits) if not mask >> bit & 1})
+        masks.extend(frontier)
+    return masks
+
+
+class MultiIndexHash:
+    """
+    Multi-index hashing over 64-bit hashes under the Hamming metric.
+
+    Each hash is split into `chunks` substrings, each with its own table. Two
+    hashes within distance r agree to within r // chunks bits on at least one
+    substring (pigeonhole), so a search only probes the buckets near the query's
+    substrings and verifies those candidates, instead of scanning every hash.
+    """
+
+    def __init__(self, chunks=4):
+        self.chunks = chunks
+        self.width = HASH_BITS // chunks
+        self.mask = (1 << self.width) - 1
+        self.tables = [{} for _ in range(chunks)]
+        self.hashes = {}
+        self.size = 0
+
+    def _substrings(self, value):
+        return [(value >> (i * self.width)) & self.mask for i in range(self.chunks)]
+
+    def add(self, value, item_id):
+        self.size += 1
+        if value in self.hashes:
+            self.hashes[value].append(item_id)
+            return
+        self.hashes[value] = [item_id]
+        for table, key in zip(self.tables, self._substrings(value)):
+            table.setdefault(key, []).append(value)
+
+    def search(self, value, radius):
+        """
+        Returns ([(distance, item_id), ...] sorted by distance, hashes_compared).
+        """
+        masks = _flip_masks(self.width, radius // self.chunks)
+        seen = set()
+        for table, key in zip(self.tables, self._substrings(value)):
+            for flip in masks:
+                seen.update(table.get(key ^ flip, ()))
+        found = []
+        for candidate in seen:
+            distance = hamming(value, candidate)
+            if distance <= radius:
+                found.extend((distance, item_id) for item_id in self.hashes[candidate])
+        found.sort()
+        return found, len(seen)
+
+
+# ---------- PER-PROCESS INDEXES ----------
+_indexes = {}
+
+
+def photo_index(model):
+    """
+    Multi-index hash over the stored pHashes of `model` items. Photos hashed in
+    this process are added by `reindex`, and items reported since it was built
+    on the next lookup. Closed items and replaced hashes stay in it, as lookups
+    are verified against the open items anyway. It is rebuilt only when older
+    items were hashed elsewhere or after `invalidate`.
+    """
+    hashed = model.objects.exclude(photo_phash='')
+    count, last = hashed.aggregate(n=Count('id'), last=Max('id')).values()
+    last = last or 0
+    cached = _indexes.get(model)
+    if cached is not None:
+        cached_count, cached_last, index = cached
+        added = list(hashed.filter(id__gt=cached_last).values_list('id', 'photo_phash')) if last > cached_last else []
+        # Deletions only lower the count: more hashed items than were added means older ones were hashed.
+        if count - len(added) <= cached_count:
+            for item_id, phash in added:
+                index.add(int(phash, 16), item_id)
+            _indexes[model] = (count, max(last, cached_last), index)
+            return index
+
+    index = MultiIndexHash()
+    for item_id, phash in hashed.values_list('id', 'photo_phash').iterator():
+        index.add(int(phash, 16), item_id)
+    _indexes[model] = (count, last, index)
+    return index
+
+
+def reindex(model, item_id, phash, previous=''):
+    """Adds a photo hashed in this process; `previous` is the hash it replaced, if any."""
+    cached = _indexes.get(model)
+    if cached is None or not phash:
+        return
+    count, last, index = cached
+    index.add(int(phash, 16), item_id)
+    # A first hash raises the count the next lookup compares against.
+    _indexes[model] = (count + (not previous), max(last, item_id), index)
+
+
+def invalidate(model):
+    _indexes.pop(model, None)
+
+
+def similar_photo_ids(model, phash, radius=None):
+    """IDs of open `model` items whose photo is within `radius` of `phash`, closest first."""
+    if not phash:
+        return []
+    radius = max_distance() if radius is None else radius
+    value = int(phash, 16)
+    matches, _ = photo_index(model).search(value, radius)
+    if not matches:
+        return []
+    # Verified against the open items' stored hashes: closed ids and replaced
+    # hashes drop out here.
+    rows = model.objects.open().filter(id__in={item_id for _, item_id in matches}).exclude(photo_phash='')
+    scored = sorted(
+        (hamming(value, int(stored, 16)), item_id) for item_id, stored in rows.values_list('id', 'photo_phash')
+    )
+    return [item_id for distance, item_id in scored if distance <= radius]
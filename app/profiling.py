@@ -0,0 +1,200 @@
+"""
+Opt-in request profiling, for slow pages that only show up with real data.
+
+ProfilerMiddleware profiles a request when a staff user asks for it (the
+`_profile=1` query parameter or an `X-Profile: 1` header) and for a random
+PROFILE_SAMPLE_RATE share of all requests. The view runs under cProfile while
+a sampler thread records the request thread's stack every
+PROFILE_SAMPLE_INTERVAL seconds. Each profile is written to PROFILE_DIR as:
+- `<id>.prof`: pstats (`python -m pstats`, snakeviz, ...);
+- `<id>.collapsed`: collapsed stacks for flamegraph.pl or speedscope.
+
+Only the newest PROFILE_KEEP profiles are kept. Staff list and download them
+from /admin/profiles/. Under ASGI only the event loop thread is profiled, not
+the threads running sync ORM code.
+"""
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+PROFILE_NAME_RE = re.compile(r'^[\w-]+\.(prof|collapsed)$')
+
+
+def profile_dir():
+    return Path(getattr(settings, 'PROFILE_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def sample_rate():
+    return getattr(settings, 'PROFILE_SAMPLE_RATE', 0.0)
+
+
+def keep():
+    return getattr(settings, 'PROFILE_KEEP', 50)
+
+
+def sample_interval():
+    return getattr(settings, 'PROFILE_SAMPLE_INTERVAL', 0.005)
+
+
+class StackSampler(threading.Thread):
+    """Counts the stacks one thread is seen in, as collapsed `a;b;c` strings."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True, name='profile-sampler')
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':'))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# ---------- RING BUFFER ----------
+def save(profiler, sampler, label, elapsed):
+    """Writes one profile's two dumps and drops the oldest beyond PROFILE_KEEP. Returns its id."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = f"{timezone.now():%Y%m%d-%H%M%S-%f}-{slugify(label)[:60] or 'request'}-{round(elapsed * 1000)}ms"
+    profiler.dump_stats(directory / f"{profile_id}.prof")
+    (directory / f"{profile_id}.collapsed").write_text(sampler.collapsed())
+
+    for stale in list_profiles()[keep():]:
+        for name in stale['files']:
+            (directory / name).unlink(missing_ok=True)
+    return profile_id
+
+
+def list_profiles():
+    """Stored profiles, newest first: dicts of id, created, size and files."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    profiles = {}
+    for path in directory.iterdir():
+        if not PROFILE_NAME_RE.match(path.name):
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue  # trimmed by another process
+        entry = profiles.setdefault(path.stem, {
+            'id': path.stem,
+            'created': datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc),
+            'size': 0,
+            'files': [],
+        })
+        entry['size'] += stat.st_size
+        entry['files'].append(path.name)
+    return sorted(profiles.values(), key=lambda entry: entry['id'], reverse=True)
+
+
+def profile_path(name):
+    """Path of a stored dump, or None for a name that is not one."""
+    if not PROFILE_NAME_RE.match(name or ''):
+        return None
+    path = profile_dir() / name
+    return path if path.is_file() else None
+
+
+# ---------- MIDDLEWARE ----------
+# cProfile can only be active once per process on recent Pythons.
+_active = threading.Lock()
+
+
+def asked_for_profile(request):
+    return request.GET.get('_profile') == '1' or request.headers.get('X-Profile') == '1'
+
+
+def wants_profile(request):
+    # The user is only loaded when asked, so other requests run no extra queries.
+    if asked_for_profile(request) and request.user.is_staff:
+        return True
+    return random.random() < sample_rate()
+
+
+async def awants_profile(request):
+    if asked_for_profile(request) and (await request.auser()).is_staff:
+        return True
+    return random.random() < sample_rate()
+
+
+class ProfilerMiddleware:
+    """Profiles requested or sampled requests (after AuthenticationMiddleware)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not wants_profile(request) or not _active.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            profiler, sampler, start = self.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+                sampler.stop()
+            return self.finish(request, response, profiler, sampler, time.perf_counter() - start)
+        finally:
+            _active.release()
+
+    async def __acall__(self, request):
+        if not await awants_profile(request) or not _active.acquire(blocking=False):
+            return await self.get_response(request)
+        try:
+            profiler, sampler, start = self.start()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profiler.disable()
+                sampler.stop()
+            return self.finish(request, response, profiler, sampler, time.perf_counter() - start)
+        finally:
+            _active.release()
+
+    def start(self):
+        sampler = StackSampler(threading.get_ident(), sample_interval())
+        sampler.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler, sampler, time.perf_counter()
+
+    def finish(self, request, response, profiler, sampler, elapsed):
+        match = getattr(request, 'resolver_match', None)
+        label = match.view_name if match else request.path
+        response['X-Profile-Id'] = save(profiler, sampler, label, elapsed)
+        return response
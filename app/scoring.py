@@ -0,0 +1,74 @@
+"""
+Batched fuzzy scoring on RapidFuzz.
+
+Scores are token_sort_ratio values rounded to whole percentages, matching what
+fuzzywuzzy.fuzz.token_sort_ratio returned for the same (ASCII) text. Whole
+rows or matrices are scored in one `process.cdist` call so the work runs in C
+across several threads instead of a Python loop over pairs.
+
+Items store their text pre-normalized (see `normalize_text`). Pass
+`prepared=True` for such texts: token_sort_ratio then reduces to a plain
+ratio, so nothing is re-processed, re-tokenized or re-sorted per pair.
+"""
+import numpy as np
+from django.conf import settings
+from rapidfuzz import fuzz, process, utils
+
+
+# Bump whenever normalize_text changes; `manage.py backfill_match_text` then
+# rewrites the stored texts.
+NORMALIZER_VERSION = 1
+
+
+def normalize_text(*parts):
+    """Processed, sorted-token form of an item's text, as token_sort_ratio sees it."""
+    return ' '.join(sorted(utils.default_process(' '.join(parts)).split()))
+
+
+def _workers():
+    # -1 uses every available core.
+    return getattr(settings, 'MATCH_SCORER_WORKERS', -1)
+
+
+def score_matrix(queries, choices, score_cutoff=0, prepared=False):
+    """
+    Scores M query texts against N choice texts.
+    Returns an M x N integer array; scores below `score_cutoff` may be 0.
+    """
+    if not queries or not choices:
+        return np.zeros((len(queries), len(choices)), dtype=np.int64)
+
+    scores = process.cdist(
+        queries,
+        choices,
+        scorer=fuzz.ratio if prepared else fuzz.token_sort_ratio,
+        processor=None if prepared else utils.default_process,
+        # Half a point of slack so scores that round up to the cutoff survive.
+        score_cutoff=max(score_cutoff - 0.5, 0) or None,
+        workers=_workers(),
+    )
+    return np.rint(scores).astype(np.int64)
+
+
+def score_one_to_many(query, choices, score_cutoff=0, limit=None, prepared=False):
+    """
+    Scores one text against N choice texts.
+    Returns (index, score) pairs for choices scoring at least `score_cutoff`,
+    best first and capped at `limit` when one is given.
+    """
+    row = score_matrix([query], choices, score_cutoff=score_cutoff, prepared=prepared)[0]
+    return top_k(row, limit, score_cutoff)
+
+
+def top_k(row, limit=None, score_cutoff=0):
+    """Best-first (index, score) pairs from a row of scores."""
+    keep = np.flatnonzero(row >= score_cutoff)
+    if limit is not None and len(keep) > limit:
+        # Partial selection is O(N); only the survivors get fully sorted.
+        keep = keep[np.argpartition(-row[keep], limit - 1)[:limit]]
+    keep = keep[np.lexsort((keep, -row[keep]))]
+    return [(int(i), int(row[i])) for i in keep]
+
+
+def score_pair(query, choice, prepared=False):
+    return int(score_matrix([query], [choice], prepared=prepared)[0, 0])
@@ -0,0 +1,161 @@
+"""
+Full-text item search on the SQLite FTS5 table `app_itemsearch`.
+
+The table (created by migration 0008) is kept in sync with LostItem/FoundItem
+by post_save/post_delete signals, ranked with bm25 and paginated with an opaque
+keyset cursor on (rank, rowid), so deep pages never use OFFSET. Code that writes
+items without signals (bulk_create, queryset.update) must call `index_item`
+(`index_items` for new rows) or run `manage.py rebuild_search_index`.
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+from .pagination import decode_cursor, encode_cursor
+
+SEARCH_TABLE = 'app_itemsearch'
+
+# bm25 column weights: name, description, features (kind/item_id are unindexed).
+BM25_WEIGHTS = (0.0, 0.0, 10.0, 3.0, 2.0)
+
+# Control characters used to mark snippet matches before HTML-escaping.
+_MARK_OPEN, _MARK_CLOSE = '\x02', '\x03'
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(query):
+    """
+    Turns free user input into a safe FTS5 MATCH expression: every word is
+    quoted (so FTS5 operators in the input are inert) and prefix-matched.
+    """
+    terms = _TERM_RE.findall(query or '')
+    return ' '.join(f'"{term}"*' for term in terms[:16])
+
+
+def _search_after(cursor):
+    """(rank, rowid) from a search cursor, or None for a missing or malformed one."""
+    values = decode_cursor(cursor)
+    if values is None or len(values) != 2:
+        return None
+    try:
+        return float(values[0]), int(values[1])
+    except (TypeError, ValueError):
+        return None
+
+
+def _highlight(snippet):
+    return escape(snippet).replace(_MARK_OPEN, '<mark>').replace(_MARK_CLOSE, '</mark>')
+
+
+def search_items(query, kind=None, cursor=None, limit=20):
+    """
+    Searches lost and/or found items.
+    Returns (results, next_cursor) where each result is a dict with kind,
+    item_id, rank and an HTML-safe snippet; next_cursor is None on the last page.
+    """
+    match = build_match_query(query)
+    if not match:
+        return [], None
+
+    rank_sql = f"bm25({SEARCH_TABLE}, {', '.join(str(w) for w in BM25_WEIGHTS)})"
+    sql = [
+        f"SELECT * FROM ("
+        f"  SELECT rowid, kind, item_id, {rank_sql} AS score,"
+        f"         snippet({SEARCH_TABLE}, -1, %s, %s, '…', 16) AS snippet"
+        f"  FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+        f") WHERE 1 = 1"
+    ]
+    params = [_MARK_OPEN, _MARK_CLOSE, match]
+    if kind in ('lost', 'found'):
+        sql.append("AND kind = %s")
+        params.append(kind)
+    after = _search_after(cursor)
+    if after is not None:
+        sql.append("AND (score > %s OR (score = %s AND rowid > %s))")
+        params.extend([after[0], after[0], after[1]])
+    sql.append("ORDER BY score, rowid LIMIT %s")
+    params.append(limit + 1)
+
+    with connection.cursor() as db:
+        db.execute(' '.join(sql), params)
+        rows = db.fetchall()
+
+    results = [
+        {
+            'kind': row_kind,
+            'item_id': item_id,
+            'rank': score,
+            'snippet': _highlight(snippet),
+        }
+        for rowid, row_kind, item_id, score, snippet in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last[3], last[0])
+    return results, next_cursor
+
+
+def matching_ids(query, kind):
+    """
+    Subquery of the item IDs of one kind matching `query`, for `id__in`
+    filters (used by the admin). Only open items are indexed.
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+    return RawSQL(f"SELECT item_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND kind = %s", [match, kind])
+
+
+def _rowid(kind, item_id):
+    return item_id * 2 + (1 if kind == 'found' else 0)
+
+
+def index_item(kind, item):
+    """Inserts or replaces one item's row in the FTS table."""
+    rowid = _rowid(kind, item.id)
+    with connection.cursor() as db:
+        db.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [rowid])
+        db.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, kind, item_id, name, description, features) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [rowid, kind, item.id, item.name, item.description, item.features],
+        )
+
+
+
+def index_items(kind, items):
+    """Inserts the rows of newly created items (e.g. from bulk_create) in one statement."""
+    with connection.cursor() as db:
+        db.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, kind, item_id, name, description, features) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [(_rowid(kind, item.id), kind, item.id, item.name, item.description, item.features) for item in items],
+        )
+
+def remove_item(kind, item_id):
+    with connection.cursor() as db:
+        db.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [_rowid(kind, item_id)])
+
+
+def remove_items(kind, item_ids):
+    with connection.cursor() as db:
+        db.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [[_rowid(kind, item_id)] for item_id in item_ids])
+
+
+def rebuild_index():
+    """Repopulates the FTS table from the open items. Returns the row count."""
+    with connection.cursor() as db:
+        db.execute(f"DELETE FROM {SEARCH_TABLE}")
+        db.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, kind, item_id, name, description, features) "
+            "SELECT id * 2, 'lost', id, name, description, features FROM app_lostitem WHERE status = 'OPEN' "
+            "UNION ALL "
+            "SELECT id * 2 + 1, 'found', id, name, description, features FROM app_founditem WHERE status = 'OPEN'"
+        )
+        db.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+        db.execute(f"SELECT count(*) FROM {SEARCH_TABLE}")
+        return db.fetchone()[0]
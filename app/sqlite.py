@@ -0,0 +1,51 @@
+"""
+Per-connection SQLite tuning.
+
+Every new SQLite connection gets the pragmas from SQLITE_PRAGMAS (see
+settings), applied by the connection_created receiver in models.py:
+
+- journal_mode=WAL: readers no longer block the writer, or the reverse;
+- busy_timeout: wait for a lock instead of failing with "database is locked";
+- synchronous=NORMAL: safe with WAL, and skips an fsync per commit;
+- mmap_size / cache_size: keep hot pages in memory.
+
+journal_mode is stored in the database file, so it is only changed when it
+differs; in-memory databases (the test database) keep their own mode.
+"""
+from django.conf import settings
+
+def pragmas():
+    # No pragmas (SQLite's own defaults) unless SQLITE_PRAGMAS is set.
+    return getattr(settings, 'SQLITE_PRAGMAS', {})
+
+
+def _read(cursor, name):
+    cursor.execute(f'PRAGMA {name}')
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def apply_pragmas(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        # busy_timeout first, so waiting applies to the journal_mode switch too.
+        for name, value in sorted(pragmas().items(), key=lambda item: item[0] != 'busy_timeout'):
+            if name == 'journal_mode':
+                current = str(_read(cursor, name)).lower()
+                if current == 'memory' or current == str(value).lower():
+                    continue
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+# PRAGMA synchronous reads back as a number.
+SYNCHRONOUS_NAMES = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+
+
+def effective_pragmas(connection, names=None):
+    """{pragma: value} as the connection currently sees them."""
+    with connection.cursor() as cursor:
+        values = {name: _read(cursor, name) for name in (names or pragmas())}
+    if 'synchronous' in values:
+        values['synchronous'] = SYNCHRONOUS_NAMES.get(values['synchronous'], values['synchronous'])
+    return values
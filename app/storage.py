@@ -0,0 +1,141 @@
+"""
+Content-addressed, reference-counted storage for item photos.
+
+Uploads are stored under their SHA-256 digest, sharded by the first two byte
+pairs (`photos/ab/cd/abcd....jpg`), so the same picture uploaded twice is one
+file on disk. The digest is computed from the upload's chunks, never reading
+the whole file into memory.
+
+Every save adds a reference to a StoredFile row and every delete removes one;
+the file is only removed once nothing refers to it. Rows of processed uploads
+are kept (with no references) to remember what processing produced, so a
+duplicate upload reuses that output instead of being processed again (see
+images.process_item_photo).
+
+Files saved before this storage existed are not tracked and are deleted
+normally; `manage.py migrate_media` moves them into the content-addressed
+layout.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+ROOT = 'photos'
+
+
+def content_digest(content):
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def content_name(digest, filename):
+    _, ext = os.path.splitext(filename)
+    return f"{ROOT}/{digest[:2]}/{digest[2:4]}/{digest}{ext.lower()}"
+
+
+def is_content_addressed(name):
+    return bool(name) and name.startswith(ROOT + '/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # The final name depends on the content, chosen in _save.
+        return name
+
+    def _save(self, name, content):
+        from .models import StoredFile
+
+        name = content_name(content_digest(content), name)
+        if not self.exists(name):
+            self._write(name, content)
+        # One upsert instead of get_or_create + update: uploads are on the request path.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {StoredFile._meta.db_table} (name, size, refs, processed, created_at) "
+                "VALUES (%s, %s, 1, '{}', %s) ON CONFLICT (name) DO UPDATE SET refs = refs + 1",
+                [name, content.size, timezone.now()],
+            )
+        return name
+
+    def _write(self, name, content):
+        """
+        Writes `content` to a temporary file moved over `name`. A concurrent
+        save of the same upload writes the same bytes, so the last move wins
+        (FileSystemStorage._save would retry the taken name forever).
+        """
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temporary, self.file_permissions_mode)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    def retain(self, names):
+        """Adds a reference to each of `names`, for a new record reusing stored files."""
+        from .models import StoredFile
+        for name in names:
+            StoredFile.objects.filter(name=name).update(refs=F('refs') + 1)
+
+    def delete(self, name):
+        """Drops one reference to `name`; the file goes once no references remain."""
+        from .models import StoredFile
+
+        if not name:
+            return
+        with transaction.atomic():
+            if not StoredFile.objects.filter(name=name, refs__gt=0).update(refs=F('refs') - 1):
+                super().delete(name)  # untracked (pre-migration) or already released
+                return
+            stored = StoredFile.objects.select_for_update().get(name=name)
+            if stored.refs > 0:
+                return
+            if not stored.processed:
+                stored.delete()
+        super().delete(name)
+
+    def processed(self, name):
+        """
+        Processing output remembered for the upload `name`, or None if it was
+        never processed or the files it points to have since been deleted.
+        """
+        from .models import StoredFile
+
+        stored = StoredFile.objects.filter(name=name).only('processed').first()
+        if stored is None or not stored.processed:
+            return None
+        names = set(stored.processed['renditions'].values())
+        if StoredFile.objects.filter(name__in=names, refs__gt=0).count() < len(names):
+            return None
+        return stored.processed
+
+    def remember_processed(self, name, processed):
+        from .models import StoredFile
+        StoredFile.objects.filter(name=name).update(processed=processed)
+
+
+_photo_storage = ContentAddressedStorage()
+
+
+def photo_storage():
+    """Storage of the item photo fields (a callable, so migrations reference it by path)."""
+    return _photo_storage
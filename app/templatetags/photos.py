@@ -0,0 +1,17 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag
+def photo_url(item, rendition='thumb'):
+    """
+    URL of an item photo's rendition ('thumb', 'medium', ...), falling back to the
+    original upload until the background job has generated the renditions.
+    """
+    if not item.photo:
+        return ''
+    name = item.photo_renditions.get(rendition)
+    if name:
+        return item.photo.storage.url(name)
+    return item.photo.url
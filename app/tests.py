@@ -1,3 +1,1423 @@
-from django.test import TestCase
+import random
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncClient, Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from . import notification_cache
+from .models import (
+    LostItem, FoundItem, MatchCandidate, MatchEvent, MatchNotificationStatus, Job, StoredFile, ItemToken,
+    ArchivedItem, ArchivedMatchStatus, Category,
+)
+
+
+TEST_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def setUpModule():
+    notification_cache.clear()
+
+
+def tearDownModule():
+    shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
+
+def make_user(username):
+    return User.objects.create_user(
+        username=username,
+        email=f"{username}@raghuinstech.com",
+        password='s3cret-pass',
+    )
+
+
+def make_photo(name='photo.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (8, 8), 'black').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(JOBS_RUN_INLINE=True)
+class MatchCandidateTests(TestCase):
+    def setUp(self):
+        notification_cache.clear()
+        self.owner = make_user('owner')
+        self.finder = make_user('finder')
+        self.lost = LostItem.objects.create(
+            user=self.owner, name='Black wallet', description='Leather wallet', features='Has a student ID'
+        )
+
+    def test_saving_found_item_scores_it_against_lost_items(self):
+        found = FoundItem.objects.create(
+            user=self.finder, name='Wallet', description='Black leather wallet', features='Student ID inside'
+        )
+        candidate = MatchCandidate.objects.get(lost_item=self.lost, found_item=found)
+        self.assertGreater(candidate.score, 0)
+
+    def test_items_without_shared_tokens_are_not_scored(self):
+        FoundItem.objects.create(user=self.finder, name='Umbrella', description='Blue folding', features='')
+        self.assertFalse(MatchCandidate.objects.exists())
+
+    def test_blocking_ranks_rare_shared_tokens_first(self):
+        from .blocking import candidate_found_ids
+
+        FoundItem.objects.create(user=self.finder, name='Black bottle', description='', features='')
+        FoundItem.objects.create(user=self.finder, name='Black pen', description='', features='')
+        rare = FoundItem.objects.create(user=self.finder, name='Leather pouch', description='', features='')
+        FoundItem.objects.create(user=self.finder, name='Umbrella', description='', features='')
+        self.assertEqual(len(candidate_found_ids(self.lost)), 3)
+        self.assertEqual(candidate_found_ids(self.lost, limit=1), [rare.id])
+
+    def test_own_items_are_never_candidates(self):
+        FoundItem.objects.create(user=self.owner, name='Wallet', description='wallet', features='')
+        self.assertFalse(MatchCandidate.objects.exists())
+
+    def test_deleting_found_item_removes_its_candidates(self):
+        found = FoundItem.objects.create(user=self.finder, name='Wallet', description='wallet', features='')
+        found.delete()
+        self.assertFalse(MatchCandidate.objects.exists())
+
+    def test_rebuild_matches_incremental_scores(self):
+        from django.core.management import call_command
+
+        FoundItem.objects.create(user=self.finder, name='Wallet', description='black wallet', features='ID')
+        FoundItem.objects.create(user=self.owner, name='Umbrella', description='blue', features='')
+        before = list(MatchCandidate.objects.values_list('lost_item', 'found_item', 'score'))
+        call_command('rebuild_match_candidates', stdout=StringIO())
+        after = list(MatchCandidate.objects.values_list('lost_item', 'found_item', 'score'))
+        self.assertEqual(before, after)
+
+    def test_stale_rebuild_scores_items_without_candidates(self):
+        from django.core.management import call_command
+
+        found = FoundItem.objects.create(user=self.finder, name='Wallet', description='black wallet', features='ID')
+        MatchCandidate.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_match_candidates', '--stale', stdout=out)
+        self.assertIn('for 1 lost item(s)', out.getvalue())
+        self.assertTrue(MatchCandidate.objects.filter(lost_item=self.lost, found_item=found).exists())
+
+    def test_dashboard_hides_actioned_matches(self):
+        found = FoundItem.objects.create(user=self.finder, name='Wallet', description='wallet', features='')
+        self.client.force_login(self.owner)
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.context['notification_count'], 1)
+
+        MatchNotificationStatus.objects.create(
+            lost_item=self.lost, found_item=found, notified_user=self.owner, status='IGNORED'
+        )
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.context['notification_count'], 0)
+
+
+class ScoringParityTests(TestCase):
+    """The RapidFuzz batch scorer must reproduce fuzzywuzzy's token_sort_ratio."""
+
+    texts = [
+        'black leather wallet with student id',
+        'Wallet, black; ID card inside!',
+        'blue hydro flask water bottle dented',
+        'steel water bottle blue sticker',
+        'casio scientific calculator fx-991',
+        'keys on a red lanyard, 3 keys',
+        'red lanyard with hostel room key',
+        'boAt earphones white case',
+        '',
+        'umbrella',
+    ]
+
+    def test_matrix_matches_fuzzywuzzy(self):
+        from fuzzywuzzy import fuzz
+        from .scoring import score_matrix
+
+        matrix = score_matrix(self.texts, self.texts)
+        for i, a in enumerate(self.texts):
+            for j, b in enumerate(self.texts):
+                self.assertEqual(matrix[i][j], fuzz.token_sort_ratio(a, b), (a, b))
+
+    def test_prepared_texts_score_the_same(self):
+        from .scoring import normalize_text, score_matrix
+
+        prepared = [normalize_text(text) for text in self.texts]
+        self.assertEqual(
+            score_matrix(prepared, prepared, prepared=True).tolist(),
+            score_matrix(self.texts, self.texts).tolist(),
+        )
+
+    def test_one_to_many_cutoff_and_top_k(self):
+        from fuzzywuzzy import fuzz
+        from .scoring import score_one_to_many
+
+        query = 'black wallet student id'
+        expected = sorted(
+            ((i, fuzz.token_sort_ratio(query, t)) for i, t in enumerate(self.texts)),
+            key=lambda pair: (-pair[1], pair[0]),
+        )
+        self.assertEqual(score_one_to_many(query, self.texts), expected)
+        self.assertEqual(score_one_to_many(query, self.texts, limit=3), expected[:3])
+        self.assertEqual(
+            score_one_to_many(query, self.texts, score_cutoff=40),
+            [pair for pair in expected if pair[1] >= 40],
+        )
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.finder = make_user('finder')
+        self.wallet = FoundItem.objects.create(
+            user=self.finder, name='Black wallet', description='Leather, <b>worn</b> edges', features='ID card'
+        )
+        FoundItem.objects.create(user=self.finder, name='Water bottle', description='Blue steel', features='')
+
+    def test_signals_keep_index_in_sync(self):
+        from .search import search_items
+
+        results, _ = search_items('walle')
+        self.assertEqual([r['item_id'] for r in results], [self.wallet.id])
+
+        self.wallet.name = 'Brown purse'
+        self.wallet.save()
+        self.assertEqual(search_items('wallet')[0], [])
+        self.wallet.delete()
+        self.assertEqual(search_items('purse')[0], [])
+
+    def test_snippets_are_escaped(self):
+        from .search import search_items
+
+        results, _ = search_items('worn')
+        self.assertIn('&lt;b&gt;<mark>worn</mark>&lt;/b&gt;', results[0]['snippet'])
+
+    def test_keyset_pagination_visits_every_result_once(self):
+        from .search import search_items
+
+        for i in range(5):
+            FoundItem.objects.create(user=self.finder, name=f'Umbrella {i}', description='umbrella', features='')
+        seen, cursor = [], None
+        while True:
+            results, cursor = search_items('umbrella', cursor=cursor, limit=2)
+            seen.extend(r['item_id'] for r in results)
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_search_view_ignores_fts_syntax(self):
+        response = self.client.get('/search/', {'q': '"wallet* ^(', 'kind': 'found'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['results']), 1)
+
+    def test_admin_search_covers_open_and_closed_items(self):
+        from .lifecycle import close_items
+
+        bottle = FoundItem.objects.get(name='Water bottle')
+        returned = FoundItem.objects.create(user=self.finder, name='Wallet chain', description='', features='')
+        close_items(FoundItem, [returned.id], 'RESOLVED')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 's3cret-pass'))
+        response = self.client.get('/admin/app/founditem/', {'q': 'wallet'})
+        found = {item.id for item in response.context['cl'].result_list}
+        self.assertEqual(found, {self.wallet.id, returned.id})
+        self.assertNotIn(bottle.id, found)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.owner = make_user('owner')
+        self.finder = make_user('finder')
+
+    def test_saving_an_item_queues_matching_instead_of_running_it(self):
+        from . import jobs
+
+        lost = LostItem.objects.create(user=self.owner, name='Black wallet', description='', features='')
+        FoundItem.objects.create(user=self.finder, name='Wallet', description='black', features='')
+        self.assertFalse(MatchCandidate.objects.exists())
+
+        claimed = jobs.claim('test-worker')
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(jobs.claim('other-worker'), [])
+        for job in claimed:
+            self.assertTrue(jobs.execute(job))
+
+        self.assertTrue(MatchCandidate.objects.filter(lost_item=lost).exists())
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 2)
+
+    def test_finished_jobs_are_pruned_after_the_retention_period(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from . import jobs
+
+        LostItem.objects.create(user=self.owner, name='Black wallet', description='', features='')
+        for job in jobs.claim('w'):
+            jobs.execute(job)
+        failed = Job.objects.create(name='explode', status=Job.FAILED, run_after=timezone.now())
+        self.assertEqual(jobs.prune_done(), 0)
+        self.assertEqual(jobs.prune_done(now=timezone.now() + timedelta(days=2)), 1)
+        self.assertEqual(list(Job.objects.all()), [failed])
+
+    def test_failed_jobs_back_off_then_fail(self):
+        from . import jobs
+
+        jobs.HANDLERS['explode'] = lambda: 1 / 0
+        self.addCleanup(jobs.HANDLERS.pop, 'explode')
+        job = jobs.enqueue('explode', max_attempts=2)
+
+        self.assertFalse(jobs.execute(jobs.claim('w')[0]))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertIn('ZeroDivisionError', job.last_error)
+        self.assertEqual(jobs.claim('w'), [])  # waiting for its backoff
+
+        Job.objects.filter(id=job.id).update(run_after=job.created_at)
+        self.assertFalse(jobs.execute(jobs.claim('w')[0]))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+
+@override_settings(JOBS_RUN_INLINE=True, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class QueryBudgetTests(TestCase):
+    """
+    Every view gets a fixed query budget, checked with a small and a large data
+    set so a query count that grows with the number of rows (N+1) fails.
+    """
+
+    def setUp(self):
+        from . import phash
+
+        notification_cache.clear()
+        # Budgets are for a running process, whose photo indexes are already built.
+        for model in (LostItem, FoundItem):
+            phash.invalidate(model)
+            phash.photo_index(model)
+        self.owner = make_user('owner')
+        self.finder = make_user('finder')
+        self.lost = LostItem.objects.create(
+            user=self.owner, name='Black wallet', description='leather', features='student id'
+        )
+        self.found = FoundItem.objects.create(
+            user=self.finder, name='Wallet', description='black leather', features='id card'
+        )
+        self.client.force_login(self.owner)
+
+    def grow(self, count=15):
+        for i in range(count):
+            finder = User.objects.create(username=f'finder{i}')
+            LostItem.objects.create(user=self.owner, name=f'Black bag {i}', description='wallet', features='')
+            FoundItem.objects.create(user=finder, name=f'Wallet {i}', description='black bag', features='')
+            FoundItem.objects.create(user=self.owner, name=f'Umbrella {i}', description='blue', features='')
+
+    def assertQueryBudget(self, budget, request):
+        """Runs `request` before and after growing the data; both must use `budget` queries."""
+        with self.assertNumQueries(budget):
+            request()
+        self.grow()
+        with self.assertNumQueries(budget):
+            request()
+
+    def test_index(self):
+        self.assertQueryBudget(2, lambda: self.client.get('/'))
+
+    def test_search(self):
+        self.assertQueryBudget(3, lambda: self.client.get('/search/', {'q': 'wallet'}))
+
+    def test_dashboard(self):
+        def request():
+            response = self.client.get('/dashboard/')
+            self.assertGreater(response.context['notification_count'], 0)
+        self.assertQueryBudget(7, request)
+
+    def test_report_lost_form(self):
+        self.assertQueryBudget(4, lambda: self.client.get('/report-lost/'))
+
+    def test_report_found_form(self):
+        self.assertQueryBudget(4, lambda: self.client.get('/report-found/'))
+
+    def test_view_notification(self):
+        url = f'/notification/{self.lost.id}/{self.found.id}/'
+        self.assertQueryBudget(6, lambda: self.client.get(url))
+
+    def test_match_action(self):
+        other = FoundItem.objects.create(user=self.finder, name='Wallet', description='brown', features='')
+        urls = [f'/notification/action/{self.lost.id}/{found.id}/ignore/' for found in (other, self.found)]
+        self.assertQueryBudget(10, lambda: self.client.post(urls.pop()))
+
+    def test_report_lost(self):
+        data = {'name': 'Black wallet', 'description': 'leather', 'features': 'student id'}
+        self.assertQueryBudget(23, lambda: self.client.post('/report-lost/', data))
+
+    def test_report_found(self):
+        def request():
+            data = {'name': 'Black wallet', 'description': 'leather', 'features': 'id', 'photo': make_photo()}
+            self.assertEqual(self.client.post('/report-found/', data).status_code, 302)
+        self.assertQueryBudget(42, request)
+
+    def test_delete_found(self):
+        items = [
+            FoundItem.objects.create(user=self.owner, name='Black wallet', description='', features='')
+            for _ in range(2)
+        ]
+        self.assertQueryBudget(11, lambda: self.client.get(f'/delete-found/{items.pop().id}/'))
+
+    def test_signup_form(self):
+        self.assertQueryBudget(0, lambda: Client().get('/signup/'))
+
+    def test_logout(self):
+        self.grow()
+        with self.assertNumQueries(4):
+            self.client.get('/logout/')
+
+    def test_delete_lost(self):
+        items = [
+            LostItem.objects.create(user=self.owner, name='Black wallet', description='', features='')
+            for _ in range(2)
+        ]
+        self.assertQueryBudget(10, lambda: self.client.get(f'/delete-lost/{items.pop().id}/'))
+
+    def test_login(self):
+        data = {'email': 'OWNER@raghuinstech.com', 'password': 's3cret-pass'}
+        self.assertQueryBudget(11, lambda: Client().post('/login/', data))
+
+
+class KeysetPaginationTests(TestCase):
+    def test_pages_cover_every_item_once_newest_first(self):
+        from .pagination import KeysetPage
+
+        owner = make_user('owner')
+        items = [LostItem.objects.create(user=owner, name=f'Item {i}', description='', features='') for i in range(7)]
+        # Identical timestamps must still page deterministically by id.
+        LostItem.objects.filter(id__in=[items[2].id, items[3].id]).update(date_reported=items[2].date_reported)
+
+        seen, cursor = [], None
+        while True:
+            page = KeysetPage(LostItem.objects.filter(user=owner), cursor, size=3)
+            seen.extend(item.id for item in page)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        expected = list(LostItem.objects.order_by('-date_reported', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_malformed_cursor_starts_from_the_first_page(self):
+        from .pagination import KeysetPage
+
+        owner = make_user('owner')
+        item = LostItem.objects.create(user=owner, name='Item', description='', features='')
+        self.assertEqual(list(KeysetPage(LostItem.objects.all(), 'not-a-cursor')), [item])
+
+    @override_settings(JOBS_RUN_INLINE=True, ITEMS_PAGE_SIZE=2)
+    def test_dashboard_notifications_page_best_score_first(self):
+        notification_cache.clear()
+        owner, finder = make_user('owner'), make_user('finder')
+        LostItem.objects.create(user=owner, name='Black leather wallet', description='college id', features='')
+        LostItem.objects.create(user=owner, name='Black wallet', description='', features='')
+        for name in ('Black leather wallet', 'Black wallet', 'Leather wallet'):
+            FoundItem.objects.create(user=finder, name=name, description='college id', features='')
+        expected = list(
+            MatchCandidate.objects.order_by('-score', '-found_item_id', '-lost_item_id')
+            .values_list('lost_item_id', 'found_item_id')
+        )
+        self.assertGreater(len(expected), 2)
+
+        self.client.force_login(owner)
+        seen, cursor = [], None
+        while True:
+            response = self.client.get('/dashboard/', {'notification_cursor': cursor} if cursor else {})
+            self.assertLessEqual(len(response.context['notifications']), 2)
+            self.assertEqual(response.context['notification_count'], len(expected))
+            seen.extend((note['my_item_id'], note['match_id']) for note in response.context['notifications'])
+            cursor = response.context['notification_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+
+@override_settings(JOBS_RUN_INLINE=True, MEDIA_ROOT=TEST_MEDIA_ROOT, PHOTO_MAX_DIMENSION=1000)
+class PhotoProcessingTests(TestCase):
+    def setUp(self):
+        self.finder = make_user('finder')
+
+    def upload(self, size=(1600, 1200), orientation=None):
+        exif = Image.Exif()
+        exif[0x0110] = 'PhoneCam'  # camera model
+        if orientation:
+            exif[0x0112] = orientation
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, 'JPEG', exif=exif.tobytes())
+        return SimpleUploadedFile('phone.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_original_is_rotated_downscaled_and_stripped(self):
+        item = FoundItem.objects.create(
+            user=self.finder, name='Wallet', description='', features='', photo=self.upload(orientation=6)
+        )
+        item.refresh_from_db()
+        with Image.open(item.photo.path) as original:
+            # Orientation 6 is a 90 degree rotation, so portrait after transposing.
+            self.assertEqual(original.size, (750, 1000))
+            self.assertEqual(len(original.getexif()), 0)
+
+    def test_webp_renditions_are_generated_and_used(self):
+        from .templatetags.photos import photo_url
+
+        item = FoundItem.objects.create(user=self.finder, name='Wallet', description='', features='', photo=self.upload())
+        item.refresh_from_db()
+        with Image.open(item.photo.storage.path(item.photo_renditions['thumb'])) as thumb:
+            self.assertEqual(thumb.format, 'WEBP')
+            self.assertEqual(max(thumb.size), 160)
+        self.assertEqual(photo_url(item, 'medium'), item.photo.storage.url(item.photo_renditions['medium']))
+        self.assertTrue(photo_url(item, 'medium').endswith('.webp'))
+
+    @override_settings(JOBS_RUN_INLINE=False)
+    def test_only_items_with_new_photos_queue_processing(self):
+        owner = make_user('owner')
+        LostItem.objects.create(user=owner, name='Wallet', description='', features='')
+        self.assertFalse(Job.objects.filter(name='process_photo').exists())
+
+        FoundItem.objects.create(user=self.finder, name='Wallet', description='', features='', photo=self.upload())
+        self.assertEqual(Job.objects.filter(name='process_photo').count(), 1)
+
+
+def pattern_photo(seed, name='item.png'):
+    rng = random.Random(seed)
+    image = Image.new('RGB', (64, 64))
+    image.putdata([(rng.randrange(256),) * 3 for _ in range(64 * 64)])
+    image = image.resize((256, 256), Image.Resampling.BOX)
+    buffer = BytesIO()
+    image.save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(JOBS_RUN_INLINE=True, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class PhotoMatchingTests(TestCase):
+    def test_multi_index_search_matches_a_linear_scan(self):
+        from .phash import MultiIndexHash, hamming
+
+        rng = random.Random(7)
+        hashes = [rng.getrandbits(64) for _ in range(300)]
+        hashes += [value ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for value in hashes[:100]]
+        index = MultiIndexHash()
+        for item_id, value in enumerate(hashes):
+            index.add(value, item_id)
+
+        for probe in hashes[:50] + [rng.getrandbits(64) for _ in range(50)]:
+            found, _ = index.search(probe, 10)
+            expected = sorted((hamming(probe, value), i) for i, value in enumerate(hashes) if hamming(probe, value) <= 10)
+            self.assertEqual(found, expected)
+
+    def test_same_photo_is_matched_despite_different_text(self):
+        from .views import check_for_matches
+
+        owner, finder = make_user('owner'), make_user('finder')
+        lost = LostItem.objects.create(
+            user=owner, name='Calculator', description='Casio', features='', photo=pattern_photo(1, 'lost.png')
+        )
+        other = FoundItem.objects.create(
+            user=finder, name='Umbrella', description='', features='', photo=pattern_photo(2, 'other.png')
+        )
+        found = FoundItem.objects.create(
+            user=finder, name='Gadget', description='', features='', photo=pattern_photo(1, 'found.png')
+        )
+
+        lost.refresh_from_db()
+        self.assertEqual(len(lost.photo_phash), 16)
+        candidate = MatchCandidate.objects.get(lost_item=lost, found_item=found)
+        self.assertEqual(candidate.photo_score, 100)
+        self.assertFalse(MatchCandidate.objects.filter(lost_item=lost, found_item=other).exists())
+        self.assertIn(100, [match['photo_score'] for match in check_for_matches(lost)])
+
+    def test_photo_index_is_kept_across_hashes_and_closes(self):
+        from .lifecycle import close_items
+        from .phash import invalidate, photo_index, similar_photo_ids
+
+        finder = make_user('finder')
+        invalidate(FoundItem)
+        first = FoundItem.objects.create(user=finder, name='Gadget', description='', features='', photo=pattern_photo(1, 'a.png'))
+        index = photo_index(FoundItem)
+        second = FoundItem.objects.create(user=finder, name='Gadget', description='', features='', photo=pattern_photo(1, 'b.png'))
+        first.refresh_from_db()
+        self.assertIs(photo_index(FoundItem), index)
+        self.assertEqual(index.size, 2)
+        self.assertEqual(similar_photo_ids(FoundItem, first.photo_phash), [first.id, second.id])
+
+        close_items(FoundItem, [first.id], 'EXPIRED')
+        self.assertIs(photo_index(FoundItem), index)
+        self.assertEqual(similar_photo_ids(FoundItem, first.photo_phash), [second.id])
+
+
+@override_settings(JOBS_RUN_INLINE=True, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.owner, self.finder = make_user('owner'), make_user('finder')
+
+    def test_duplicate_uploads_share_files_and_processing(self):
+        from . import images
+
+        lost = LostItem.objects.create(user=self.owner, name='Wallet', description='', features='', photo=pattern_photo(3))
+        with patch.object(images, 'process_photo', wraps=images.process_photo) as process:
+            found = FoundItem.objects.create(
+                user=self.finder, name='Wallet', description='', features='', photo=pattern_photo(3, 'copy.png')
+            )
+        lost.refresh_from_db()
+        found.refresh_from_db()
+
+        process.assert_not_called()
+        self.assertTrue(lost.photo.name.startswith('photos/'))
+        self.assertEqual(found.photo.name, lost.photo.name)
+        self.assertEqual(found.photo_renditions, lost.photo_renditions)
+        self.assertEqual(found.photo_phash, lost.photo_phash)
+        self.assertEqual(StoredFile.objects.get(name=lost.photo.name).refs, 2)
+
+        storage = lost.photo.storage
+        lost.delete()
+        self.assertTrue(storage.exists(found.photo.name))
+        found.delete()
+        for name in found.photo_renditions.values():
+            self.assertFalse(storage.exists(name))
+
+    def test_saving_content_already_on_disk_succeeds(self):
+        from .storage import photo_storage
+
+        storage = photo_storage()
+        name = storage.save('first.png', pattern_photo(6))
+        # As if a concurrent upload wrote the file after this save checked for it.
+        with patch.object(type(storage), 'exists', return_value=False):
+            self.assertEqual(storage._save('second.png', pattern_photo(6)), name)
+        self.assertEqual(StoredFile.objects.get(name=name).refs, 2)
+        with storage.open(name) as stored:
+            self.assertEqual(stored.read(), pattern_photo(6).read())
+
+    def test_migrate_media_moves_and_merges_legacy_files(self):
+        from django.core.files.storage import FileSystemStorage
+        from django.core.management import call_command
+
+        legacy = FileSystemStorage(location=TEST_MEDIA_ROOT)
+        names = [legacy.save(f'found_photos/{name}', pattern_photo(4)) for name in ('a.png', 'b.png')]
+        items = [
+            FoundItem.objects.create(user=self.finder, name='Phone', description='', features='', photo='')
+            for _ in names
+        ]
+        for item, name in zip(items, names):
+            FoundItem.objects.filter(id=item.id).update(photo=name)
+
+        call_command('migrate_media', stdout=StringIO())
+
+        migrated = set(FoundItem.objects.values_list('photo', flat=True))
+        self.assertEqual(len(migrated), 1)
+        self.assertTrue(migrated.pop().startswith('photos/'))
+        self.assertFalse(any(legacy.exists(name) for name in names))
+
+
+@override_settings(JOBS_RUN_INLINE=True)
+class NotificationCacheTests(TestCase):
+    def setUp(self):
+        from . import metrics
+
+        notification_cache.clear()
+        metrics.registry.reset()
+        self.owner, self.finder = make_user('owner'), make_user('finder')
+        self.lost = LostItem.objects.create(user=self.owner, name='Black wallet', description='leather', features='')
+        self.client.force_login(self.owner)
+
+    def notification_names(self):
+        return [note['match_item_name'] for note in self.client.get('/dashboard/').context['notifications']]
+
+    def test_repeat_views_hit_the_cache(self):
+        from . import metrics
+
+        FoundItem.objects.create(user=self.finder, name='Wallet', description='black', features='')
+        self.notification_names()
+        with CaptureQueriesContext(connection) as captured:
+            self.notification_names()
+        self.assertFalse([q for q in captured.captured_queries if 'app_matchcandidate' in q['sql']])
+        stats = notification_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertIn('app_notification_cache_events_total{event="hits"} 1', metrics.render(metrics.collect()))
+
+    def test_item_and_status_changes_invalidate(self):
+        self.assertEqual(self.notification_names(), [])
+        found = FoundItem.objects.create(user=self.finder, name='Wallet', description='black', features='')
+        self.assertEqual(self.notification_names(), ['Wallet'])
+
+        found.name = 'Leather wallet'
+        found.save()
+        self.assertEqual(self.notification_names(), ['Leather wallet'])
+
+        status = MatchNotificationStatus.objects.create(
+            lost_item=self.lost, found_item=found, notified_user=self.owner, status='IGNORED'
+        )
+        self.assertEqual(self.notification_names(), [])
+        status.delete()
+        self.assertEqual(self.notification_names(), ['Leather wallet'])
+
+        found.delete()
+        self.assertEqual(self.notification_names(), [])
+
+    def test_other_users_entries_survive(self):
+        other = make_user('other')
+        notification_cache.get_notifications(other, lambda user: ['cached'])
+        FoundItem.objects.create(user=self.finder, name='Wallet', description='black', features='')
+        self.assertEqual(notification_cache.get_notifications(other, lambda user: []), ['cached'])
+
+
+
+@override_settings(JOBS_RUN_INLINE=True)
+class BulkMatchActionTests(TestCase):
+    def setUp(self):
+        notification_cache.clear()
+        self.owner, self.finder = make_user('owner'), make_user('finder')
+        self.lost = LostItem.objects.create(user=self.owner, name='Black wallet', description='leather', features='')
+        self.found = [
+            FoundItem.objects.create(user=self.finder, name=name, description='black leather', features='')
+            for name in ('Black wallet', 'Wallet', 'Black leather purse')
+        ]
+        self.client.force_login(self.owner)
+
+    def pending(self):
+        return {note['match_id'] for note in self.client.get('/dashboard/').context['notifications']}
+
+    def test_selected_pairs_are_upserted_in_one_statement(self):
+        first, second, third = self.found
+        MatchNotificationStatus.objects.create(
+            lost_item=self.lost, found_item=first, notified_user=self.owner, status='PENDING'
+        )
+        self.assertEqual(self.pending(), {second.id, third.id})  # primes the cache
+
+        other = LostItem.objects.create(user=self.finder, name='Black wallet', description='', features='')
+        pairs = [f'{self.lost.id}:{first.id}', f'{self.lost.id}:{second.id}', f'{other.id}:{third.id}', 'junk']
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post('/notification/actions/', {'action': 'ignore', 'pair': pairs})
+        self.assertRedirects(response, '/dashboard/', fetch_redirect_response=False)
+        writes = [q['sql'] for q in captured.captured_queries if 'app_matchnotificationstatus' in q['sql']]
+        self.assertEqual(len(writes), 1)
+
+        statuses = dict(MatchNotificationStatus.objects.values_list('found_item_id', 'status'))
+        self.assertEqual(statuses, {first.id: 'IGNORED', second.id: 'IGNORED'})
+        self.assertEqual(self.pending(), {third.id})
+
+    def test_selected_pairs_survive_a_larger_cross_product(self):
+        first, second, third = self.found
+        other = LostItem.objects.create(user=self.owner, name='Black leather wallet', description='', features='')
+        self.assertEqual(MatchCandidate.objects.filter(lost_item=other).count(), 3)
+        pairs = [f'{self.lost.id}:{first.id}', f'{other.id}:{third.id}']
+        with patch('app.views.MAX_BULK_PAIRS', 2):
+            self.client.post('/notification/actions/', {'action': 'ignore', 'pair': pairs})
+        self.assertEqual(
+            set(MatchNotificationStatus.objects.values_list('lost_item_id', 'found_item_id')),
+            {(self.lost.id, first.id), (other.id, third.id)},
+        )
+
+    def test_all_below_score_for_one_lost_item(self):
+        scores = dict(MatchCandidate.objects.filter(lost_item=self.lost).values_list('found_item_id', 'score'))
+        self.assertEqual(len(set(scores.values())), 3)
+        cutoff = sorted(scores.values())[-1]
+        self.client.post('/notification/actions/', {
+            'action': 'ignore', 'lost_id': self.lost.id, 'below_score': cutoff,
+        })
+        self.assertEqual(self.pending(), {found_id for found_id, score in scores.items() if score >= cutoff})
+        self.assertEqual(
+            MatchNotificationStatus.objects.filter(status='IGNORED').count(),
+            sum(score < cutoff for score in scores.values()),
+        )
+
+
+class LoginTests(TestCase):
+    def setUp(self):
+        self.user = make_user('Owner')
+
+    def login(self, login_input, password='s3cret-pass'):
+        return Client().post('/login/', {'email': login_input, 'password': password})
+
+    def test_email_or_username_in_any_case(self):
+        for login_input in ('owner@RAGHUINSTECH.com', 'OWNER', 'owner'):
+            self.assertRedirects(self.login(login_input), '/', fetch_redirect_response=False)
+        self.assertRedirects(self.login('owner', 'wrong'), '/login/', fetch_redirect_response=False)
+        self.assertRedirects(self.login('nobody'), '/login/', fetch_redirect_response=False)
+
+    def test_user_is_resolved_in_one_query(self):
+        from .backends import EmailOrUsernameBackend
+
+        with self.assertNumQueries(1):
+            user = EmailOrUsernameBackend().authenticate(None, username='OWNER@raghuinstech.com', password='s3cret-pass')
+        self.assertEqual(user, self.user)
+
+    def test_email_match_wins_over_username(self):
+        from .backends import find_user
+
+        other = User.objects.create_user(username='owner@raghuinstech.com', email='x@raghuinstech.com')
+        self.assertEqual(find_user('Owner@raghuinstech.com'), self.user)
+        self.assertEqual(find_user('x@raghuinstech.com'), other)
+
+    def test_changed_iterations_rehash_on_login(self):
+        with override_settings(PASSWORD_HASH_ITERATIONS=1000):
+            self.login('owner')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+        self.login('owner')  # back to the default count
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+
+@override_settings(JOBS_RUN_INLINE=True, ROOT_URLCONF='app.tests')
+class AsyncViewTests(TestCase):
+    """The async views (ASYNC_VIEWS) must render the same pages as the sync ones."""
+
+    def setUp(self):
+        notification_cache.clear()
+        self.owner, self.finder = make_user('owner'), make_user('finder')
+        self.lost = LostItem.objects.create(user=self.owner, name='Black wallet', description='leather', features='')
+        self.found = FoundItem.objects.create(user=self.finder, name='Wallet', description='black leather', features='')
+        self.client = AsyncClient()
+        self.client.force_login(self.owner)
+
+    async def test_dashboard(self):
+        response = await self.client.get('/dashboard/')
+        self.assertEqual(response.context['notification_count'], 1)
+        self.assertEqual((response.context['lost_count'], response.context['found_count']), (1, 0))
+        self.assertContains(response, 'Black wallet')
+
+    async def test_view_notification(self):
+        response = await self.client.get(f'/notification/{self.lost.id}/{self.found.id}/')
+        candidate = await MatchCandidate.objects.aget(lost_item=self.lost, found_item=self.found)
+        self.assertEqual(response.context['match_score'], candidate.score)
+        self.assertContains(response, 'finder@raghuinstech.com')
+
+    async def test_report_lost(self):
+        response = await self.client.post('/report-lost/', {'name': 'Wallet', 'description': 'black', 'features': 'id card'})
+        self.assertRedirects(response, '/dashboard/', fetch_redirect_response=False)
+        self.assertEqual(await LostItem.objects.filter(user=self.owner).acount(), 2)
+
+    async def test_report_found_form(self):
+        response = await self.client.get('/report-found/')
+        self.assertEqual(response.context['found_items'], {'count': 0})
+
+
+@override_settings(JOBS_RUN_INLINE=True, SSE_POLL_INTERVAL=0)
+class MatchEventStreamTests(TestCase):
+    def setUp(self):
+        self.owner, self.finder = make_user('owner'), make_user('finder')
+        self.lost = LostItem.objects.create(user=self.owner, name='Black wallet', description='leather', features='')
+
+    def test_only_new_candidates_are_logged(self):
+        found = FoundItem.objects.create(user=self.finder, name='Wallet', description='black', features='')
+        found.save()  # re-scored, but not a new match
+        event = MatchEvent.objects.get()
+        self.assertEqual((event.user, event.lost_item, event.found_item), (self.owner, self.lost, found))
+
+    def test_stream_resumes_after_last_event_id(self):
+        first = FoundItem.objects.create(user=self.finder, name='Wallet', description='black', features='')
+        second = FoundItem.objects.create(user=self.finder, name='Leather wallet', description='', features='')
+        first_id = MatchEvent.objects.get(found_item=first).id
+
+        self.client.force_login(self.owner)
+        response = self.client.get('/notifications/stream/', headers={'Last-Event-ID': str(first_id)})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = iter(response.streaming_content)
+        self.assertTrue(next(chunks).startswith(b'retry:'))
+        event = next(chunks).decode()
+        self.assertIn(f'id: {MatchEvent.objects.get(found_item=second).id}\nevent: match\n', event)
+        self.assertIn('"found_item_name":"Leather wallet"', event)
+        response.close()
+
+    def test_sync_stream_is_a_short_poll(self):
+        from .events import poll
+
+        old = FoundItem.objects.create(user=self.finder, name='Wallet', description='black', features='')
+        old_id = MatchEvent.objects.get(found_item=old).id
+        # A new connection skips old events but still hands the browser a cursor.
+        self.assertEqual(list(poll(self.owner.id))[1:], [f'id: {old_id}\n\n'])
+
+        new = FoundItem.objects.create(user=self.finder, name='Leather wallet', description='', features='')
+        new_id = MatchEvent.objects.get(found_item=new).id
+        chunks = list(poll(self.owner.id, after=old_id))
+        self.assertEqual(len(chunks), 3)
+        self.assertIn(f'id: {new_id}\nevent: match\n', chunks[1])
+        self.assertEqual(chunks[2], f'id: {new_id}\n\n')
+
+    @override_settings(SSE_HEARTBEAT_INTERVAL=0)
+    async def test_async_stream_skips_old_events_and_heartbeats(self):
+        from .events import astream
+
+        await FoundItem.objects.acreate(user=self.finder, name='Wallet', description='black', features='')
+        chunks = astream(self.owner.id)
+        await anext(chunks)
+        self.assertEqual(await anext(chunks), ': heartbeat\n\n')
+        await chunks.aclose()
+
+    async def test_async_stream(self):
+        from .events import astream
+
+        found = await FoundItem.objects.acreate(user=self.finder, name='Wallet', description='black', features='')
+        chunks = astream(self.owner.id, after=0)
+        await anext(chunks)
+        self.assertIn(f'"found_item_id":{found.id}', await anext(chunks))
+        await chunks.aclose()
+
+
+class SQLiteTuningTests(TestCase):
+    def test_new_connections_get_the_configured_pragmas(self):
+        from django.db import connection
+        from .sqlite import effective_pragmas
+
+        pragmas = effective_pragmas(connection, ['busy_timeout', 'synchronous', 'cache_size'])
+        self.assertEqual(pragmas, {'busy_timeout': 5000, 'synchronous': 'NORMAL', 'cache_size': -20000})
+
+    def test_command_reports_effective_pragmas(self):
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('sqlite_pragmas', stdout=out)
+        self.assertIn('busy_timeout', out.getvalue())
+        self.assertIn('IMMEDIATE', out.getvalue())
+
+    def test_benchmark_compares_both_profiles(self):
+        import json
+        import tempfile
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = f"{directory}/sqlite.json"
+            call_command(
+                'bench_sqlite', workers=[1], seconds=0.2, items=50, users=5, output=output, stdout=StringIO()
+            )
+            with open(output) as results:
+                runs = json.load(results)['runs']
+        self.assertEqual([run['profile'] for run in runs], ['default', 'tuned'])
+        for run in runs:
+            self.assertGreater(run['requests_per_second'], 0)
+            self.assertEqual(set(run['latency_ms']), {'p50', 'p99', 'mean'})
+
+
+@override_settings(JOBS_RUN_INLINE=True, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class FoundItemImportTests(TestCase):
+    def setUp(self):
+        self.owner, self.desk = make_user('owner'), make_user('desk')
+        self.lost = LostItem.objects.create(
+            user=self.owner, name='Black wallet', description='Leather wallet', features='Student ID'
+        )
+        self.photos = tempfile.mkdtemp(dir=TEST_MEDIA_ROOT)
+        for seed, name in enumerate(['wallet.png', 'bottle.png']):
+            with open(f"{self.photos}/{name}", 'wb') as f:
+                f.write(pattern_photo(seed).read())
+
+    def test_csv_rows_are_imported_in_batches_and_matched(self):
+        from .importer import import_found_items, open_photos, read_rows
+        from .search import search_items
+
+        csv_file = BytesIO(
+            b"name,description,features,photo\n"
+            b"Wallet,Black leather wallet,Student ID inside,wallet.png\n"
+            b",No name,,bottle.png\n"
+            b"Water bottle,Blue steel,Dent,bottle.png\n"
+            b"Keys,Two keys,,../escape.png\n"
+        )
+        with open_photos(self.photos) as photos:
+            result = import_found_items(read_rows(csv_file, 'csv'), self.desk, photos, batch_size=1)
+
+        self.assertEqual((result.created, result.batches, result.failed), (2, 2, 2))
+        self.assertEqual([row for row, _ in result.errors], [3, 5])
+        wallet = FoundItem.objects.get(name='Wallet')
+        self.assertEqual(wallet.user, self.desk)
+        self.assertEqual(len(wallet.photo_phash), 16)
+        self.assertTrue(MatchCandidate.objects.filter(lost_item=self.lost, found_item=wallet).exists())
+        self.assertEqual([r['item_id'] for r in search_items('bottle', kind='found')[0]], [
+            FoundItem.objects.get(name='Water bottle').id
+        ])
+
+    def test_json_is_decoded_incrementally(self):
+        import json
+        from .importer import _json_records
+
+        records = [{'name': f'Item {i}', 'description': '{"[nested]"}', 'features': 'ü'} for i in range(20)]
+        array = json.dumps(records).encode()
+        lines = '\n'.join(json.dumps(record) for record in records).encode()
+        for payload in (array, lines):
+            self.assertEqual(list(_json_records(BytesIO(payload), chunk_size=7)), records)
+
+    def test_admin_upload_with_photo_archive(self):
+        import zipfile
+
+        staff = User.objects.create_superuser('admin', 'admin@raghuinstech.com', 's3cret-pass')
+        self.client.force_login(staff)
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.write(f"{self.photos}/wallet.png", 'wallet.png')
+        upload = SimpleUploadedFile(
+            'desk.jsonl', b'{"name": "Wallet", "description": "Black leather", "features": "ID", "photo": "wallet.png"}\n'
+        )
+        response = self.client.post('/admin/app/founditem/import/', {
+            'file': upload, 'photos': SimpleUploadedFile('photos.zip', archive.getvalue()), 'batch_size': 100,
+        })
+        self.assertRedirects(response, '/admin/app/founditem/')
+        self.assertEqual(FoundItem.objects.get().user, staff)
+
+
+@override_settings(JOBS_RUN_INLINE=True)
+class MetricsTests(TestCase):
+    def setUp(self):
+        from . import metrics
+
+        metrics.registry.reset()
+        notification_cache.clear()
+        self.owner = make_user('owner')
+        self.client.force_login(self.owner)
+
+    def server_timing(self, response):
+        return dict(
+            entry.split(';', 1) for entry in response['Server-Timing'].split(', ')
+        )
+
+    def test_requests_are_timed_and_exported(self):
+        response = self.client.get('/dashboard/')
+        timing = self.server_timing(response)
+        self.assertIn('tpl', timing)
+        self.assertRegex(timing['db'], r'desc="[1-9]\d* queries"')
+
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        User.objects.filter(id=self.owner.id).update(is_staff=True)
+        body = self.client.get('/metrics/').content.decode()
+        self.assertIn('app_http_requests_total{method="GET",status="200",view="dashboard"} 1', body)
+        self.assertIn('app_db_queries_per_request_count{view="dashboard"} 1', body)
+        self.assertIn('app_template_render_seconds_count{template="dashboard.html"} 1', body)
+        self.assertIn('app_http_request_duration_seconds_bucket{view="dashboard",le="+Inf"} 1', body)
+
+    @override_settings(METRICS_TOKEN='scrape-me')
+    def test_scrapers_authenticate_with_the_token(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer scrape-me').status_code, 200)
+
+    def test_matching_spans(self):
+        from . import metrics
+        from .views import check_for_matches
+
+        finder = make_user('finder')
+        lost = LostItem.objects.create(user=self.owner, name='Black wallet', description='leather', features='')
+        FoundItem.objects.create(user=finder, name='Wallet', description='black leather', features='')
+        check_for_matches(lost)
+
+        body = metrics.render(metrics.registry.snapshot())
+        self.assertIn('app_match_pairs_scored_total{span="refresh_found"} 1', body)
+        self.assertIn('app_match_candidates_scanned_sum{span="check_for_matches"} 1', body)
+        self.assertIn('app_span_seconds_count{span="check_for_matches"} 1', body)
+
+    def test_processes_are_added_up_from_metrics_dir(self):
+        import json
+        from . import metrics
+
+        directory = tempfile.mkdtemp(dir=TEST_MEDIA_ROOT)
+        other = metrics.Registry()
+        other.inc('app_http_requests_total', view='index', method='GET', status=200)
+        with open(f"{directory}/metrics-1.json", 'w') as f:
+            json.dump(other.snapshot(), f)
+
+        with override_settings(METRICS_DIR=directory):
+            metrics.inc('app_http_requests_total', view='index', method='GET', status=200)
+            body = metrics.render(metrics.collect())
+        self.assertIn('app_http_requests_total{method="GET",status="200",view="index"} 2', body)
+
+    @override_settings(ROOT_URLCONF='app.tests')
+    async def test_async_views_count_queries(self):
+        client = AsyncClient()
+        await client.aforce_login(self.owner)
+        response = await client.get('/dashboard/')
+        self.assertRegex(self.server_timing(response)['db'], r'desc="[1-9]\d* queries"')
+
+
+@override_settings(PROFILE_SAMPLE_RATE=0, PROFILE_KEEP=2)
+class ProfilerTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=TEST_MEDIA_ROOT)
+        self.settings = override_settings(PROFILE_DIR=self.directory)
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+        self.user = make_user('owner')
+        self.client.force_login(self.user)
+
+    def test_only_staff_can_ask_for_a_profile(self):
+        import pstats
+
+        self.assertNotIn('X-Profile-Id', self.client.get('/dashboard/?_profile=1'))
+        User.objects.filter(id=self.user.id).update(is_staff=True)
+        profile_id = self.client.get('/dashboard/', HTTP_X_PROFILE='1')['X-Profile-Id']
+
+        stats = pstats.Stats(f"{self.directory}/{profile_id}.prof")
+        self.assertIn('dashboard_view', {name for _, _, name in stats.stats})
+        with open(f"{self.directory}/{profile_id}.collapsed") as collapsed:
+            for line in collapsed:
+                self.assertRegex(line, r'^\S.* \d+$')
+
+    @override_settings(PROFILE_SAMPLE_RATE=1)
+    def test_sampled_profiles_are_a_bounded_ring(self):
+        from .profiling import list_profiles
+
+        ids = [self.client.get('/').get('X-Profile-Id') for _ in range(3)]
+        self.assertEqual([profile['id'] for profile in list_profiles()], ids[:0:-1])
+        self.assertEqual(len(list_profiles()[0]['files']), 2)
+
+    @override_settings(PROFILE_SAMPLE_RATE=1)
+    def test_admin_lists_and_serves_profiles(self):
+        profile_id = self.client.get('/')['X-Profile-Id']
+        User.objects.filter(id=self.user.id).update(is_staff=True)
+        with override_settings(PROFILE_SAMPLE_RATE=0):
+            self.assertContains(self.client.get('/admin/profiles/'), profile_id)
+            response = self.client.get(f'/admin/profiles/{profile_id}.prof')
+            self.assertEqual(response['Content-Disposition'], f'attachment; filename="{profile_id}.prof"')
+            self.assertEqual(self.client.get('/admin/profiles/..%2Fdb.sqlite3').status_code, 404)
+
+
+@override_settings(JOBS_RUN_INLINE=True, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ItemLifecycleTests(TestCase):
+    def setUp(self):
+        notification_cache.clear()
+        self.owner, self.finder = make_user('owner'), make_user('finder')
+        self.lost = LostItem.objects.create(
+            user=self.owner, name='Black wallet', description='leather', features='', photo=pattern_photo(5, 'lost.png')
+        )
+        self.found = FoundItem.objects.create(
+            user=self.finder, name='Black wallet', description='leather', features='', photo=pattern_photo(5, 'found.png')
+        )
+        self.client.force_login(self.owner)
+
+    def test_accepted_match_resolves_both_items(self):
+        from .search import search_items
+
+        url = f'/notification/action/{self.lost.id}/{self.found.id}/accept/'
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertEqual(LostItem.objects.get(id=self.lost.id).status, 'OPEN')
+        self.client.post(url)
+        for item in (self.lost, self.found):
+            item.refresh_from_db()
+            self.assertEqual(item.status, 'RESOLVED')
+            self.assertIsNotNone(item.closed_at)
+        self.assertFalse(MatchCandidate.objects.exists())
+        self.assertFalse(ItemToken.objects.exists())
+        self.assertEqual(search_items('wallet')[0], [])
+
+        # Resolved items are neither matched nor listed.
+        other = LostItem.objects.create(
+            user=self.owner, name='Black wallet', description='leather', features='', photo=pattern_photo(5, 'other.png')
+        )
+        self.assertFalse(MatchCandidate.objects.filter(lost_item=other).exists())
+        response = self.client.get('/dashboard/')
+        self.assertEqual([item.id for item in response.context['lost_items']], [other.id])
+        self.assertNotContains(self.client.get('/'), f'/notification/{self.lost.id}/')
+
+    def test_bulk_accept_resolves(self):
+        self.client.post('/notification/actions/', {'action': 'accept', 'pair': f'{self.lost.id}:{self.found.id}'})
+        self.assertEqual(LostItem.objects.get().status, 'RESOLVED')
+        self.assertEqual(FoundItem.objects.get().status, 'RESOLVED')
+
+    def test_rebuilding_the_token_index_skips_closed_items(self):
+        from django.core.management import call_command
+        from .lifecycle import close_items
+
+        close_items(FoundItem, [self.found.id], 'RESOLVED')
+        call_command('rebuild_token_index', stdout=StringIO())
+        call_command('rebuild_token_index', '--all', stdout=StringIO())
+        self.assertFalse(ItemToken.objects.filter(found_item=self.found).exists())
+        self.assertTrue(ItemToken.objects.filter(lost_item=self.lost).exists())
+
+    def test_closing_keeps_the_first_status(self):
+        from .lifecycle import close_items
+
+        self.assertEqual(close_items(LostItem, [self.lost.id], 'EXPIRED'), 1)
+        closed_at = LostItem.objects.get(id=self.lost.id).closed_at
+        self.assertEqual(close_items(LostItem, [self.lost.id], 'RESOLVED'), 0)
+        self.assertEqual(LostItem.objects.filter(id=self.lost.id).values_list('status', 'closed_at').get(), ('EXPIRED', closed_at))
+
+    def test_plain_save_stamps_closed_at(self):
+        self.lost.status = 'RESOLVED'
+        self.lost.save()
+        self.lost.refresh_from_db()
+        self.assertIsNotNone(self.lost.closed_at)
+        self.assertFalse(ItemToken.objects.filter(lost_item=self.lost).exists())
+
+    def test_archive_moves_old_closed_items_with_statuses_and_photos(self):
+        from datetime import timedelta
+        from django.core.management import call_command
+        from django.utils import timezone
+        from .images import stored_names
+
+        MatchNotificationStatus.objects.create(
+            lost_item=self.lost, found_item=self.found, notified_user=self.owner, status='ACCEPTED'
+        )
+        stale = LostItem.objects.create(user=self.owner, name='Umbrella', description='blue', features='')
+        LostItem.objects.filter(id=stale.id).update(date_reported=timezone.now() - timedelta(days=100))
+        long_ago = timezone.now() - timedelta(days=200)
+        LostItem.objects.filter(id=self.lost.id).update(closed_at=long_ago)
+        FoundItem.objects.filter(id=self.found.id).update(closed_at=long_ago)
+        self.lost.refresh_from_db()
+        names = stored_names(self.lost)
+        refs = dict(StoredFile.objects.filter(name__in=names).values_list('name', 'refs'))
+
+        call_command('archive_items', batch_size=1, stdout=StringIO())
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'EXPIRED')
+        self.assertEqual(list(LostItem.objects.values_list('id', flat=True)), [stale.id])
+        self.assertFalse(FoundItem.objects.exists())
+        self.assertEqual(
+            set(ArchivedItem.objects.values_list('kind', 'original_id')), {('lost', self.lost.id), ('found', self.found.id)}
+        )
+        self.assertEqual(ArchivedMatchStatus.objects.get().status, 'ACCEPTED')
+        self.assertEqual(dict(StoredFile.objects.filter(name__in=names).values_list('name', 'refs')), refs)
+
+        archived = ArchivedItem.objects.get(kind='lost')
+        self.assertEqual(stored_names(archived), names)
+        archived.delete()
+        self.assertEqual(
+            dict(StoredFile.objects.filter(name__in=names).values_list('name', 'refs')),
+            {name: count - 1 for name, count in refs.items()},
+        )
+
+    def test_rerun_archive_does_not_retain_photos_twice(self):
+        from django.db.models import F
+        from .images import stored_names
+        from .lifecycle import archive_batch, close_items
+
+        close_items(LostItem, [self.lost.id], 'EXPIRED')
+        self.lost.refresh_from_db()
+        names = stored_names(self.lost)
+        refs = dict(StoredFile.objects.filter(name__in=names).values_list('name', 'refs'))
+        # An interrupted earlier run archived the item but did not delete it.
+        ArchivedItem.objects.create(
+            kind='lost', original_id=self.lost.id, user=self.owner, name=self.lost.name, description='', features='',
+            photo=self.lost.photo.name, photo_renditions=self.lost.photo_renditions, status='EXPIRED',
+            date_reported=self.lost.date_reported,
+        )
+        StoredFile.objects.filter(name__in=names).update(refs=F('refs') + 1)
+
+        self.assertEqual(archive_batch(LostItem, [self.lost.id]), 1)
+        self.assertEqual(ArchivedItem.objects.count(), 1)
+        self.assertEqual(dict(StoredFile.objects.filter(name__in=names).values_list('name', 'refs')), refs)
+
+
+@override_settings(JOBS_RUN_INLINE=True, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class DuplicateReportTests(TestCase):
+    def setUp(self):
+        from . import dedup
+
+        notification_cache.clear()
+        dedup.invalidate(LostItem)
+        dedup.invalidate(FoundItem)
+        self.owner, self.finder, self.other_finder = make_user('owner'), make_user('finder'), make_user('finder2')
+        self.data = {'name': 'Black leather wallet', 'description': 'lost near the library', 'features': 'college id card'}
+        self.client.force_login(self.owner)
+
+    def test_signature_estimates_similarity(self):
+        from .dedup import signature, similarity
+        from .scoring import normalize_text
+
+        wallet = signature(normalize_text('Black leather wallet', 'lost near the library', 'college id card'))
+        repeat = signature(normalize_text('Black leather wallet', 'lost in the library', 'college id card'))
+        bottle = signature(normalize_text('Steel water bottle', 'blue', 'dented lid'))
+        self.assertGreater(similarity(wallet, repeat), 0.7)
+        self.assertLess(similarity(wallet, bottle), 0.2)
+        self.assertEqual(signature(''), '')
+        self.assertEqual(LostItem.objects.create(user=self.owner, **self.data).match_minhash, wallet)
+
+    def test_repeat_lost_report_is_offered_and_merged(self):
+        first = LostItem.objects.create(user=self.owner, **self.data)
+        response = self.client.post('/report-lost/', self.data)
+        repeat = LostItem.objects.latest('id')
+        self.assertRedirects(response, f'/duplicates/lost/{repeat.id}/')
+        self.assertContains(self.client.get(response.url), f'value="{first.id}"')
+
+        self.client.post(response.url, {'into': first.id})
+        repeat.refresh_from_db()
+        self.assertEqual((repeat.status, repeat.duplicate_of_id), ('MERGED', first.id))
+        self.assertFalse(ItemToken.objects.filter(lost_item=repeat).exists())
+        self.assertFalse(MatchCandidate.objects.filter(lost_item=repeat).exists())
+        response = self.client.get('/dashboard/')
+        self.assertEqual([item.id for item in response.context['lost_items']], [first.id])
+
+    def test_other_users_lost_items_are_not_duplicates(self):
+        LostItem.objects.create(user=self.finder, **self.data)
+        self.assertRedirects(self.client.post('/report-lost/', self.data), '/dashboard/', fetch_redirect_response=False)
+
+    def test_found_repeats_from_other_finders_are_matched_once(self):
+        lost = LostItem.objects.create(user=self.owner, **self.data)
+        first = FoundItem.objects.create(user=self.finder, **self.data)
+        self.client.force_login(self.other_finder)
+        response = self.client.post('/report-found/', {**self.data, 'photo': make_photo()})
+        repeat = FoundItem.objects.latest('id')
+        self.assertRedirects(response, f'/duplicates/found/{repeat.id}/')
+        self.assertEqual(MatchCandidate.objects.filter(lost_item=lost).count(), 2)
+
+        self.client.post(response.url, {'into': first.id})
+        self.assertEqual(list(MatchCandidate.objects.values_list('found_item_id', flat=True)), [first.id])
+        # Not a duplicate any more: merged items are no longer open.
+        self.client.force_login(self.finder)
+        other = FoundItem.objects.create(user=self.finder, name='Umbrella', description='blue', features='')
+        self.assertRedirects(self.client.get(f'/duplicates/found/{other.id}/'), '/dashboard/', fetch_redirect_response=False)
+
+    def test_index_is_kept_across_closes_and_edits(self):
+        from .dedup import duplicate_index, near_duplicate_ids
+        from .lifecycle import close_items
+
+        first = LostItem.objects.create(user=self.owner, **self.data)
+        index = duplicate_index(LostItem)
+        second = LostItem.objects.create(user=self.owner, **self.data)
+        self.assertIs(duplicate_index(LostItem), index)
+        self.assertEqual(index.size, 2)
+        self.assertEqual(near_duplicate_ids(second), [first.id])
+
+        third = LostItem.objects.create(user=self.owner, name='Steel bottle', description='blue', features='dented')
+        self.assertEqual(near_duplicate_ids(third), [])
+        third.name, third.description, third.features = self.data['name'], self.data['description'], self.data['features']
+        third.save()
+        self.assertEqual(near_duplicate_ids(third), [first.id, second.id])
+        self.assertEqual(index.size, 4)
+        third.save()
+        self.assertEqual(index.size, 4)
+
+        close_items(LostItem, [first.id], 'EXPIRED')
+        self.assertIs(duplicate_index(LostItem), index)
+        self.assertEqual(near_duplicate_ids(second), [third.id])
+
+        # Signatures filled in on old items (a backfill) rebuild it.
+        LostItem.objects.filter(id=first.id).update(match_minhash='')
+        LostItem.objects.create(user=self.finder, **self.data)
+        duplicate_index(LostItem)
+        LostItem.objects.filter(id=first.id).update(match_minhash=second.match_minhash)
+        self.assertIsNot(duplicate_index(LostItem), index)
+
+
+@override_settings(JOBS_RUN_INLINE=True)
+class CategoryTests(TestCase):
+    def setUp(self):
+        from . import categories
+
+        notification_cache.clear()
+        categories.invalidate()
+        self.owner, self.finder = make_user('owner'), make_user('finder')
+        self.category = {category.slug: category for category in Category.objects.all()}
+
+    def test_items_are_classified_on_save(self):
+        charger = LostItem.objects.create(user=self.owner, name='Phone charger', description='white', features='')
+        bottle = FoundItem.objects.create(user=self.finder, name='Steel bottle', description='blue', features='')
+        unknown = FoundItem.objects.create(user=self.finder, name='Zyx', description='', features='')
+        # Generic words pointing at different categories are not enough to exclude any.
+        vague = FoundItem.objects.create(user=self.finder, name='Black card chain', description='', features='')
+        self.assertEqual(charger.category, self.category['electronics'])
+        self.assertEqual(bottle.category, self.category['bottles'])
+        self.assertIsNone(unknown.category)
+        self.assertIsNone(vague.category)
+
+    def test_reporter_choice_is_kept_and_learned(self):
+        self.client.force_login(self.owner)
+        self.client.post('/report-lost/', {
+            'name': 'Zyx gizmo', 'category': self.category['keys'].id, 'description': 'red', 'features': 'tag',
+        })
+        item = LostItem.objects.get()
+        self.assertEqual((item.category, item.category_by_user), (self.category['keys'], True))
+        item.name = 'Zyx gizmo charger'
+        item.save()
+        self.assertEqual(LostItem.objects.get().category, self.category['keys'])
+
+        from . import categories
+
+        categories.invalidate()
+        found = FoundItem.objects.create(user=self.finder, name='Gizmo', description='', features='')
+        self.assertEqual(found.category, self.category['keys'])
+
+    def test_only_comparable_categories_are_matched(self):
+        lost = LostItem.objects.create(user=self.owner, name='Black wallet', description='leather', features='')
+        card = FoundItem.objects.create(user=self.finder, name='Black id card', description='leather', features='')
+        jacket = FoundItem.objects.create(user=self.finder, name='Black leather jacket', description='', features='')
+        other = FoundItem.objects.create(user=self.finder, name='Black thing', description='leather', features='')
+        matched = set(MatchCandidate.objects.filter(lost_item=lost).values_list('found_item_id', flat=True))
+        self.assertIn(card.id, matched)  # wallets and id cards are related
+        self.assertIn(other.id, matched)  # uncategorized
+        self.assertNotIn(jacket.id, matched)
+
+    def test_classify_items_fills_missing_categories(self):
+        from django.core.management import call_command
+
+        item = LostItem.objects.create(user=self.owner, name='Bike keys', description='', features='')
+        LostItem.objects.filter(id=item.id).update(category=None)
+        out = StringIO()
+        call_command('classify_items', '--dry-run', stdout=out)
+        self.assertIn('Would categorize 1 item(s)', out.getvalue())
+        self.assertIsNone(LostItem.objects.get().category)
+        call_command('classify_items', stdout=StringIO())
+        self.assertEqual(LostItem.objects.get().category, self.category['keys'])
+
+
+class SeedItemsTests(TestCase):
+    def test_accepted_statuses_resolve_their_items(self):
+        from django.core.management import call_command
+
+        call_command('seed_items', items=40, stdout=StringIO())
+        accepted = MatchNotificationStatus.objects.filter(status='ACCEPTED')
+        self.assertTrue(accepted.exists())
+        for status in accepted.select_related('lost_item', 'found_item'):
+            self.assertEqual((status.lost_item.status, status.found_item.status), ('RESOLVED', 'RESOLVED'))
+        self.assertFalse(MatchCandidate.objects.filter(lost_item__status='RESOLVED').exists())
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_seed_items(self):
+        from django.core.management import call_command
+
+        call_command('seed_items', items=20, stdout=StringIO())
+        self.assertEqual(LostItem.objects.count(), 20)
+        self.assertEqual(FoundItem.objects.count(), 20)
+        self.assertEqual(User.objects.filter(username__startswith='seed42_').count(), 2)
+        self.assertTrue(ItemToken.objects.exists())
+        self.assertTrue(MatchCandidate.objects.exists())
+
+    def test_run_benchmarks_writes_results(self):
+        import json
+        import tempfile
+        from django.core.management import call_command
+
+        call_command('seed_items', items=20, stdout=StringIO())
+        with tempfile.TemporaryDirectory() as directory:
+            output = f"{directory}/results.json"
+            call_command('run_benchmarks', runs=1, output=output, stdout=StringIO())
+            with open(output) as results:
+                results = json.load(results)
+        self.assertEqual(set(results), {'revision', 'timestamp', 'python', 'dataset', 'benchmarks'})
+        self.assertEqual(results['dataset'], {'lost_items': 20, 'found_items': 20})
+        self.assertLessEqual(
+            {'check_for_matches', 'refresh_candidates_for_lost', 'dashboard_view'}, set(results['benchmarks'])
+        )
+        for stats in results['benchmarks'].values():
+            self.assertEqual(stats['runs'], 1)
+            self.assertEqual(set(stats), {'runs', 'latency_ms', 'queries', 'peak_memory_kb'})
+
+    def test_server_benchmarks_need_seeded_users(self):
+        from django.core.management import CommandError, call_command
+
+        with self.assertRaisesMessage(CommandError, 'seed_items'):
+            call_command('bench_asgi', stdout=StringIO())
+
+    def test_loadtest_summary_and_labels(self):
+        from .management.commands.loadtest import label, summarize
+
+        samples = [('GET dashboard', elapsed, True) for elapsed in (10.0, 20.0, 30.0)]
+        samples.append(('GET dashboard', 40.0, False))
+        summary = summarize(samples)
+        self.assertEqual((summary['requests'], summary['errors'], summary['error_rate']), (4, 1, 0.25))
+        self.assertEqual(summary['latency_ms']['mean'], 25.0)
+        self.assertEqual(summary['latency_ms']['p99'], 40.0)
+
+        self.assertEqual(label('GET', '/dashboard/?notification_cursor=abc'), 'GET dashboard')
+        self.assertEqual(label('POST', '/no/such/page/'), 'POST /no/such/page/')
+
+
+def _async_urlpatterns():
+    from django.contrib import admin
+    from django.urls import include, path
+
+    from .urls import url_patterns
+    return [path('admin/', admin.site.urls), path('', include(url_patterns(async_views=True)))]
+
+
+# URLconf for AsyncViewTests: the app's URLs with the async views routed.
+urlpatterns = _async_urlpatterns()
@@ -1,16 +1,35 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
-urlpatterns = [
-    path('', views.index_view, name='index'),
-    path('signup/', views.signup_view, name='signup'),
-    path('login/', views.login_view, name='login'),
-    path('dashboard/', views.dashboard_view, name='dashboard'),
-    path('report-lost/', views.report_lost_view, name='report_lost'),
-    path('report-found/', views.report_found_view, name='report_found'),
-    path('delete-lost/<int:item_id>/', views.delete_lost_item, name='delete_lost'),
-    path('delete-found/<int:item_id>/', views.delete_found_item, name='delete_found'),
-    path('notification/<int:lost_id>/<int:found_id>/', views.view_notification, name='view_notification'),
-    path('notification/action/<int:lost_id>/<int:found_id>/<str:action>/', views.handle_match_action, name='handle_match_action'),
-    path('logout/', views.logout_view, name='logout'),
-]
+
+def url_patterns(async_views=False):
+    """
+    The app's URLs. With `async_views` the dashboard, report and notification
+    pages and the notification stream are served by their async versions
+    (see views.py).
+    """
+    def pick(sync_view, async_view):
+        return async_view if async_views else sync_view
+
+    return [
+        path('', views.index_view, name='index'),
+        path('search/', views.search_view, name='search'),
+        path('signup/', views.signup_view, name='signup'),
+        path('login/', views.login_view, name='login'),
+        path('dashboard/', pick(views.dashboard_view, views.adashboard_view), name='dashboard'),
+        path('report-lost/', pick(views.report_lost_view, views.areport_lost_view), name='report_lost'),
+        path('report-found/', pick(views.report_found_view, views.areport_found_view), name='report_found'),
+        path('delete-lost/<int:item_id>/', views.delete_lost_item, name='delete_lost'),
+        path('delete-found/<int:item_id>/', views.delete_found_item, name='delete_found'),
+        path('duplicates/<str:kind>/<int:item_id>/', views.item_duplicates_view, name='item_duplicates'),
+        path('notification/<int:lost_id>/<int:found_id>/', pick(views.view_notification, views.aview_notification), name='view_notification'),
+        path('notifications/stream/', pick(views.notification_stream, views.anotification_stream), name='notification_stream'),
+        path('notification/action/<int:lost_id>/<int:found_id>/<str:action>/', views.handle_match_action, name='handle_match_action'),
+        path('notification/actions/', views.bulk_match_action, name='bulk_match_action'),
+        path('metrics/', views.metrics_view, name='metrics'),
+        path('logout/', views.logout_view, name='logout'),
+    ]
+
+
+urlpatterns = url_patterns(getattr(settings, 'ASYNC_VIEWS', False))
@@ -1,78 +1,142 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_POST
 from .forms import CollegeUserCreationForm, LostItemForm, FoundItemForm
-from .models import LostItem, FoundItem, MatchNotificationStatus, UserProfile
-from fuzzywuzzy import fuzz
-from django.db.models import Q 
+from .lifecycle import resolve_matches
+from .models import OPEN, LostItem, FoundItem, MatchNotificationStatus, UserProfile, MatchCandidate
+from .matching import astored_scores, stored_scores
+from . import dedup, metrics, notification_cache
+from .notification_cache import aget_notifications, get_notifications
+from .events import astream, last_event_id, poll
+from .pagination import CandidatePage, KeysetPage
+from .search import search_items
+from django.db.models import Count, Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# --- Fuzzy Matching Logic (reads materialized MatchCandidate scores) ---
+def pending_candidates(lost_items):
+    """
+    Stored MatchCandidates for the given LostItems that the lost user has not
+    actioned yet, newest lost item first and best score first within it.
+    """
+    actioned = MatchNotificationStatus.objects.filter(
+        lost_item=OuterRef('lost_item'),
+        found_item=OuterRef('found_item'),
+        notified_user=OuterRef('lost_item__user'),
+    )
+    return (
+        MatchCandidate.objects
+        .filter(lost_item__in=lost_items, lost_item__status=OPEN, found_item__status=OPEN)
+        .filter(~Exists(actioned))
+        .select_related('lost_item', 'found_item__user__userprofile')
+        .order_by('-lost_item__date_reported', '-score')
+    )
+
 
-# --- Fuzzy Matching Logic (REVISED: Threshold Removed) ---
 def check_for_matches(item, item_type='lost'): # REMOVED threshold argument
     """
     Checks the given LostItem against FoundItems reported by other users.
     Returns a list of PENDING matching FoundItem details for the LostItem user.
-    Notification filtering (score < 80%) is now disabled per request.
+    Scores are read from MatchCandidate, which is kept up to date when items
+    are saved, so nothing is re-scored here.
     """
     if item_type != 'lost':
         # Only Lost -> Found checks are performed.
         return []
 
     lost_item = item
-    
-    # 1. Potential FoundItems by other users
-    potential_matches = FoundItem.objects.filter(~Q(user=lost_item.user))
-    
-    # 2. Get IDs of matches already actioned (ACCEPTED or IGNORED) by this lost user
-    actioned_match_ids = MatchNotificationStatus.objects.filter(
-        lost_item=lost_item,
-        notified_user=lost_item.user
-    ).values_list('found_item_id', flat=True)
-    
-    # Combine text fields for comprehensive matching
-    lost_item_text = f"{lost_item.name} {lost_item.description} {lost_item.features}".lower()
-    
+
     matches = []
-    for found_item in potential_matches:
-        # Skip if this match has already been actioned
-        if found_item.id in actioned_match_ids:
-            continue
+    with metrics.span('check_for_matches'):
+        for candidate in pending_candidates([lost_item]):
+            found_item = candidate.found_item
+            found_user = found_item.user
+
+            # Retrieve contact information via UserProfile
+            try:
+                phone = found_user.userprofile.phone_number
+            except UserProfile.DoesNotExist:
+                phone = 'N/A'
+
+            matches.append({
+                'lost_item_id': lost_item.id,
+                'lost_item_name': lost_item.name,
+                'found_item_id': found_item.id,
+                'found_item_name': found_item.name,
+                'found_user_name': found_user.username,
+                'found_user_email': found_user.email,
+                'found_user_phone': phone,
+                'found_item_photo_url': found_item.photo.url if found_item.photo else '',
+                'score': candidate.score,
+                'photo_score': candidate.photo_score,
+            })
+    # Stored scores are read, not computed, so no pairs are scored here.
+    metrics.observe('app_match_candidates_scanned', len(matches), span='check_for_matches')
 
-        found_item_text = f"{found_item.name} {found_item.description} {found_item.features}".lower()
-        
-        # Score is still calculated for display but NOT used for filtering
-        score = fuzz.token_sort_ratio(lost_item_text, found_item_text)
-        
-        # *** NO THRESHOLD CHECK HERE ***
-        
-        found_user = found_item.user
-        
-        # Retrieve contact information via UserProfile
-        try:
-            phone = found_user.userprofile.phone_number
-        except UserProfile.DoesNotExist:
-            phone = 'N/A'
-        
-        matches.append({
-            'lost_item_id': lost_item.id,
-            'lost_item_name': lost_item.name,
-            'found_item_id': found_item.id,
-            'found_item_name': found_item.name,
-            'found_user_name': found_user.username,
-            'found_user_email': found_user.email,
-            'found_user_phone': phone,
-            'found_item_photo_url': found_item.photo.url if found_item.photo else '',
-            'score': score, 
-        })
-            
     return matches
 
+def _item_counts_query(user):
+    def count_of(model):
+        return Coalesce(Subquery(
+            model.objects.open().filter(user=OuterRef('pk'))
+            .values('user').annotate(n=Count('id')).values('n')
+        ), Value(0))
+
+    return User.objects.filter(pk=user.pk).annotate(
+        lost_count=count_of(LostItem), found_count=count_of(FoundItem)
+    ).values_list('lost_count', 'found_count')
+
+
+def item_counts(user):
+    """(lost_count, found_count) for a user, fetched with a single query."""
+    return _item_counts_query(user).get()
+
+
+def _notification(candidate):
+    return {
+        'type': 'LOST_MATCH',
+        'my_item_name': candidate.lost_item.name,
+        'my_item_id': candidate.lost_item_id,
+        'match_item_name': candidate.found_item.name,
+        'match_user': candidate.found_item.user.username,
+        'score': candidate.score,
+        'photo_score': candidate.photo_score,
+        'match_id': candidate.found_item_id
+    }
+
+
+def _notification_page(page, count):
+    return {'notifications': [_notification(c) for c in page], 'next_cursor': page.next_cursor, 'count': count}
+
+
+def dashboard_notifications(user, cursor=None):
+    """
+    One page of notification dicts for the user's pending matches, best score
+    first, with the next page's cursor and the total count: the stored scores
+    of all their lost items are read a page at a time, however many there are.
+    """
+    candidates = pending_candidates(LostItem.objects.open().filter(user=user))
+    return _notification_page(CandidatePage(candidates, cursor), candidates.count())
+
+
+async def adashboard_notifications(user, cursor=None):
+    candidates = pending_candidates(LostItem.objects.open().filter(user=user))
+    return _notification_page(await CandidatePage(candidates, cursor).aload(), await candidates.acount())
+
+
 # ---------- INDEX ----------
 def index_view(request):
-    # Only show items whose related users still exist
-    lost_items = LostItem.objects.filter(user__isnull=False).order_by('-date_reported')
-    found_items = FoundItem.objects.filter(user__isnull=False).order_by('-date_reported')
+    # Only show items whose related users still exist (one keyset page each)
+    lost_items = KeysetPage(LostItem.objects.open().filter(user__isnull=False), request.GET.get('lost_cursor'))
+    found_items = KeysetPage(FoundItem.objects.open().filter(user__isnull=False), request.GET.get('found_cursor'))
 
     return render(request, 'index.html', {
         'lost_items': lost_items,
@@ -80,6 +144,28 @@ def index_view(request):
     })
 
 
+# ---------- SEARCH ----------
+def search_view(request):
+    query = request.GET.get('q', '').strip()
+    kind = request.GET.get('kind', '')
+    results, next_cursor = search_items(query, kind=kind, cursor=request.GET.get('cursor'))
+
+    # Attach the item rows for display (one query per kind)
+    items = {
+        'lost': LostItem.objects.open().in_bulk([r['item_id'] for r in results if r['kind'] == 'lost']),
+        'found': FoundItem.objects.open().in_bulk([r['item_id'] for r in results if r['kind'] == 'found']),
+    }
+    for result in results:
+        result['item'] = items[result['kind']].get(result['item_id'])
+
+    return render(request, 'search.html', {
+        'query': query,
+        'kind': kind,
+        'results': [r for r in results if r['item'] is not None],
+        'next_cursor': next_cursor,
+    })
+
+
 # ---------- SIGNUP ----------
 def signup_view(request):
     if request.method == 'POST':
@@ -100,33 +186,15 @@ def login_view(request):
     if request.method == 'POST':
         login_input = request.POST.get('email')
         password = request.POST.get('password')
-        user = None
-
-        try:
-            # 1. First, try to find the user by email (always unique)
-            user_obj = User.objects.get(email__iexact=login_input)
-            # Use the actual username from the found user object for authentication
-            username_for_auth = user_obj.username
-        except User.DoesNotExist:
-            try:
-                # 2. If not found by email, try to find by username
-                user_obj = User.objects.get(username__iexact=login_input)
-                # Use the actual username from the found user object for authentication
-                username_for_auth = user_obj.username
-            except User.DoesNotExist:
-                # 3. User does not exist at all, or input is wrong
-                messages.error(request, '❌ Invalid email or password.')
-                return redirect('login')
-
-        # Now, attempt to authenticate using the correct username and password
-        user = authenticate(request, username=username_for_auth, password=password)
+        # One query resolves the email or username (see backends.py)
+        user = authenticate(request, username=login_input, password=password)
 
         if user is not None:
             login(request, user)
             # messages.success(request, f'👋 Welcome back, {user.username}!')
             return redirect('index')
         else:
-            # Authentication failed (i.e., password was wrong)
+            # Authentication failed (unknown email/username or wrong password)
             messages.error(request, '❌ Invalid email or password.')
             return redirect('login')
 
@@ -136,36 +204,38 @@ def login_view(request):
 # ---------- DASHBOARD ----------
 @login_required(login_url='login')
 def dashboard_view(request):
-    lost_items = LostItem.objects.filter(user=request.user).order_by('-date_reported')
-    found_items = FoundItem.objects.filter(user=request.user).order_by('-date_reported')
-
-    # Collect notifications only for the user's LOST items (Lost -> Found only)
-    notifications = []
-    for item in lost_items:
-        # check_for_matches call no longer requires a threshold argument
-        matches = check_for_matches(item, item_type='lost') 
-        
-        # Structure the match data for the dashboard template
-        for match in matches:
-             notifications.append({
-                'type': 'LOST_MATCH',
-                'my_item_name': match['lost_item_name'],
-                'my_item_id': match['lost_item_id'],
-                'match_item_name': match['found_item_name'],
-                'match_user': match['found_user_name'],
-                'score': match['score'],
-                'match_id': match['found_item_id']
-            })
-    
+    lost_items = KeysetPage(LostItem.objects.open().filter(user=request.user), request.GET.get('lost_cursor'))
+    found_items = KeysetPage(FoundItem.objects.open().filter(user=request.user), request.GET.get('found_cursor'))
+
+    # Notifications for the user's LOST items (Lost -> Found only); the first page is cached per user
+    cursor = request.GET.get('notification_cursor')
+    if cursor:
+        notifications = dashboard_notifications(request.user, cursor)
+    else:
+        notifications = get_notifications(request.user, dashboard_notifications)
+
+    lost_count, found_count = item_counts(request.user)
+
     return render(request, 'dashboard.html', {
         'user': request.user,
         'lost_items': lost_items,
         'found_items': found_items,
-        'notifications': notifications,
-        'notification_count': len(notifications)
+        'lost_count': lost_count,
+        'found_count': found_count,
+        'notifications': notifications['notifications'],
+        'notification_count': notifications['count'],
+        'notification_cursor': notifications['next_cursor'],
     })
 
 
+def report_redirect(item):
+    """After a report: the offer to merge it into a near-duplicate, if there is one, else the dashboard."""
+    if dedup.near_duplicate_ids(item):
+        kind = 'lost' if isinstance(item, LostItem) else 'found'
+        return redirect('item_duplicates', kind=kind, item_id=item.id)
+    return redirect('dashboard')
+
+
 # ---------- REPORT LOST ----------
 @login_required(login_url='login')
 def report_lost_view(request):
@@ -177,20 +247,22 @@ def report_lost_view(request):
             lost_item.save()
             messages.success(request, "✅ Lost item reported successfully!")
             
-            # CHECK FOR IMMEDIATE MATCHES
-            # check_for_matches call no longer requires a threshold argument
-            matches = check_for_matches(lost_item, item_type='lost')
-            if matches:
-                 messages.warning(request, f"🚨 We found {len(matches)} potential match(es) for your item! Check your dashboard notifications.")
+            # Matching is queued by the post_save signal and runs in the background
+            # worker; matches already stored (e.g. inline mode) are reported now.
+            match_count = pending_candidates([lost_item]).count()
+            if match_count:
+                 messages.warning(request, f"🚨 We found {match_count} potential match(es) for your item! Check your dashboard notifications.")
+            else:
+                 messages.info(request, "We're checking for matching found items. Any matches will appear in your dashboard notifications.")
                 
-            return redirect('dashboard')
+            return report_redirect(lost_item)
         else:
             messages.error(request, "❌ Please correct the errors below.")
     else:
         form = LostItemForm()
     
     # Get user's lost items count for display on the report form
-    lost_items_count = LostItem.objects.filter(user=request.user).count() 
+    lost_items_count = LostItem.objects.open().filter(user=request.user).count()
     return render(request, 'reportlost.html', {'form': form, 'lost_items': {'count': lost_items_count}}) 
 
 
@@ -205,26 +277,56 @@ def report_found_view(request):
             found_item.save()
             messages.success(request, "✅ Found item reported successfully!")
             
-            # Potential matches will be calculated and the LOST item owners will be notified 
-            # when they view their dashboard, according to the new logic.
+            # Matching against LOST items is queued by the post_save signal; the
+            # owners see new matches on their dashboard once the worker has run.
             messages.info(request, "Your found item has been registered. Any potential matches will automatically notify the owner of the lost item.")
 
-            return redirect('dashboard')
+            return report_redirect(found_item)
         else:
             messages.error(request, "❌ Please correct the errors below.")
     else:
         form = FoundItemForm()
 
     # Get user's found items count for display on the report form
-    found_items_count = FoundItem.objects.filter(user=request.user).count() 
+    found_items_count = FoundItem.objects.open().filter(user=request.user).count()
     return render(request, 'reportfound.html', {'form': form, 'found_items': {'count': found_items_count}})
 
 
+# ---------- DUPLICATE REPORTS ----------
+ITEM_MODELS = {'lost': LostItem, 'found': FoundItem}
+
+
+@login_required(login_url='login')
+def item_duplicates_view(request, kind, item_id):
+    """Offers to merge the user's new report into an open item it looks like (see dedup.py)."""
+    model = ITEM_MODELS.get(kind)
+    if model is None:
+        raise Http404
+    item = get_object_or_404(model.objects.open(), id=item_id, user=request.user)
+    ids = dedup.near_duplicate_ids(item)
+    found = model.objects.open().select_related('user').in_bulk(ids)
+    duplicates = [found[item_id] for item_id in ids if item_id in found]
+
+    if request.method == 'POST':
+        into = next((duplicate for duplicate in duplicates if str(duplicate.id) == request.POST.get('into')), None)
+        if into is not None and dedup.merge(item, into):
+            messages.success(request, f"Merged your report into \"{into.name}\"; it will be matched once.")
+        else:
+            messages.error(request, "That report can no longer be merged.")
+        return redirect('dashboard')
+
+    if not duplicates:
+        return redirect('dashboard')
+    for duplicate in duplicates:
+        duplicate.similarity = round(100 * dedup.similarity(item.match_minhash, duplicate.match_minhash))
+    return render(request, 'duplicates.html', {'item': item, 'kind': kind, 'duplicates': duplicates})
+
+
 # ---------- NEW: View Notification Details ----------
 @login_required(login_url='login')
 def view_notification(request, lost_id, found_id):
     lost_item = get_object_or_404(LostItem, id=lost_id, user=request.user)
-    found_item = get_object_or_404(FoundItem, id=found_id)
+    found_item = get_object_or_404(FoundItem.objects.select_related('user__userprofile'), id=found_id)
 
     # 1. Check if this match has already been processed by the Lost User
     status_entry = MatchNotificationStatus.objects.filter(
@@ -237,10 +339,8 @@ def view_notification(request, lost_id, found_id):
         messages.info(request, f"This match was already marked as {status_entry.status.capitalize()}.")
         return redirect('dashboard')
         
-    # 2. Calculate score for display (security check removed per request)
-    lost_text = f"{lost_item.name} {lost_item.description} {lost_item.features}".lower()
-    found_text = f"{found_item.name} {found_item.description} {found_item.features}".lower()
-    score = fuzz.token_sort_ratio(lost_text, found_text)
+    # 2. Read the stored scores for display (security check removed per request)
+    score, photo_score = stored_scores(lost_item, found_item)
     
     # *** REMOVED: if score < 80: check ***
     
@@ -255,6 +355,7 @@ def view_notification(request, lost_id, found_id):
         'lost_item': lost_item,
         'found_item': found_item,
         'match_score': score,
+        'photo_score': photo_score,
         'found_user': {
             'username': found_user.username,
             'email': found_user.email,
@@ -266,6 +367,7 @@ def view_notification(request, lost_id, found_id):
 
 # ---------- NEW: Handle Ignore/Accept Action  ----------
 @login_required(login_url='login')
+@require_POST
 def handle_match_action(request, lost_id, found_id, action):
     lost_item = get_object_or_404(LostItem, id=lost_id, user=request.user)
     found_item = get_object_or_404(FoundItem, id=found_id)
@@ -293,6 +395,86 @@ def handle_match_action(request, lost_id, found_id, action):
     return redirect('dashboard')
 
 
+
+# ---------- BULK ACCEPT / IGNORE ----------
+MATCH_ACTION_STATUSES = {'accept': 'ACCEPTED', 'ignore': 'IGNORED'}
+
+# Most pairs one bulk request may action.
+MAX_BULK_PAIRS = 500
+
+
+def set_match_statuses(user, candidates, status, pairs=None):
+    """
+    Records `status` for the stored `candidates` of `user`'s lost items (only
+    those in `pairs` of (lost_id, found_id), if given) with one upsert, so no
+    rescoring is needed; accepted pairs resolve their items. Returns the
+    number of pairs written.
+    """
+    rows = candidates.filter(lost_item__user=user).values_list('lost_item_id', 'found_item_id')
+    if pairs is None:
+        found = set(rows[:MAX_BULK_PAIRS])
+    else:
+        # `pairs` is capped already; slicing the candidates first could drop requested pairs.
+        found = set(rows) & set(pairs)
+    with transaction.atomic():
+        # bulk_create skips the post_save receivers, hence the explicit invalidation.
+        MatchNotificationStatus.objects.bulk_create(
+            [
+                MatchNotificationStatus(lost_item_id=lost_id, found_item_id=found_id, notified_user=user, status=status)
+                for lost_id, found_id in sorted(found)
+            ],
+            update_conflicts=True,
+            unique_fields=['lost_item', 'found_item', 'notified_user'],
+            update_fields=['status', 'date_updated'],
+        )
+    notification_cache.invalidate([user.id])
+    if status == 'ACCEPTED':
+        resolve_matches(found)
+    return len(found)
+
+
+def _parse_pairs(values):
+    pairs = set()
+    for value in values[:MAX_BULK_PAIRS]:
+        lost_id, _, found_id = value.partition(':')
+        if lost_id.isdigit() and found_id.isdigit():
+            pairs.add((int(lost_id), int(found_id)))
+    return pairs
+
+
+@login_required(login_url='login')
+@require_POST
+def bulk_match_action(request):
+    """
+    Accepts or ignores many matches at once: the selected `pair` values
+    ("lost_id:found_id"), or every pending match of `lost_id` scoring below
+    `below_score`.
+    """
+    status = MATCH_ACTION_STATUSES.get(request.POST.get('action'))
+    if status is None:
+        messages.error(request, "Invalid action.")
+        return redirect('dashboard')
+
+    if request.POST.get('below_score'):
+        try:
+            lost_id, below_score = int(request.POST.get('lost_id', '')), int(request.POST['below_score'])
+        except ValueError:
+            messages.error(request, "Invalid score.")
+            return redirect('dashboard')
+        candidates = pending_candidates([lost_id]).filter(score__lt=below_score)
+        written = set_match_statuses(request.user, candidates, status)
+    else:
+        pairs = _parse_pairs(request.POST.getlist('pair'))
+        candidates = MatchCandidate.objects.filter(
+            lost_item_id__in={lost_id for lost_id, _ in pairs},
+            found_item_id__in={found_id for _, found_id in pairs},
+        )
+        written = set_match_statuses(request.user, candidates, status, pairs)
+
+    verb = 'accepted' if status == 'ACCEPTED' else 'ignored'
+    messages.success(request, f"{written} match(es) {verb} and archived.")
+    return redirect('dashboard')
+
 # ---------- DELETE LOST / FOUND ----------
 @login_required(login_url='login')
 def delete_lost_item(request, item_id):
@@ -310,6 +492,19 @@ def delete_found_item(request, item_id):
     return redirect('dashboard')
 
 
+# ---------- NOTIFICATION STREAM (SSE) ----------
+def _event_stream_response(events):
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # don't let a proxy buffer the stream
+    return response
+
+
+@login_required(login_url='login')
+def notification_stream(request):
+    return _event_stream_response(poll(request.user.id, last_event_id(request)))
+
+
 # ---------- LOGOUT ----------
 def logout_view(request):
     logout(request)
@@ -317,3 +512,131 @@ def logout_view(request):
     return redirect('index')
 
 
+
+
+# ---------- ASYNC VIEWS (ASGI) ----------
+# Async versions of the busiest views, routed instead of the sync ones when
+# ASYNC_VIEWS is on (see urls.py and Procfile.asgi). Data is loaded with the
+# async ORM; templates are rendered in a worker thread because the session,
+# messages and request.user are still read lazily and synchronously there.
+arender = sync_to_async(render)
+
+
+@login_required(login_url='login')
+async def adashboard_view(request):
+    user = await request.auser()
+    lost_items = await KeysetPage(LostItem.objects.open().filter(user=user), request.GET.get('lost_cursor')).aload()
+    found_items = await KeysetPage(FoundItem.objects.open().filter(user=user), request.GET.get('found_cursor')).aload()
+    cursor = request.GET.get('notification_cursor')
+    if cursor:
+        notifications = await adashboard_notifications(user, cursor)
+    else:
+        notifications = await aget_notifications(user, adashboard_notifications)
+    lost_count, found_count = await _item_counts_query(user).aget()
+
+    return await arender(request, 'dashboard.html', {
+        'user': user,
+        'lost_items': lost_items,
+        'found_items': found_items,
+        'lost_count': lost_count,
+        'found_count': found_count,
+        'notifications': notifications['notifications'],
+        'notification_count': notifications['count'],
+        'notification_cursor': notifications['next_cursor'],
+    })
+
+
+async def _areport_item(request, form_class, template, success_message, on_saved):
+    user = await request.auser()
+    if request.method == 'POST':
+        form = form_class(request.POST, request.FILES)
+        if await sync_to_async(form.is_valid)():
+            item = form.save(commit=False)
+            item.user = user
+            await item.asave()
+            messages.success(request, success_message)
+            await on_saved(item)
+            return await sync_to_async(report_redirect)(item)
+        messages.error(request, "❌ Please correct the errors below.")
+    else:
+        form = form_class()
+
+    count = await form_class._meta.model.objects.open().filter(user=user).acount()
+    key = 'lost_items' if form_class is LostItemForm else 'found_items'
+    return await arender(request, template, {'form': form, key: {'count': count}})
+
+
+@login_required(login_url='login')
+async def areport_lost_view(request):
+    async def on_saved(lost_item):
+        match_count = await pending_candidates([lost_item]).acount()
+        if match_count:
+            messages.warning(request, f"🚨 We found {match_count} potential match(es) for your item! Check your dashboard notifications.")
+        else:
+            messages.info(request, "We're checking for matching found items. Any matches will appear in your dashboard notifications.")
+
+    return await _areport_item(
+        request, LostItemForm, 'reportlost.html', "✅ Lost item reported successfully!", on_saved
+    )
+
+
+@login_required(login_url='login')
+async def areport_found_view(request):
+    async def on_saved(found_item):
+        messages.info(request, "Your found item has been registered. Any potential matches will automatically notify the owner of the lost item.")
+
+    return await _areport_item(
+        request, FoundItemForm, 'reportfound.html', "✅ Found item reported successfully!", on_saved
+    )
+
+
+@login_required(login_url='login')
+async def aview_notification(request, lost_id, found_id):
+    user = await request.auser()
+    lost_item = await aget_object_or_404(LostItem, id=lost_id, user=user)
+    found_item = await aget_object_or_404(FoundItem.objects.select_related('user__userprofile'), id=found_id)
+
+    status_entry = await MatchNotificationStatus.objects.filter(
+        lost_item=lost_item,
+        found_item=found_item,
+        notified_user=user
+    ).afirst()
+    if status_entry and status_entry.status != 'PENDING':
+        messages.info(request, f"This match was already marked as {status_entry.status.capitalize()}.")
+        return redirect('dashboard')
+
+    score, photo_score = await astored_scores(lost_item, found_item)
+
+    found_user = found_item.user
+    try:
+        phone = found_user.userprofile.phone_number
+    except UserProfile.DoesNotExist:
+        phone = 'N/A'
+
+    return await arender(request, 'notification.html', {
+        'lost_item': lost_item,
+        'found_item': found_item,
+        'match_score': score,
+        'photo_score': photo_score,
+        'found_user': {
+            'username': found_user.username,
+            'email': found_user.email,
+            'phone': phone,
+        }
+    })
+
+
+@login_required(login_url='login')
+async def anotification_stream(request):
+    user = await request.auser()
+    return _event_stream_response(astream(user.id, last_event_id(request)))
+
+
+# ---------- METRICS ----------
+def metrics_view(request):
+    """Prometheus scrape endpoint: staff sessions, or `Authorization: Bearer <METRICS_TOKEN>`."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    bearer = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not (request.user.is_staff or (token and constant_time_compare(bearer, token))):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(metrics.collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
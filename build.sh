@@ -2,3 +2,8 @@
 pip install -r requirements.txt
 python manage.py collectstatic --noinput
 python manage.py migrate
+python manage.py backfill_match_text
+python manage.py classify_items
+python manage.py rebuild_token_index
+python manage.py rebuild_search_index
+python manage.py rebuild_match_candidates --stale
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -54,6 +55,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'app.profiling.ProfilerMiddleware',
 
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     
@@ -63,7 +65,8 @@ ROOT_URLCONF = 'project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, timing renders for the request metrics (app/metrics.py)
+        'BACKEND': 'app.metrics.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR /'app/templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -86,10 +89,37 @@ WSGI_APPLICATION = 'project.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # DB_PATH points a server at another copy (`manage.py loadtest` does).
+        'NAME': os.environ.get('DB_PATH', BASE_DIR / 'db.sqlite3'),
+        # Keep connections open between requests (checked before reuse), so
+        # the per-connection pragmas below are not re-applied every request.
+        # The ASGI profile sets 0: each async request runs in a new thread.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a transaction starts rather than on its
+            # first write, which would fail instead of waiting under contention.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Applied to every new SQLite connection (app/sqlite.py).
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -20000,
+}
+
+# SQLITE_PROFILE=default runs as the project did before the tuning above:
+# no pragmas, deferred transactions and a new connection per request.
+if os.environ.get('SQLITE_PROFILE') == 'default':
+    SQLITE_PRAGMAS = {}
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -110,6 +140,22 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Login accepts an email or a username, resolved in one query (app/backends.py).
+AUTHENTICATION_BACKENDS = ['app.backends.EmailOrUsernameBackend']
+
+# Opt-in: set PASSWORD_HASH_ITERATIONS (e.g. 200000 during exam week) to hash
+# with fewer PBKDF2 iterations. Existing hashes are rewritten at each user's
+# next login, and again when the variable is unset.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 0)) or None
+PASSWORD_HASHERS = [
+    'app.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -132,6 +178,56 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 import os
 MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_URL = '/media/'
+# Serve the dashboard, report and notification pages with their async views.
+# Set by the ASGI profile (Procfile.asgi); the sync views suit WSGI workers.
+# Per worker, the async views are not faster (`manage.py bench_asgi`); the ASGI
+# profile pays off for long-lived connections such as the match event stream.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+# Threads for CPU-bound scoring started from async views (app/concurrency.py).
+CPU_POOL_WORKERS = int(os.environ.get('CPU_POOL_WORKERS', 4))
+
+# Caches. Dashboard notifications (app/notification_cache.py) use a file-based
+# cache so the web and worker processes invalidate the same entries; a
+# single-process deployment can switch it to LocMemCache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'notifications': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'notifications',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+NOTIFICATION_CACHE_ALIAS = 'notifications'
+NOTIFICATION_CACHE_TIMEOUT = 300
+
+# Item lifecycle (app/lifecycle.py): open items expire after ITEM_EXPIRE_AFTER_DAYS;
+# `manage.py archive_items` archives items closed over ITEM_ARCHIVE_AFTER_DAYS ago.
+ITEM_EXPIRE_AFTER_DAYS = 90
+ITEM_ARCHIVE_AFTER_DAYS = 180
+
+# Reports whose MinHash signatures agree on this share of positions (estimated
+# Jaccard similarity of their text shingles) are offered for merging (app/dedup.py).
+DUPLICATE_MIN_SIMILARITY = 0.7
+
+# Each process rebuilds the category classifier and relations (app/categories.py)
+# this often, to learn from new reporter-labelled items and admin edits.
+CATEGORY_REFRESH_SECONDS = 300
+
+# Request metrics (app/metrics.py), served at /metrics to staff or to scrapers
+# sending the token. With several worker processes set METRICS_DIR so their
+# totals are added up; empty it on deploy.
+METRICS_DIR = os.environ.get('METRICS_DIR') or None
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Request profiling (app/profiling.py): staff add ?_profile=1 to a URL; a
+# sample of all requests is profiled at PROFILE_SAMPLE_RATE (0.01 = 1%).
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', BASE_DIR / 'profiles'))
+PROFILE_KEEP = 50
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 